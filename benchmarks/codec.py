@@ -0,0 +1,51 @@
+"""Compare the JSON libraries `signalbot.codec` can use on received envelopes.
+
+Run with `python benchmarks/codec.py`, libraries that are not installed are skipped.
+"""
+
+import json
+import timeit
+
+ENVELOPES = [
+    '{"envelope":{"source":"+490123456789","sourceNumber":"+490123456789","sourceUuid":"<uuid>","sourceName":"<name>","sourceDevice":1,"timestamp":1632576001632,"dataMessage":{"timestamp":1632576001632,"message":"Uhrzeit","expiresInSeconds":0,"viewOnce":false,"mentions":[],"attachments":[],"contacts":[],"groupInfo":{"groupId":"<groupid>","type":"DELIVER"}}}}',
+    '{"envelope":{"source":"<source>","sourceNumber":"<source>","sourceUuid":"<uuid>","sourceName":"<name>","sourceDevice":1,"timestamp":1632576001632,"syncMessage":{"sentMessage":{"timestamp":1632576001632,"message":null,"expiresInSeconds":0,"viewOnce":false,"reaction":{"emoji":"👍","targetAuthor":"<target>","targetAuthorNumber":"<target>","targetAuthorUuid":"<uuid>","targetSentTimestamp":1632576001632,"isRemove":false},"mentions":[],"attachments":[],"contacts":[],"groupInfo":{"groupId":"<groupid>","type":"DELIVER"},"destination":null,"destinationNumber":null,"destinationUuid":null}}}}',
+    '{"envelope":{"source":"+490123456789","sourceNumber":"+490123456789","sourceUuid":"<uuid>","sourceName":"<name>","sourceDevice":1,"timestamp":1632576001632,"dataMessage":{"timestamp":1632576001632,"message":"Uhrzeit","expiresInSeconds":0,"viewOnce":false, "attachments": [{"contentType": "image/png", "filename": "image.png", "id": "1qeCjjWOOo9Gxv8pfdCw.png","size": 12005}]}},"account":"+49987654321","subscription":0}',  # noqa: E501
+]
+NUMBER = 20_000
+
+
+def backends() -> dict:
+    found = {"json": (json.loads, json.dumps)}
+    try:
+        import orjson  # noqa: PLC0415
+
+        found["orjson"] = (orjson.loads, orjson.dumps)
+    except ModuleNotFoundError:
+        pass
+    try:
+        import msgspec  # noqa: PLC0415
+
+        found["msgspec"] = (msgspec.json.decode, msgspec.json.encode)
+    except ModuleNotFoundError:
+        pass
+    return found
+
+
+def main() -> None:
+    decoded = [json.loads(envelope) for envelope in ENVELOPES]
+    for name, (loads, dumps) in backends().items():
+        load_time = timeit.timeit(
+            lambda loads=loads: [loads(e) for e in ENVELOPES], number=NUMBER
+        )
+        dump_time = timeit.timeit(
+            lambda dumps=dumps: [dumps(e) for e in decoded], number=NUMBER
+        )
+        per_envelope = 1e6 / (NUMBER * len(ENVELOPES))
+        print(  # noqa: T201
+            f"{name:8} loads {load_time * per_envelope:6.2f} µs"
+            f"  dumps {dump_time * per_envelope:6.2f} µs per envelope"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Time `Message.parse` on received envelopes.
+
+Run with `python -m benchmarks.parse` from the repository root, it shares the
+envelopes of `benchmarks/codec.py`. Attachments are parsed lazily so that nothing
+is downloaded.
+"""
+
+import asyncio
+import time
+
+from benchmarks.codec import ENVELOPES
+from signalbot.api import SignalAPI
+from signalbot.message import Message
+
+NUMBER = 20_000
+
+
+async def main() -> None:
+    signal = SignalAPI("127.0.0.1:8080", "+49123456789", lazy_attachments=True)
+    start = time.perf_counter()
+    for _ in range(NUMBER):
+        for envelope in ENVELOPES:
+            await Message.parse(signal, envelope)
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed * 1e6 / (NUMBER * len(ENVELOPES)):.2f} µs per envelope")  # noqa: T201
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
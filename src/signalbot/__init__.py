@@ -2,49 +2,108 @@ import importlib.metadata
 
 from signalbot.api import (
     ConnectionMode,
+    ConnectionPool,
     ReceiveMessagesError,
     SendMessageError,
     SignalAPI,
 )
+from signalbot.attachment import Attachment
+from signalbot.attachment_cache import AttachmentCache
+from signalbot.autoscale import AutoscaleStats, ConsumerAutoscaler
 from signalbot.bot import (
     LOGGER_NAME,
     MIN_SIGNAL_CLI_REST_API_VERSION,
+    SendManyResult,
     SignalBot,
     enable_console_logging,
 )
-from signalbot.bot_config import Config, InMemoryConfig, RedisConfig, SQLiteConfig
+from signalbot.bot_config import (
+    AttachmentCacheConfig,
+    AutoscaleConfig,
+    CircuitBreakerConfig,
+    Config,
+    ConnectionPoolConfig,
+    InMemoryConfig,
+    PollingConfig,
+    RateLimitConfig,
+    ReceiveConfig,
+    RedisConfig,
+    RetryConfig,
+    SQLiteConfig,
+)
+from signalbot.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+from signalbot.classifier import ClassifierStats, EnvelopeClassifier
 from signalbot.command import (
     Command,
     CommandError,
+    Priority,
+    Trigger,
     reaction_triggered,
     regex_triggered,
     triggered,
 )
 from signalbot.context import Context
+from signalbot.dispatch import OverflowPolicy, QueueStats
 from signalbot.link_previews import LinkPreview
+from signalbot.manager import SignalBotManager
 from signalbot.message import Message, MessageType, Quote, UnknownMessageFormatError
+from signalbot.outbound import OutboundScheduler, OutboundStats
 from signalbot.reaction import Reaction
+from signalbot.receive import ReceiveMode, ReceiveMonitor, ReceiveStats
+from signalbot.retry import RetryPolicy
+from signalbot.upload import AttachmentSource
 
 __all__ = [
     "LOGGER_NAME",
     "MIN_SIGNAL_CLI_REST_API_VERSION",
+    "Attachment",
+    "AttachmentCache",
+    "AttachmentCacheConfig",
+    "AttachmentSource",
+    "AutoscaleConfig",
+    "AutoscaleStats",
+    "CircuitBreaker",
+    "CircuitBreakerConfig",
+    "CircuitOpenError",
+    "CircuitState",
+    "ClassifierStats",
     "Command",
     "CommandError",
     "Config",
     "ConnectionMode",
+    "ConnectionPool",
+    "ConnectionPoolConfig",
+    "ConsumerAutoscaler",
     "Context",
+    "EnvelopeClassifier",
     "InMemoryConfig",
     "LinkPreview",
     "Message",
     "MessageType",
+    "OutboundScheduler",
+    "OutboundStats",
+    "OverflowPolicy",
+    "PollingConfig",
+    "Priority",
+    "QueueStats",
     "Quote",
+    "RateLimitConfig",
     "Reaction",
+    "ReceiveConfig",
     "ReceiveMessagesError",
+    "ReceiveMode",
+    "ReceiveMonitor",
+    "ReceiveStats",
     "RedisConfig",
+    "RetryConfig",
+    "RetryPolicy",
     "SQLiteConfig",
+    "SendManyResult",
     "SendMessageError",
     "SignalAPI",
     "SignalBot",
+    "SignalBotManager",
+    "Trigger",
     "UnknownMessageFormatError",
     "enable_console_logging",
     "reaction_triggered",
@@ -1,14 +1,31 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import logging
+import shutil
 from enum import Enum
+from pathlib import Path
 from typing import TYPE_CHECKING, Any, Literal
+from urllib.parse import urlencode
 
 import aiohttp
 import websockets
 
+from signalbot import codec
+from signalbot.attachment import ATTACHMENT_CHUNK_SIZE
+from signalbot.circuit_breaker import CircuitBreaker
+from signalbot.receive import AdaptivePollInterval, ReceiveMonitor
+from signalbot.retry import NO_RETRY, RetryPolicy
+from signalbot.upload import is_replayable, iter_json_body
+
 if TYPE_CHECKING:
-    from collections.abc import AsyncIterator
+    from collections.abc import AsyncIterable, AsyncIterator, Callable, Mapping
+
+    from signalbot.attachment_cache import AttachmentCache
+    from signalbot.upload import AttachmentSource
+
+logger = logging.getLogger(__name__)
 
 
 class ConnectionMode(str, Enum):
@@ -26,15 +43,84 @@ class ConnectionMode(str, Enum):
 
 
 HEALTH_CHECK_GOOD_STATUS = 204
+SERVER_ERROR_STATUS = 500
+ATTACHMENT_READ_TIMEOUT = 60.0
+# Uploads take as long as the attachments need, only a stalled one is given up
+UPLOAD_TIMEOUT = aiohttp.ClientTimeout(
+    total=None, sock_connect=30.0, sock_read=ATTACHMENT_READ_TIMEOUT
+)
+
+
+class ConnectionPool:
+    """A long-lived `aiohttp` session shared by all requests to `signal-cli-rest-api`.
+
+    The session is created lazily on first use, so that it is bound to the running
+    event loop, and it is kept open until `aclose()` is called. Reusing it avoids a
+    new TCP (and TLS) handshake for every request.
+
+    Args:
+        limit: Maximum number of simultaneous connections, `0` means no limit.
+        limit_per_host: Maximum number of simultaneous connections to the same
+            host, `0` means no limit.
+        keepalive_timeout: Seconds an idle connection is kept open for reuse.
+        dns_cache_ttl: Seconds resolved host names are cached, `None` caches them
+            forever.
+    """
+
+    def __init__(
+        self,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int | None = 300,
+    ) -> None:
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._session: aiohttp.ClientSession | None = None
+
+    def session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it if needed."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, json_serialize=codec.dumps
+            )
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close the shared session and all pooled connections."""
+        if self._session is not None:
+            session, self._session = self._session, None
+            await session.close()
 
 
 class SignalAPI:
-    def __init__(  # noqa: ANN204
+    def __init__(  # noqa: ANN204, PLR0913
         self,
         signal_service: str,
         phone_number: str,
         download_attachments: bool = True,  # noqa: FBT001, FBT002
         connection_mode: ConnectionMode = ConnectionMode.AUTO,
+        pool: ConnectionPool | None = None,
+        *,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        attachment_spool_dir: Path | str | None = None,
+        lazy_attachments: bool = False,
+        max_downloads: int = 8,
+        max_downloads_per_message: int = 4,
+        attachment_cache: AttachmentCache | None = None,
+        receive_monitor: ReceiveMonitor | None = None,
+        keep_raw_messages: bool = True,
     ):
         self.phone_number = phone_number
         self.connection_mode = connection_mode
@@ -45,24 +131,228 @@ class SignalAPI:
             use_https=use_https,
         )
         self.download_attachments = download_attachments
+        self.pool = pool if pool is not None else ConnectionPool()
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.circuit_breaker = (
+            circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        )
+        self.attachment_spool_dir = (
+            Path(attachment_spool_dir) if attachment_spool_dir is not None else None
+        )
+        self.lazy_attachments = lazy_attachments
+        self.keep_raw_messages = keep_raw_messages
+        # Shared by all messages, so bursts of attachments cannot flood the service
+        self.download_semaphore = asyncio.Semaphore(max_downloads)
+        self.max_downloads_per_message = max_downloads_per_message
+        self.attachment_cache = attachment_cache
+        self.receive_monitor = (
+            receive_monitor if receive_monitor is not None else ReceiveMonitor()
+        )
+        # Query parameters filtering what signal-cli-rest-api sends, e.g. stories
+        self.receive_params: dict[str, str] = {}
+
+    async def aclose(self) -> None:
+        """Release the pooled HTTP connections."""
+        await self.pool.aclose()
+
+    async def _request(  # noqa: C901, PLR0913
+        self,
+        method: Literal["get", "post", "put", "delete"],
+        uri: str,
+        error: type[Exception],
+        *,
+        idempotent: bool | None = None,
+        retry: bool = True,
+        probe: bool = False,
+        body: Callable[[], AsyncIterable[bytes]] | None = None,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> aiohttp.ClientResponse:
+        """Send a request on the shared session and read the whole response body.
+
+        The body is buffered before returning, so the connection goes back to the pool
+        and `.json()`/`.read()` keep working on the returned response. Failures are
+        retried according to `retry_policy`, requests are considered idempotent unless
+        they are `POST`s.
+
+        A streamed request `body` is created anew for every attempt.
+
+        Every attempt is bounded by the remaining retry deadline, except uploads of
+        attachments: a streamed `body` or a `json` payload with
+        `base64_attachments`. Those are only bounded by `UPLOAD_TIMEOUT`, the retry
+        deadline then only limits when they are retried.
+
+        Every attempt has to pass the `circuit_breaker` and reports its outcome to it.
+        Probes, i.e. health checks, bypass an open circuit and are recorded as such.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+        """
+        if idempotent is None:
+            idempotent = method != "post"
+        policy = self.retry_policy if retry else NO_RETRY
+        deadline = policy.deadline_at(policy.now())
+        payload = kwargs.get("json")
+        upload = body is not None or (
+            isinstance(payload, dict) and bool(payload.get("base64_attachments"))
+        )
+
+        attempt = 0
+        while True:
+            attempt += 1
+            if upload:
+                kwargs["timeout"] = UPLOAD_TIMEOUT
+            elif deadline is not None:
+                remaining = max(deadline - policy.now(), 0.001)
+                kwargs["timeout"] = aiohttp.ClientTimeout(total=remaining)
+            if body is not None:
+                kwargs["data"] = body()
+
+            if not probe:
+                self.circuit_breaker.before_request()
+            try:
+                resp = await self._request_once(method, uri, **kwargs)
+            except (
+                aiohttp.ClientError,
+                aiohttp.http_exceptions.HttpProcessingError,
+                asyncio.TimeoutError,
+            ) as exc:
+                self._record_outcome(exc, probe=probe)
+                delay = policy.delay(attempt, exc)
+                if (
+                    attempt >= policy.max_attempts
+                    or not policy.is_retryable(exc, idempotent=idempotent)
+                    or (deadline is not None and policy.now() + delay >= deadline)
+                ):
+                    raise error from exc
+
+                logger.warning(
+                    "%s %s failed (%r), retrying in %0.2f seconds",
+                    method.upper(),
+                    uri,
+                    exc,
+                    delay,
+                )
+            except BaseException:
+                if not probe:
+                    self.circuit_breaker.release()
+                raise
+            else:
+                self._record_outcome(None, probe=probe)
+                return resp
+
+            await asyncio.sleep(delay)
+
+    def _record_outcome(self, exc: Exception | None, *, probe: bool) -> None:
+        # Client errors prove that the service is responsive
+        failed = exc is not None and not (
+            isinstance(exc, aiohttp.ClientResponseError)
+            and exc.status < SERVER_ERROR_STATUS
+        )
+        if probe:
+            self.circuit_breaker.record_health_check(healthy=not failed)
+        elif failed:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+
+    async def _request_once(
+        self,
+        method: Literal["get", "post", "put", "delete"],
+        uri: str,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> aiohttp.ClientResponse:
+        session = self.pool.session()
+        resp = await getattr(session, method)(uri, **kwargs)
+        resp.raise_for_status()
+        await resp.read()
+        return resp
 
     async def receive(self) -> AsyncIterator[str]:
+        """Yield received messages until the connection is closed.
+
+        The connection is watched by `receive_monitor`, which aborts it once it stalls.
+        """
+        monitor = self.receive_monitor
         try:
-            uri = self._signal_api_uris.receive_ws_uri()
+            uri = self._signal_api_uris.receive_ws_uri(self.receive_params)
             self.connection = websockets.connect(uri, ping_interval=None)
             async with self.connection as websocket:
-                async for raw_message in websocket:
-                    yield raw_message
+                monitor.connected()
+                watchdog = asyncio.create_task(monitor.watch(websocket))
+                try:
+                    async for raw_message in websocket:
+                        monitor.activity()
+                        yield raw_message
+                finally:
+                    watchdog.cancel()
 
         except Exception as e:
             raise ReceiveMessagesError from e
+        finally:
+            monitor.disconnected()
+
+    async def receive_batch(
+        self, *, timeout: float = 1.0, max_messages: int | None = None
+    ) -> list[str]:
+        """Fetch the messages received since the last call with `GET /v1/receive`.
+
+        Only available in the `normal` and `native` modes of `signal-cli-rest-api`.
+
+        Args:
+            timeout: Seconds `signal-cli` waits for further messages.
+            max_messages: Maximum number of messages to return, `None` returns all.
+
+        Returns:
+            The raw JSON messages, in the same format as yielded by `receive()`.
+        """
+        uri = self._signal_api_uris.receive_rest_uri()
+        params = {**self.receive_params, "timeout": str(timeout)}
+        if max_messages is not None:
+            params["max_messages"] = str(max_messages)
+
+        # Fetched messages are gone from the server, retrying could only lose them
+        resp = await self._request(
+            "get", uri, ReceiveMessagesError, idempotent=False, params=params
+        )
+        envelopes = await resp.json(loads=codec.loads)
+        return [codec.dumps(envelope) for envelope in envelopes or []]
+
+    async def receive_polling(
+        self,
+        interval: AdaptivePollInterval | None = None,
+        *,
+        timeout: float = 1.0,
+        max_messages: int | None = None,
+    ) -> AsyncIterator[str]:
+        """Yield received messages by polling `receive_batch()` forever.
+
+        The pause between two polls is adapted to the traffic by `interval`.
+        """
+        if interval is None:
+            interval = AdaptivePollInterval()
+        monitor = self.receive_monitor
+        monitor.connected()
+        try:
+            while True:
+                batch = await self.receive_batch(
+                    timeout=timeout, max_messages=max_messages
+                )
+                monitor.activity()
+                for raw_message in batch:
+                    yield raw_message
+                delay = interval.next(len(batch))
+                if delay > 0:
+                    await asyncio.sleep(delay)
+        finally:
+            monitor.disconnected()
 
     async def send(  # noqa: C901, PLR0913
         self,
-        receiver: str,
+        receiver: str | list[str],
         message: str,
         *,
         base64_attachments: list | None = None,
+        attachments: list[AttachmentSource] | None = None,
         link_preview: dict[str, Any] | None = None,
         quote_author: str | None = None,
         quote_mentions: list | None = None,
@@ -81,7 +371,7 @@ class SignalAPI:
             "base64_attachments": base64_attachments,
             "message": message,
             "number": self.phone_number,
-            "recipients": [receiver],
+            "recipients": [receiver] if isinstance(receiver, str) else receiver,
         }
 
         if quote_author:
@@ -103,17 +393,17 @@ class SignalAPI:
         if view_once:
             payload["view_once"] = True
 
-        try:
-            async with aiohttp.ClientSession() as session:
-                resp = await session.post(uri, json=payload)
-                resp.raise_for_status()
-                return resp
-        except (
-            aiohttp.ClientError,
-            aiohttp.http_exceptions.HttpProcessingError,
-            KeyError,
-        ) as exc:
-            raise SendMessageError from exc
+        if attachments:
+            # Encoded while uploading, so the files never have to fit in memory
+            return await self._request(
+                "post",
+                uri,
+                SendMessageError,
+                retry=all(is_replayable(a) for a in attachments),
+                body=lambda: iter_json_body(payload, attachments),
+                headers={"Content-Type": "application/json"},
+            )
+        return await self._request("post", uri, SendMessageError, json=payload)
 
     async def poll(
         self,
@@ -131,17 +421,7 @@ class SignalAPI:
             "allow_multiple_selections": allow_multiple_selections,
         }
 
-        try:
-            async with aiohttp.ClientSession() as session:
-                resp = await session.post(uri, json=payload)
-                resp.raise_for_status()
-                return resp
-        except (
-            aiohttp.ClientError,
-            aiohttp.http_exceptions.HttpProcessingError,
-            KeyError,
-        ) as exc:
-            raise SendMessageError from exc
+        return await self._request("post", uri, SendMessageError, json=payload)
 
     async def react(
         self,
@@ -157,16 +437,7 @@ class SignalAPI:
             "target_author": target_author,
             "timestamp": timestamp,
         }
-        try:
-            async with aiohttp.ClientSession() as session:
-                resp = await session.post(uri, json=payload)
-                resp.raise_for_status()
-                return resp
-        except (
-            aiohttp.ClientError,
-            aiohttp.http_exceptions.HttpProcessingError,
-        ) as exc:
-            raise ReactionError from exc
+        return await self._request("post", uri, ReactionError, json=payload)
 
     async def receipt(
         self,
@@ -180,105 +451,134 @@ class SignalAPI:
             "receipt_type": receipt_type,
             "timestamp": timestamp,
         }
-        try:
-            async with aiohttp.ClientSession() as session:
-                resp = await session.post(uri, json=payload)
-                resp.raise_for_status()
-                return resp
-        except (
-            aiohttp.ClientError,
-            aiohttp.http_exceptions.HttpProcessingError,
-        ) as exc:
-            raise ReactionError from exc
+        return await self._request("post", uri, ReactionError, json=payload)
 
     async def start_typing(self, receiver: str) -> aiohttp.ClientResponse:
         uri = self._signal_api_uris.typing_indicator_uri()
         payload = {
             "recipient": receiver,
         }
-        try:
-            async with aiohttp.ClientSession() as session:
-                resp = await session.put(uri, json=payload)
-                resp.raise_for_status()
-                return resp
-        except (
-            aiohttp.ClientError,
-            aiohttp.http_exceptions.HttpProcessingError,
-        ) as exc:
-            raise StartTypingError from exc
+        return await self._request("put", uri, StartTypingError, json=payload)
 
     async def stop_typing(self, receiver: str) -> aiohttp.ClientResponse:
         uri = self._signal_api_uris.typing_indicator_uri()
         payload = {
             "recipient": receiver,
         }
-        try:
-            async with aiohttp.ClientSession() as session:
-                resp = await session.delete(uri, json=payload)
-                resp.raise_for_status()
-                return resp
-        except (
-            aiohttp.ClientError,
-            aiohttp.http_exceptions.HttpProcessingError,
-        ) as exc:
-            raise StopTypingError from exc
+        return await self._request("delete", uri, StopTypingError, json=payload)
 
     async def get_groups(self) -> list[dict[str, Any]]:
         uri = self._signal_api_uris.groups_uri()
-        try:
-            async with aiohttp.ClientSession() as session:
-                resp = await session.get(uri)
-                resp.raise_for_status()
-                return await resp.json()
-        except (
-            aiohttp.ClientError,
-            aiohttp.http_exceptions.HttpProcessingError,
-        ) as exc:
-            raise GroupsError from exc
+        resp = await self._request("get", uri, GroupsError)
+        return await resp.json(loads=codec.loads)
 
     async def get_group(self, group_id: str) -> dict[str, Any]:
         uri = self._signal_api_uris.group_id_uri(group_id)
-        try:
-            async with aiohttp.ClientSession() as session:
-                resp = await session.get(uri)
-                resp.raise_for_status()
-                return await resp.json()
-        except (
-            aiohttp.ClientError,
-            aiohttp.http_exceptions.HttpProcessingError,
-        ) as exc:
-            raise GroupsError from exc
+        resp = await self._request("get", uri, GroupsError)
+        return await resp.json(loads=codec.loads)
 
     async def get_attachment(self, attachment_id: str) -> str:
+        cache = self.attachment_cache
+        if cache is not None:
+            cached = await cache.get_base64(attachment_id)
+            if cached is not None:
+                return cached
+
         uri = f"{self._signal_api_uris.attachment_rest_uri()}/{attachment_id}"
-        try:
-            async with aiohttp.ClientSession() as session:
-                resp = await session.get(uri)
-                resp.raise_for_status()
-                content = await resp.content.read()
-        except (
-            aiohttp.ClientError,
-            aiohttp.http_exceptions.HttpProcessingError,
-        ) as exc:
-            raise GetAttachmentError from exc
+        resp = await self._request("get", uri, GetAttachmentError)
+        content = await resp.read()
+
+        if cache is not None:
+            await cache.put(attachment_id, content)
 
         base64_bytes = base64.b64encode(content)
         base64_string = str(base64_bytes, encoding="utf-8")
 
         return base64_string  # noqa: RET504
 
-    async def delete_attachment(self, attachment_id: str) -> str:
+    async def stream_attachment(
+        self, attachment_id: str, chunk_size: int = ATTACHMENT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """Download an attachment in chunks of at most `chunk_size` bytes.
+
+        Unlike `get_attachment`, the content is never held in memory as a whole.
+        Streams are not retried, as they cannot be resumed transparently.
+        """
         uri = f"{self._signal_api_uris.attachment_rest_uri()}/{attachment_id}"
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=ATTACHMENT_READ_TIMEOUT)
+
+        self.circuit_breaker.before_request()
         try:
-            async with aiohttp.ClientSession() as session:
-                resp = await session.delete(uri)
-                resp.raise_for_status()
-                return resp
+            resp = await self.pool.session().get(uri, timeout=timeout)
+            resp.raise_for_status()
         except (
             aiohttp.ClientError,
             aiohttp.http_exceptions.HttpProcessingError,
+            asyncio.TimeoutError,
         ) as exc:
+            self._record_outcome(exc, probe=False)
             raise GetAttachmentError from exc
+        except BaseException:
+            self.circuit_breaker.release()
+            raise
+        self._record_outcome(None, probe=False)
+
+        try:
+            async for chunk in resp.content.iter_chunked(chunk_size):
+                yield chunk
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            raise GetAttachmentError from exc
+        finally:
+            resp.release()
+
+    async def download_attachment(self, attachment_id: str, path: Path) -> Path:
+        """Stream an attachment into the file `path`.
+
+        The content is written to a temporary file next to `path` first, so `path`
+        only ever contains complete attachments.
+
+        Returns:
+            The path the attachment was written to.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if self.attachment_cache is not None:
+            cached = self.attachment_cache.path(attachment_id)
+            if cached is not None:
+                await asyncio.to_thread(shutil.copyfile, cached, path)
+                return path
+
+        part_path = path.with_name(f"{path.name}.part")
+        try:
+            with part_path.open("wb") as f:
+                async for chunk in self.stream_attachment(attachment_id):
+                    f.write(chunk)
+            part_path.replace(path)
+        finally:
+            part_path.unlink(missing_ok=True)
+        return path
+
+    async def encode_attachment(self, attachment: bytes | Path | str) -> str:
+        """Encode an attachment as base64 for `send`.
+
+        With an `attachment_cache`, a file or content that was encoded before is
+        reused instead of being encoded again.
+
+        Args:
+            attachment: The content of the attachment, or the path of a file.
+        """
+        cache = self.attachment_cache
+        if isinstance(attachment, bytes):
+            if cache is not None:
+                return await cache.encode(attachment)
+            return base64.b64encode(attachment).decode("ascii")
+        if cache is not None:
+            return await cache.encode_file(attachment)
+        content = await asyncio.to_thread(Path(attachment).read_bytes)
+        return base64.b64encode(content).decode("ascii")
+
+    async def delete_attachment(self, attachment_id: str) -> str:
+        uri = f"{self._signal_api_uris.attachment_rest_uri()}/{attachment_id}"
+        return await self._request("delete", uri, GetAttachmentError)
 
     async def update_contact(
         self,
@@ -295,16 +595,7 @@ class SignalAPI:
         if name is not None:
             payload["name"] = name
 
-        try:
-            async with aiohttp.ClientSession() as session:
-                resp = await session.put(uri, json=payload)
-                resp.raise_for_status()
-                return resp
-        except (
-            aiohttp.ClientError,
-            aiohttp.http_exceptions.HttpProcessingError,
-        ) as exc:
-            raise ContactUpdateError from exc
+        return await self._request("put", uri, ContactUpdateError, json=payload)
 
     async def update_group(
         self,
@@ -329,29 +620,13 @@ class SignalAPI:
         if name is not None:
             payload["name"] = name
 
-        try:
-            async with aiohttp.ClientSession() as session:
-                resp = await session.put(uri, json=payload)
-                resp.raise_for_status()
-                return resp
-        except (
-            aiohttp.ClientError,
-            aiohttp.http_exceptions.HttpProcessingError,
-        ) as exc:
-            raise ContactUpdateError from exc
+        return await self._request("put", uri, ContactUpdateError, json=payload)
 
     async def health_check(self) -> aiohttp.ClientResponse:
         uri = self._signal_api_uris.health_check_uri()
-        try:
-            async with aiohttp.ClientSession() as session:
-                resp = await session.get(uri)
-                resp.raise_for_status()
-                return resp
-        except (
-            aiohttp.ClientError,
-            aiohttp.http_exceptions.HttpProcessingError,
-        ) as exc:
-            raise HealthCheckError from exc
+        return await self._request(
+            "get", uri, HealthCheckError, retry=False, probe=True
+        )
 
     async def _is_signal_service_available(self) -> bool:
         try:
@@ -373,16 +648,8 @@ class SignalAPI:
 
     async def get_signal_cli_about(self) -> dict[str, Any]:
         uri = self._signal_api_uris.about_rest_uri()
-        try:
-            async with aiohttp.ClientSession() as session:
-                resp = await session.get(uri)
-                resp.raise_for_status()
-                return await resp.json()
-        except (
-            aiohttp.ClientError,
-            aiohttp.http_exceptions.HttpProcessingError,
-        ) as exc:
-            raise AboutError from exc
+        resp = await self._request("get", uri, AboutError)
+        return await resp.json(loads=codec.loads)
 
     async def get_signal_cli_rest_api_version(self) -> str:
         return (await self.get_signal_cli_about())["version"]
@@ -398,16 +665,9 @@ class SignalAPI:
             "recipient": receiver,
             "timestamp": timestamp,
         }
-        try:
-            async with aiohttp.ClientSession() as session:
-                resp = await session.delete(uri, json=payload)
-                resp.raise_for_status()
-                return resp
-        except (
-            aiohttp.ClientError,
-            aiohttp.http_exceptions.HttpProcessingError,
-        ) as exc:
-            raise RemoteDeleteError from exc
+        return await self._request(
+            "delete", uri, RemoteDeleteError, idempotent=False, json=payload
+        )
 
 
 class SignalAPIURIs:
@@ -427,10 +687,14 @@ class SignalAPIURIs:
     def attachment_rest_uri(self) -> str:
         return f"{self.https_or_http}://{self.signal_service}/v1/attachments"
 
-    def receive_ws_uri(self) -> str:
-        return (
-            f"{self.wss_or_ws}://{self.signal_service}/v1/receive/{self.phone_number}"
-        )
+    def receive_ws_uri(self, params: Mapping[str, str] | None = None) -> str:
+        uri = f"{self.wss_or_ws}://{self.signal_service}/v1/receive/{self.phone_number}"
+        if params:
+            uri += f"?{urlencode(params)}"
+        return uri
+
+    def receive_rest_uri(self) -> str:
+        return f"{self.https_or_http}://{self.signal_service}/v1/receive/{self.phone_number}"
 
     def send_rest_uri(self) -> str:
         return f"{self.https_or_http}://{self.signal_service}/v2/send"
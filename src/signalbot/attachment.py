@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from signalbot.api import SignalAPI
+
+ATTACHMENT_CHUNK_SIZE = 256 * 1024
+"""
+The default size in bytes of the chunks attachments are streamed in.
+"""
+
+
+@dataclass
+class Attachment:
+    """A file attached to a received message.
+
+    Only the metadata is kept in memory. The content is streamed from
+    `signal-cli-rest-api`, or read from `path` once the attachment was downloaded,
+    so large files never have to fit in memory. `read()` and `base64()` fetch the
+    content on first access only and remember it.
+
+    Attributes:
+        id: The local filename of the attachment in `signal-cli`.
+        content_type: The MIME type of the attachment, if known.
+        filename: The original filename of the attachment, if known.
+        size: The size of the attachment in bytes, if known.
+        path: The local copy of the attachment, if it was downloaded.
+    """
+
+    id: str
+    content_type: str | None = None
+    filename: str | None = None
+    size: int | None = None
+    path: Path | None = None
+    signal: SignalAPI | None = field(default=None, repr=False, compare=False)
+    _content: bytes | None = field(default=None, init=False, repr=False, compare=False)
+    _base64: str | None = field(default=None, init=False, repr=False, compare=False)
+    _fetching: asyncio.Future[bytes] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    async def aiter_chunks(
+        self, chunk_size: int = ATTACHMENT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """Iterate over the content of the attachment in chunks of `chunk_size` bytes.
+
+        Raises:
+            GetAttachmentError: If the attachment cannot be downloaded.
+        """
+        if self.path is not None:
+            with self.path.open("rb") as f:
+                while chunk := await asyncio.to_thread(f.read, chunk_size):
+                    yield chunk
+            return
+
+        async for chunk in self._signal().stream_attachment(self.id, chunk_size):
+            yield chunk
+
+    async def read(self) -> bytes:
+        """Return the content of the attachment.
+
+        It is fetched on first access only, concurrent callers share one download.
+
+        Raises:
+            GetAttachmentError: If the attachment cannot be downloaded.
+        """
+        if self._content is None:
+            if self._fetching is None:
+                self._fetching = asyncio.ensure_future(self._read_chunks())
+            fetching = self._fetching
+            try:
+                # A cancelled caller must not abort the download for the others
+                self._content = await asyncio.shield(fetching)
+            finally:
+                if fetching.done() and self._fetching is fetching:
+                    self._fetching = None
+        return self._content
+
+    async def base64(self) -> str:
+        """Return the content of the attachment encoded as base64.
+
+        Raises:
+            GetAttachmentError: If the attachment cannot be downloaded.
+        """
+        if self._base64 is None:
+            self._base64 = base64.b64encode(await self.read()).decode("ascii")
+        return self._base64
+
+    async def _read_chunks(self) -> bytes:
+        cache = self.signal.attachment_cache if self.signal is not None else None
+        if cache is not None and self.path is None:
+            content = await cache.get(self.id)
+            if content is not None:
+                return content
+
+        content = b"".join([chunk async for chunk in self.aiter_chunks()])
+        if cache is not None and self.path is None:
+            await cache.put(self.id, content)
+        return content
+
+    async def download(self, path: Path | str) -> Path:
+        """Stream the attachment into the file `path` and remember it as `path`.
+
+        Returns:
+            The path the attachment was written to.
+        """
+        self.path = await self._signal().download_attachment(self.id, Path(path))
+        return self.path
+
+    def remove(self) -> None:
+        """Delete the downloaded copy of the attachment, if there is one.
+
+        The content can still be streamed from `signal-cli-rest-api` afterwards.
+        """
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+            self.path = None
+
+    def open(self) -> BinaryIO:
+        """Open the downloaded attachment for reading in binary mode.
+
+        Raises:
+            FileNotFoundError: If the attachment has not been downloaded.
+        """
+        if self.path is None:
+            error_msg = f"Attachment {self.id} has not been downloaded"
+            raise FileNotFoundError(error_msg)
+        return self.path.open("rb")
+
+    def _signal(self) -> SignalAPI:
+        if self.signal is None:
+            error_msg = f"Attachment {self.id} is not bound to a SignalAPI"
+            raise RuntimeError(error_msg)
+        return self.signal
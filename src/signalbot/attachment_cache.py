@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import logging
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class AttachmentCache:
+    """A content-addressed cache for attachments on local disk.
+
+    Every attachment is stored once under the SHA-256 digest of its content, no
+    matter how often it is received or sent. The cache remembers which attachment
+    ids resolved to which content, so repeated downloads of the same attachment, like
+    link preview thumbnails, never reach `signal-cli-rest-api` again. Both the content
+    and these ids are kept on disk and picked up again after a restart.
+
+    The least recently used content is evicted once the cache exceeds `max_bytes`.
+    Items of up to `memory_item_max_bytes` are additionally kept in memory as base64
+    strings, up to `memory_max_bytes` in total, so that small and frequent media like
+    stickers are neither read from disk nor encoded again.
+
+    Args:
+        directory: The directory the content is stored in, it is created if needed.
+        max_bytes: Disk budget in bytes.
+        memory_max_bytes: Memory budget in bytes for the in-memory tier.
+        memory_item_max_bytes: Size in bytes up to which items are kept in memory.
+    """
+
+    _MAX_SOURCES = 1024
+
+    def __init__(
+        self,
+        directory: Path | str,
+        *,
+        max_bytes: int = 256 * 1024 * 1024,
+        memory_max_bytes: int = 16 * 1024 * 1024,
+        memory_item_max_bytes: int = 256 * 1024,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.memory_max_bytes = memory_max_bytes
+        self.memory_item_max_bytes = memory_item_max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[str, int] = OrderedDict()  # digest -> size
+        self._size = 0
+        self._hot: OrderedDict[str, str] = OrderedDict()  # digest -> base64
+        self._hot_size = 0
+        self._ids: dict[str, str] = {}  # attachment id -> digest
+        self._ids_by_digest: dict[str, set[str]] = {}
+        # (path, size, mtime) of files sent before -> digest
+        self._sources: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    @property
+    def size(self) -> int:
+        """Number of bytes stored on disk."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, attachment_id: str) -> bool:
+        return attachment_id in self._ids
+
+    def path(self, attachment_id: str) -> Path | None:
+        """Return the cached file of an attachment, if it is cached."""
+        digest = self._ids.get(attachment_id)
+        if digest is None or digest not in self._entries:
+            return None
+        self._touch(digest)
+        return self._path(digest)
+
+    async def get(self, attachment_id: str) -> bytes | None:
+        """Return the content of an attachment, if it is cached."""
+        digest = self._lookup(attachment_id)
+        if digest is None:
+            return None
+        encoded = self._hot.get(digest)
+        if encoded is not None:
+            return base64.b64decode(encoded)
+        return await self._read(digest)
+
+    async def get_base64(self, attachment_id: str) -> str | None:
+        """Return the content of an attachment encoded as base64, if it is cached."""
+        digest = self._lookup(attachment_id)
+        if digest is None:
+            return None
+        return await self._base64(digest)
+
+    async def put(self, attachment_id: str, content: bytes) -> str:
+        """Store the content of an attachment.
+
+        Returns:
+            The SHA-256 digest of the content.
+        """
+        digest = await self._store(content)
+        if digest in self._entries and self._ids.get(attachment_id) != digest:
+            self._link(attachment_id, digest)
+            await asyncio.to_thread(
+                self._write,
+                self._link_path(attachment_id),
+                f"{digest}\n{attachment_id}".encode(),
+            )
+        return digest
+
+    async def encode(self, content: bytes) -> str:
+        """Return `content` encoded as base64, reusing a cached encoding if possible."""
+        return self._encoded(await self._store(content), content)
+
+    async def encode_file(self, path: Path | str) -> str:
+        """Return the content of the file `path` encoded as base64.
+
+        Files are recognized by their path, size and modification time, so a file
+        that was sent before is neither read nor encoded again.
+        """
+        path = Path(path)
+        stat = await asyncio.to_thread(path.stat)
+        source = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+        digest = self._sources.get(source)
+        if digest is not None:
+            self._sources.move_to_end(source)
+            encoded = await self._base64(digest)
+            if encoded is not None:
+                self.hits += 1
+                return encoded
+
+        self.misses += 1
+        content = await asyncio.to_thread(path.read_bytes)
+        digest = await self._store(content)
+        self._sources[source] = digest
+        if len(self._sources) > self._MAX_SOURCES:
+            self._sources.popitem(last=False)
+        return self._encoded(digest, content)
+
+    def _lookup(self, attachment_id: str) -> str | None:
+        digest = self._ids.get(attachment_id)
+        if digest is None or digest not in self._entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touch(digest)
+        return digest
+
+    def _encoded(self, digest: str, content: bytes) -> str:
+        encoded = self._hot.get(digest)
+        if encoded is None:
+            encoded = base64.b64encode(content).decode("ascii")
+        return encoded
+
+    async def _base64(self, digest: str) -> str | None:
+        encoded = self._hot.get(digest)
+        if encoded is not None:
+            self._hot.move_to_end(digest)
+            return encoded
+        content = await self._read(digest)
+        if content is None:
+            return None
+        encoded = base64.b64encode(content).decode("ascii")
+        self._remember(digest, encoded, len(content))
+        return encoded
+
+    async def _read(self, digest: str) -> bytes | None:
+        try:
+            return await asyncio.to_thread(self._path(digest).read_bytes)
+        except FileNotFoundError:
+            # Removed behind our back, or evicted while reading
+            self._forget(digest)
+            return None
+
+    async def _store(self, content: bytes) -> str:
+        digest = hashlib.sha256(content).hexdigest()
+        if digest in self._entries:
+            self._touch(digest)
+            return digest
+        if len(content) > self.max_bytes:
+            return digest  # would evict everything else, and itself
+
+        await asyncio.to_thread(self._write, self._path(digest), content)
+        if digest not in self._entries:
+            self._entries[digest] = len(content)
+            self._size += len(content)
+        if len(content) <= self.memory_item_max_bytes:
+            self._remember(
+                digest, base64.b64encode(content).decode("ascii"), len(content)
+            )
+        self._evict()
+        return digest
+
+    @staticmethod
+    def _write(path: Path, content: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = path.with_name(f"{path.name}.part")
+        try:
+            part_path.write_bytes(content)
+            part_path.replace(path)
+        finally:
+            part_path.unlink(missing_ok=True)
+
+    def _remember(self, digest: str, encoded: str, size: int) -> None:
+        if size > self.memory_item_max_bytes or digest in self._hot:
+            return
+        self._hot[digest] = encoded
+        self._hot_size += len(encoded)
+        while self._hot_size > self.memory_max_bytes:
+            _, evicted = self._hot.popitem(last=False)
+            self._hot_size -= len(evicted)
+
+    def _touch(self, digest: str) -> None:
+        if digest in self._entries:
+            self._entries.move_to_end(digest)
+        if digest in self._hot:
+            self._hot.move_to_end(digest)
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and self._entries:
+            digest = next(iter(self._entries))
+            self._path(digest).unlink(missing_ok=True)
+            self._forget(digest)
+
+    def _link(self, attachment_id: str, digest: str) -> None:
+        previous = self._ids.get(attachment_id)
+        if previous is not None:
+            self._ids_by_digest[previous].discard(attachment_id)
+        self._ids[attachment_id] = digest
+        self._ids_by_digest.setdefault(digest, set()).add(attachment_id)
+
+    def _forget(self, digest: str) -> None:
+        self._size -= self._entries.pop(digest, 0)
+        encoded = self._hot.pop(digest, None)
+        if encoded is not None:
+            self._hot_size -= len(encoded)
+        for attachment_id in self._ids_by_digest.pop(digest, ()):
+            self._ids.pop(attachment_id, None)
+            self._link_path(attachment_id).unlink(missing_ok=True)
+
+    def _path(self, digest: str) -> Path:
+        return self.directory / digest[:2] / digest
+
+    def _link_path(self, attachment_id: str) -> Path:
+        # Attachment ids are chosen by the sender, do not use them as file names
+        name = hashlib.sha256(attachment_id.encode()).hexdigest()
+        return self.directory / "ids" / name
+
+    def _load(self) -> None:
+        """Pick up content stored by a previous run, least recently used first."""
+        files = []
+        for path in self.directory.glob("??/*"):
+            if path.suffix == ".part":
+                path.unlink(missing_ok=True)
+                continue
+            stat = path.stat()
+            files.append((stat.st_atime, path.name, stat.st_size))
+        for _, digest, size in sorted(files):
+            self._entries[digest] = size
+            self._size += size
+
+        for path in self.directory.glob("ids/*"):
+            if path.suffix != ".part":
+                digest, _, attachment_id = path.read_text().partition("\n")
+                if digest in self._entries:
+                    self._link(attachment_id, digest)
+                    continue
+            path.unlink(missing_ok=True)
+        self._evict()
+        logger.debug("Loaded %d cached attachments (%d bytes)", len(self), self.size)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+@dataclass
+class AutoscaleStats:
+    """Counters of a [signalbot.ConsumerAutoscaler][].
+
+    Attributes:
+        consumers: Number of consumers after the last check.
+        scale_ups: Number of times consumers were added.
+        scale_downs: Number of times a consumer was removed.
+        max_wait: Longest time in seconds a message waited for a consumer since the
+            last check.
+    """
+
+    consumers: int = 0
+    scale_ups: int = 0
+    scale_downs: int = 0
+    max_wait: float = 0.0
+
+
+class ConsumerAutoscaler:
+    """Decides how many consumers handle the received messages.
+
+    The load is checked periodically by the bot, which reports the outcome with
+    `record_scaling()`. Consumers are added as soon as
+    messages pile up or wait too long for a consumer:
+
+    - more than `queue_depth_per_consumer` queued messages per consumer, or
+    - a message waited longer than `scale_up_wait` seconds since the last check.
+
+    The pool then grows by `growth`, up to `max_consumers`. It only shrinks, one
+    consumer at a time down to `min_consumers`, once the queue stayed empty and no
+    message waited longer than `scale_down_wait` seconds for `scale_down_after`
+    seconds. The gap between both thresholds keeps the pool from flapping.
+
+    Args:
+        min_consumers: Lower bound for the number of consumers.
+        max_consumers: Upper bound for the number of consumers.
+        queue_depth_per_consumer: Queued messages per consumer that add consumers.
+        scale_up_wait: Waiting time in seconds of a message that adds consumers.
+        scale_down_wait: Waiting time in seconds below which the load counts as low.
+        scale_down_after: Seconds of low load after which a consumer is removed.
+        growth: Factor the number of consumers grows by.
+        clock: Monotonic clock in seconds, only meant to be replaced in tests.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        min_consumers: int = 1,
+        max_consumers: int = 32,
+        queue_depth_per_consumer: int = 4,
+        scale_up_wait: float = 0.5,
+        scale_down_wait: float = 0.05,
+        scale_down_after: float = 30.0,
+        growth: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 0 < min_consumers <= max_consumers:
+            error_msg = "Expected 0 < min_consumers <= max_consumers"
+            raise ValueError(error_msg)
+        self.min_consumers = min_consumers
+        self.max_consumers = max_consumers
+        self.queue_depth_per_consumer = queue_depth_per_consumer
+        self.scale_up_wait = scale_up_wait
+        self.scale_down_wait = scale_down_wait
+        self.scale_down_after = scale_down_after
+        self.growth = growth
+        self._clock = clock
+        self._max_wait = 0.0
+        self._low_load_since: float | None = None
+        self._stats = AutoscaleStats()
+
+    def record_wait(self, wait: float) -> None:
+        """Record that a message waited `wait` seconds for a consumer."""
+        self._max_wait = max(self._max_wait, wait)
+
+    def stats(self) -> AutoscaleStats:
+        """Return a snapshot of the counters."""
+        return AutoscaleStats(**vars(self._stats))
+
+    def target(self, consumers: int, queue_depth: int) -> int:
+        """Return the number of consumers to run with `consumers` running and
+        `queue_depth` messages queued. Starts a new window of waiting times."""
+        wait, self._max_wait = self._max_wait, 0.0
+        self._stats.max_wait = wait
+        target = min(max(consumers, self.min_consumers), self.max_consumers)
+
+        overloaded = (
+            queue_depth > consumers * self.queue_depth_per_consumer
+            or wait > self.scale_up_wait
+        )
+        if overloaded:
+            self._low_load_since = None
+            target = min(self.max_consumers, math.ceil(target * self.growth))
+        elif queue_depth == 0 and wait < self.scale_down_wait:
+            now = self._clock()
+            if self._low_load_since is None:
+                self._low_load_since = now
+            elif now - self._low_load_since >= self.scale_down_after:
+                self._low_load_since = now  # wait again before the next one
+                target = max(self.min_consumers, target - 1)
+        else:
+            self._low_load_since = None
+        return target
+
+    def record_scaling(self, before: int, after: int) -> None:
+        """Record that `after` consumers run after scaling from `before` towards a
+        `target()`, fewer than targeted if busy consumers could not be stopped."""
+        if after > before:
+            self._stats.scale_ups += 1
+        elif after < before:
+            self._stats.scale_downs += 1
+        self._stats.consumers = after
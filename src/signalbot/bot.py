@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import copy
+import inspect
 import itertools
 import logging
 import re
@@ -9,14 +10,24 @@ import time
 import traceback
 import uuid
 from collections import defaultdict
-from collections.abc import Callable, Mapping
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any, Literal, TypeAlias
 
+import aiohttp
 import phonenumbers
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from packaging.version import Version
 
-from signalbot.api import ReceiveMessagesError, SignalAPI
+from signalbot import codec
+from signalbot.api import (
+    ConnectionPool,
+    ReceiveMessagesError,
+    SendMessageError,
+    SignalAPI,
+)
+from signalbot.attachment_cache import AttachmentCache
+from signalbot.autoscale import ConsumerAutoscaler
 from signalbot.bot_config import (
     Config,
     InMemoryConfig,
@@ -24,15 +35,29 @@ from signalbot.bot_config import (
     SQLiteConfig,
     load_config,
 )
+from signalbot.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+from signalbot.classifier import ClassifierStats, EnvelopeClassifier
 from signalbot.command import Command
 from signalbot.context import Context
+from signalbot.dispatch import InboundQueue, QueueStats, ShardedQueue
 from signalbot.message import Message, MessageType, UnknownMessageFormatError
+from signalbot.outbound import OutboundScheduler
+from signalbot.receive import (
+    AdaptivePollInterval,
+    ReceiveMode,
+    ReceiveMonitor,
+    ReceiveStats,
+)
+from signalbot.retry import RetryPolicy
+from signalbot.router import AccessIndex, CommandRouter
 from signalbot.storage import RedisStorage, SQLiteStorage
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable
     from pathlib import Path
 
     from signalbot.link_previews import LinkPreview
+    from signalbot.upload import AttachmentSource
 
 CommandList: TypeAlias = list[
     tuple[
@@ -53,6 +78,30 @@ MIN_SIGNAL_CLI_REST_API_VERSION = Version("0.95.0")
 The minimum required version of `signal-cli-rest-api` for this version of `signalbot`.
 """
 
+SEND_MANY_CHUNK_SIZE = 50
+"""
+The default number of contacts addressed by a single request of `SignalBot.send_many`.
+"""
+
+SEND_MANY_MAX_CONCURRENCY = 4
+"""
+The default number of requests `SignalBot.send_many` runs at the same time.
+"""
+
+
+@dataclass
+class SendManyResult:
+    """The outcome of [signalbot.SignalBot.send_many()][].
+
+    Attributes:
+        timestamps: The timestamp of the sent message for every receiver it was
+            delivered to, keyed by the receiver as it was passed in.
+        failures: The error for every receiver the message could not be sent to.
+    """
+
+    timestamps: dict[str, int] = field(default_factory=dict)
+    failures: dict[str, Exception] = field(default_factory=dict)
+
 
 def enable_console_logging(level: int = logging.WARNING) -> None:
     """Enable console logging for the signalbot logger.
@@ -84,16 +133,40 @@ class SignalBot:
         groups (list): A list of groups the bot is a member of.
             Only available after `.start()` is called and `init_task` is done.
         storage (SQLiteStorage | RedisStorage): The storage backend used by the bot.
+        outbound (OutboundScheduler | None): The scheduler pacing outgoing requests,
+            `None` if `rate_limit` is not configured. Its `stats()` report the queue
+            depth and waiting times.
+        autoscaler (ConsumerAutoscaler | None): Decides the number of consumers,
+            `None` if `autoscale` is not configured. Its `stats()` report the scaling.
         scheduler (AsyncIOScheduler): The scheduler for running scheduled tasks.
         init_task: The initialization async task for the bot.
             Only available after `.start()` is called.
     """
 
-    def __init__(self, config: Config | Mapping | Path | str) -> None:
+    def __init__(  # noqa: C901, PLR0912, PLR0913, PLR0915
+        self,
+        config: Config | Mapping | Path | str,
+        *,
+        pool: ConnectionPool | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        attachment_cache: AttachmentCache | None = None,
+        scheduler: AsyncIOScheduler | None = None,
+        on_shed: Callable[[Command, Message], object] | None = None,
+    ) -> None:
         """Initilization for the SignalBot.
 
         Args:
             config: the configuration for the bot.
+            pool: A connection pool shared with other bots, it is not closed by
+                `aclose()`. Defaults to a new pool configured by `connection_pool`.
+            circuit_breaker: A circuit breaker shared with other bots talking to the
+                same service. Defaults to a new one configured by `circuit_breaker`.
+            attachment_cache: An attachment cache shared with other bots. Defaults to
+                a new one configured by `attachment_cache`.
+            scheduler: A scheduler shared with other bots. Defaults to a new one.
+            on_shed: Called with the command and the message whenever a message is
+                dropped because the queue is full, see `max_queue_size`. Coroutine
+                functions are run as a task, e.g. to tell the sender to retry later.
 
         Example config:
         ```python
@@ -109,6 +182,9 @@ class SignalBot:
 
         self._commands_to_be_registered: CommandList = []  # populated by .register()
         self.commands: CommandList = []  # populated by .start()
+        self._classifier = EnvelopeClassifier()  # narrowed by .start()
+        self._router: CommandRouter = CommandRouter()  # populated by .start()
+        self._access = AccessIndex([])  # populated by .start()
 
         self.groups = []  # populated by .start()
         self._groups_by_id = {}
@@ -117,12 +193,34 @@ class SignalBot:
 
         self.init_task: None | asyncio.Task = None
 
+        self._owns_pool = pool is None
+        if pool is None:
+            pool = ConnectionPool(**self.config.connection_pool.model_dump())
+        if circuit_breaker is None:
+            circuit_breaker = CircuitBreaker(**self.config.circuit_breaker.model_dump())
+        if attachment_cache is None and self.config.attachment_cache is not None:
+            attachment_cache = AttachmentCache(
+                **self.config.attachment_cache.model_dump()
+            )
+
         try:
             self._signal = SignalAPI(
                 self.config.signal_service,
                 self.config.phone_number,
                 self.config.download_attachments,
                 self.config.connection_mode,
+                pool,
+                retry_policy=RetryPolicy(**self.config.retry.model_dump()),
+                circuit_breaker=circuit_breaker,
+                attachment_spool_dir=self.config.attachment_spool_dir,
+                lazy_attachments=self.config.lazy_attachments,
+                keep_raw_messages=self.config.keep_raw_messages,
+                max_downloads=self.config.max_downloads,
+                max_downloads_per_message=self.config.max_downloads_per_message,
+                attachment_cache=attachment_cache,
+                receive_monitor=ReceiveMonitor(
+                    **self.config.receive.model_dump(exclude={"mode", "polling"})
+                ),
             )
         except KeyError:
             raise SignalBotError("Could not initialize SignalAPI with given config")  # noqa: B904, EM101, TRY003
@@ -133,15 +231,45 @@ class SignalBot:
             self._event_loop = asyncio.new_event_loop()
             asyncio.set_event_loop(self._event_loop)
 
-        self._q = asyncio.Queue()
+        self.outbound: OutboundScheduler | None = None
+        if self.config.rate_limit is not None:
+            self.outbound = OutboundScheduler(**self.config.rate_limit.model_dump())
+
+        self._on_shed = on_shed
+        # Commands yet to handle a message with spooled attachments, by message id
+        self._spooled_handlers: dict[int, int] = {}
+        bounds = {
+            "maxsize": self.config.max_queue_size,
+            "overflow": self.config.overflow,
+            "priority": _priority_of,
+            "on_shed": self._shed,
+        }
+        self._q: InboundQueue | ShardedQueue = (
+            ShardedQueue(_chat_of, **bounds)
+            if self.config.ordered_dispatch
+            else InboundQueue(**bounds, aging=self.config.priority_aging)
+        )
+        self._signal_service_probe_lock = asyncio.Lock()
+        self._polling = self.config.receive.mode is ReceiveMode.POLLING
 
         self._produce_tasks: set[asyncio.Task] = set()
-        self._consume_tasks: set[asyncio.Task] = set()
+        self._shed_tasks: set[asyncio.Task] = set()
+        self._consume_tasks: dict[int, asyncio.Task] = {}
+        self._busy_consumers: set[int] = set()
+        self._autoscale_task: asyncio.Task | None = None
+        self.autoscaler: ConsumerAutoscaler | None = None
+        if self.config.autoscale is not None:
+            self.autoscaler = ConsumerAutoscaler(
+                **self.config.autoscale.model_dump(exclude={"interval"})
+            )
 
-        try:
-            self.scheduler = AsyncIOScheduler(event_loop=self._event_loop)
-        except Exception as e:  # noqa: BLE001
-            raise SignalBotError(f"Could not initialize scheduler: {e}")  # noqa: B904, EM102, TRY003
+        if scheduler is not None:
+            self.scheduler = scheduler
+        else:
+            try:
+                self.scheduler = AsyncIOScheduler(event_loop=self._event_loop)
+            except Exception as e:  # noqa: BLE001
+                raise SignalBotError(f"Could not initialize scheduler: {e}")  # noqa: B904, EM102, TRY003
 
         if isinstance(self.config.storage, SQLiteConfig):
             self.storage = SQLiteStorage(
@@ -211,13 +339,54 @@ class SignalBot:
 
             self.commands.append((command, contacts, group_ids, f))
 
-    async def _async_post_init(self) -> None:
+        self._router = CommandRouter(self.commands)
+        self._access = AccessIndex(
+            [(contacts, group_ids) for _, contacts, group_ids, _ in self.commands]
+        )
+
+    def _build_classifier(self) -> None:
+        """Drop received messages no command handles before parsing them."""
+        accepted: set[MessageType] = set()
+        for command, *_ in self.commands:
+            if command.message_types is None:
+                self._classifier = EnvelopeClassifier()
+                return
+            accepted.update(command.message_types)
+        # The bot keeps its group cache up to date itself
+        accepted.add(MessageType.GROUP_UPDATE_MESSAGE)
+        self._classifier = EnvelopeClassifier(accepted)
+
+    def _push_down_receive_filters(self) -> None:
+        """Tell `signal-cli-rest-api` not to send what no command needs."""
+        commands = [command for command, *_ in self.commands]
+
+        ignore_attachments = self.config.ignore_attachments
+        if ignore_attachments is None:
+            ignore_attachments = not self.config.download_attachments or not any(
+                command.requires_attachments for command in commands
+            )
+        ignore_stories = self.config.ignore_stories
+        if ignore_stories is None:
+            ignore_stories = not any(command.requires_stories for command in commands)
+
+        params = {}
+        if ignore_attachments:
+            params["ignore_attachments"] = "true"
+            # signal-cli will not have them, downloading would fail
+            self._signal.download_attachments = False
+        if ignore_stories:
+            params["ignore_stories"] = "true"
+        self._signal.receive_params = params
+
+    async def _async_post_init(self, consumers: int | None = None) -> None:
         await self._check_signal_service()
         await self._check_signal_cli_rest_api_version()
         await self._check_signal_cli_rest_api_mode()
         await self._detect_groups()
         await self._resolve_commands()
-        await self._create_produce_consume_messages_tasks()
+        self._build_classifier()
+        self._push_down_receive_filters()
+        await self._create_produce_consume_messages_tasks(consumers=consumers)
 
     async def _check_signal_service(self) -> None:
         while (await self._signal.check_signal_service()) is False:
@@ -243,12 +412,29 @@ class SignalBot:
 
     async def _check_signal_cli_rest_api_mode(self) -> None:
         mode = await self.signal_cli_rest_api_mode()
-        if mode != "json-rpc":
+        receive_mode = self.config.receive.mode
+        if mode == "json-rpc":
+            if receive_mode is ReceiveMode.POLLING:
+                # GET /v1/receive is not served in the json-rpc mode
+                error_msg = (
+                    "Wrong signal-cli-rest-api mode, found 'json-rpc', expected "
+                    "'normal' or 'native' to receive messages by polling"
+                )
+                raise RuntimeError(error_msg)
+            self._polling = False
+            return
+
+        if receive_mode is ReceiveMode.WEBSOCKET:
             error_msg = (
                 f"Wrong signal-cli-rest-api mode, found '{mode}', expected 'json-rpc'"
             )
             raise RuntimeError(error_msg)
 
+        self._polling = True
+        self._logger.info(
+            f"[Bot] signal-cli-rest-api runs in '{mode}' mode, polling for messages"  # noqa: G004
+        )
+
     def _store_reference_to_task(
         self,
         task: asyncio.Task,
@@ -271,7 +457,50 @@ class SignalBot:
         if run_forever:
             self.scheduler.start()
 
-            self._event_loop.run_forever()
+            try:
+                self._event_loop.run_forever()
+            finally:
+                self._event_loop.run_until_complete(self.aclose())
+
+    async def aclose(self) -> None:
+        """Stop receiving and handling messages and close the HTTP connections."""
+        tasks = [
+            *self._produce_tasks,
+            *self._consume_tasks.values(),
+            *self._shed_tasks,
+        ]
+        if self._autoscale_task is not None:
+            tasks.append(self._autoscale_task)
+        if self.init_task is not None:
+            tasks.append(self.init_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        if self._owns_pool:
+            await self._signal.aclose()
+
+    def receive_stats(self) -> ReceiveStats:
+        """Return reconnect counts, gaps and the ping round-trip time of the receive
+        connection."""
+        return self._signal.receive_monitor.stats()
+
+    def queue_stats(self) -> QueueStats:
+        """Return the depth of the queue of received messages and how many of them
+        were dropped or held back because it was full."""
+        return self._q.stats()
+
+    def classifier_stats(self) -> ClassifierStats:
+        """Return how many received messages were dropped without being parsed."""
+        return self._classifier.stats()
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        """The circuit breaker guarding requests to `signal-cli-rest-api`.
+
+        Its `state` can be monitored, or a callback can be set on `on_state_change`.
+        """
+        return self._signal.circuit_breaker
 
     async def signal_cli_rest_api_version(self) -> str:
         """Return the signal-cli-rest-api version."""
@@ -287,6 +516,7 @@ class SignalBot:
         text: str,
         *,
         base64_attachments: list | None = None,
+        attachments: list[AttachmentSource] | None = None,
         link_preview: LinkPreview | None = None,
         quote_author: str | None = None,
         quote_mentions: list | None = None,
@@ -305,6 +535,10 @@ class SignalBot:
             receiver: The recipient of the message.
             text: The content of the message.
             base64_attachments: List of attachments encoded in base64.
+            attachments: List of attachments to upload as files (`Path`), `bytes`,
+                received attachments or async iterators of `bytes`. Unlike
+                `base64_attachments`, they are encoded while being uploaded, so large
+                files never have to fit in memory.
             link_preview: Link previews to be sent with the message.
             quote_author: The author of the quoted message, required if quote_message is
                 set.
@@ -327,10 +561,12 @@ class SignalBot:
         receiver = self._resolve_receiver(receiver)
         link_preview_raw = link_preview.model_dump() if link_preview else None
 
+        await self._pace(receiver)
         resp = await self._signal.send(
             receiver,
             text,
             base64_attachments=base64_attachments,
+            attachments=attachments,
             link_preview=link_preview_raw,
             quote_author=quote_author,
             quote_mentions=quote_mentions,
@@ -341,12 +577,109 @@ class SignalBot:
             edit_timestamp=edit_timestamp,
             view_once=view_once,
         )
-        resp_payload = await resp.json()
+        resp_payload = await resp.json(loads=codec.loads)
         timestamp = int(resp_payload["timestamp"])
         self._logger.info(f"[Bot] New message {timestamp} sent:\n{text}")  # noqa: G004
 
         return timestamp
 
+    async def send_many(  # noqa: PLR0913
+        self,
+        receivers: Iterable[str],
+        text: str,
+        *,
+        base64_attachments: list | None = None,
+        link_preview: LinkPreview | None = None,
+        mentions: list[dict[str, Any]] | None = None,
+        text_mode: str | None = None,
+        view_once: bool = False,
+        chunk_size: int = SEND_MANY_CHUNK_SIZE,
+        max_concurrency: int = SEND_MANY_MAX_CONCURRENCY,
+    ) -> SendManyResult:
+        """Send the same message to many receivers.
+
+        Contacts are batched into requests with up to `chunk_size` recipients each, so
+        the message and its attachments are encoded once per batch instead of once per
+        receiver. Groups cannot be mixed with contacts, each group is sent on its own.
+        Failing receivers do not abort the others, they are reported in the result.
+
+        Args:
+            receivers: The recipients of the message.
+            text: The content of the message.
+            base64_attachments: List of attachments encoded in base64.
+            link_preview: Link previews to be sent with the message.
+            mentions: List of dictionary of mentions, it has the format
+                `[{ "author": "uuid" , "start": 0, "length": 1 }]`.
+            text_mode: The text mode of the message, can be "normal" or "styled".
+            view_once: Whether the message should be view once or not.
+            chunk_size: Maximum number of contacts per request.
+            max_concurrency: Maximum number of requests running at the same time.
+
+        Returns:
+            The timestamps and failures per receiver.
+        """
+        result = SendManyResult()
+
+        receivers_by_recipient: defaultdict[str, list[str]] = defaultdict(list)
+        for receiver in receivers:
+            try:
+                recipient = self._resolve_receiver(receiver)
+            except SignalBotError as e:
+                result.failures[receiver] = e
+                continue
+            receivers_by_recipient[recipient].append(receiver)
+
+        groups = [r for r in receivers_by_recipient if r.startswith("group.")]
+        contacts = [r for r in receivers_by_recipient if not r.startswith("group.")]
+        batches = [[group] for group in groups]
+        batches += [
+            contacts[i : i + chunk_size] for i in range(0, len(contacts), chunk_size)
+        ]
+
+        link_preview_raw = link_preview.model_dump() if link_preview else None
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def send_batch(batch: list[str]) -> None:
+            await self._pace(*batch)
+            async with semaphore:
+                try:
+                    resp = await self._signal.send(
+                        batch,
+                        text,
+                        base64_attachments=base64_attachments,
+                        link_preview=link_preview_raw,
+                        mentions=mentions,
+                        text_mode=text_mode,
+                        view_once=view_once,
+                    )
+                    timestamp = int((await resp.json(loads=codec.loads))["timestamp"])
+                except (
+                    SendMessageError,
+                    CircuitOpenError,
+                    aiohttp.ClientError,  # e.g. a response that is not JSON
+                    KeyError,
+                    ValueError,
+                ) as e:
+                    for recipient in batch:
+                        for receiver in receivers_by_recipient[recipient]:
+                            result.failures[receiver] = e
+                    return
+
+            for recipient in batch:
+                for receiver in receivers_by_recipient[recipient]:
+                    result.timestamps[receiver] = timestamp
+
+        await asyncio.gather(*(send_batch(batch) for batch in batches))
+
+        self._logger.info(
+            "[Bot] Message sent to %d receivers in %d requests, %d failed:\n%s",
+            len(result.timestamps),
+            len(batches),
+            len(result.failures),
+            text,
+        )
+        return result
+
     async def poll(
         self,
         receiver: str,
@@ -368,13 +701,14 @@ class SignalBot:
         """
         receiver = self._resolve_receiver(receiver)
 
+        await self._pace(receiver)
         resp = await self._signal.poll(
             receiver,
             question,
             answers,
             allow_multiple_selections=allow_multiple_selections,
         )
-        resp_payload = await resp.json()
+        resp_payload = await resp.json(loads=codec.loads)
         timestamp = int(resp_payload["timestamp"])
         self._logger.info("[Bot] New poll created:\n%s", question)
 
@@ -392,6 +726,7 @@ class SignalBot:
         recipient = self._resolve_receiver(recipient)
         target_author = message.source
         timestamp = message.timestamp
+        await self._pace(recipient)
         await self._signal.react(recipient, emoji, target_author, timestamp)
         self._logger.info(f"[Bot] New reaction: {emoji}")  # noqa: G004
 
@@ -490,16 +825,27 @@ class SignalBot:
         """
         receiver = self._resolve_receiver(receiver)
 
+        await self._pace(receiver)
         resp = await self._signal.remote_delete(
             receiver,
             timestamp=timestamp,
         )
-        resp_payload = await resp.json()
+        resp_payload = await resp.json(loads=codec.loads)
         ret_timestamp = int(resp_payload["timestamp"])
         self._logger.info(f"[Bot] Deleted message with timestamp {timestamp}")  # noqa: G004
 
         return ret_timestamp
 
+    async def encode_attachment(self, attachment: bytes | Path | str) -> str:
+        """Encode an attachment as base64 for `send`.
+
+        With `Config.attachment_cache`, the same content is only encoded once.
+
+        Args:
+            attachment: The content of the attachment, or the path of a file.
+        """
+        return await self._signal.encode_attachment(attachment)
+
     async def delete_attachment(self, attachment_filename: str) -> None:
         """Delete an attachment from local storage.
 
@@ -508,6 +854,14 @@ class SignalBot:
         """
         await self._signal.delete_attachment(attachment_filename)
 
+    async def _pace(self, *recipients: str) -> None:
+        if self.outbound is None:
+            return
+
+        waited = await self.outbound.wait(*recipients)
+        if waited > 0:
+            self._logger.info("[Bot] Outgoing request delayed by %0.3f seconds", waited)
+
     async def _detect_groups(self) -> None:
         # reset group lookups to avoid stale data
         self.groups = await self._signal.get_groups()
@@ -692,34 +1046,107 @@ class SignalBot:
             self._logger.warning(f"Restarting coroutine in {sleep_t} seconds")  # noqa: G004
             await asyncio.sleep(sleep_t)
 
+    async def _keep_receiving(self, name: int) -> None:
+        """Run the producer `name` and reconnect as soon as its connection is lost."""
+        monitor = self._signal.receive_monitor
+        while True:
+            try:
+                await self._produce(name)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._logger.warning(
+                    f"[Bot] Producer #{name} lost its connection",  # noqa: G004
+                    exc_info=True,
+                )
+
+            delay = monitor.next_delay()
+            self._logger.info(f"[Bot] Reconnecting in {delay:0.2f} seconds")  # noqa: G004
+            await asyncio.sleep(delay)
+
     async def _create_produce_consume_messages_tasks(
         self,
-        producers: int = 1,
-        consumers: int = 3,
+        producers: int | None = None,
+        consumers: int | None = None,
     ) -> None:
-        for task in itertools.chain(self._consume_tasks, self._produce_tasks):
+        if producers is None:
+            producers = self.config.producers
+        if consumers is None:
+            consumers = self.config.consumers
+            if self.autoscaler is not None:
+                consumers = min(
+                    max(consumers, self.autoscaler.min_consumers),
+                    self.autoscaler.max_consumers,
+                )
+
+        tasks = itertools.chain(self._consume_tasks.values(), self._produce_tasks)
+        if self._autoscale_task is not None:
+            tasks = itertools.chain(tasks, [self._autoscale_task])
+        for task in tasks:
             task.cancel()
 
         self._produce_tasks.clear()
 
         for n in range(1, producers + 1):
-            produce_task = self._rerun_on_exception(self._produce, n)
+            produce_task = self._keep_receiving(n)
             produce_task = asyncio.create_task(produce_task)
             self._store_reference_to_task(produce_task, self._produce_tasks)
 
         self._consume_tasks.clear()
+        self._busy_consumers.clear()
+        self._scale_consumers(consumers)
 
-        for n in range(1, consumers + 1):
-            consume_task = self._rerun_on_exception(self._consume, n)
-            consume_task = asyncio.create_task(consume_task)
-            self._store_reference_to_task(consume_task, self._consume_tasks)
+        # Consumers shared with other bots, e.g. by a manager, are not scaled here
+        if self.autoscaler is not None and consumers:
+            self._autoscale_task = asyncio.create_task(self._autoscale())
+
+    def _scale_consumers(self, consumers: int) -> int:
+        """Start or stop consumers until `consumers` are running and return how many
+        are running.
+
+        Only idle consumers waiting for a message are stopped, busy ones finish the
+        message they handle. Consumers are numbered from 1, new ones take the lowest
+        free number.
+        """
+        tasks = self._consume_tasks
+        numbers = itertools.count(1)
+        while len(tasks) < consumers:
+            n = next(n for n in numbers if n not in tasks)
+            tasks[n] = asyncio.create_task(self._rerun_on_exception(self._consume, n))
+        idle = sorted(tasks.keys() - self._busy_consumers, reverse=True)
+        for n in idle[: max(0, len(tasks) - consumers)]:
+            tasks.pop(n).cancel()
+
+        # Consumer n serves lane n - 1, lanes without a consumer are drained by the
+        # others
+        if isinstance(self._q, ShardedQueue) and tasks:
+            self._q.resize(max(tasks))
+        return len(tasks)
+
+    async def _autoscale(self) -> None:
+        interval = self.config.autoscale.interval
+        while True:
+            await asyncio.sleep(interval)
+            running = len(self._consume_tasks)
+            target = self.autoscaler.target(running, self._q.qsize())
+            scaled = self._scale_consumers(target) if target != running else running
+            if scaled != running:
+                self._logger.info(
+                    f"[Bot] Scaled from {running} to {scaled} consumers"  # noqa: G004
+                )
+            self.autoscaler.record_scaling(running, scaled)
 
     async def _produce(self, name: int) -> None:
         self._logger.info(f"[Bot] Producer #{name} started")  # noqa: G004
         try:
-            async for raw_message in self._signal.receive():
+            async for raw_message in self._receive():
                 self._logger.info(f"[Raw Message] {raw_message}")  # noqa: G004
 
+                if not self._classifier.accepts(raw_message):
+                    continue
+
+                await self._wait_for_signal_service()
+
                 try:
                     message = await Message.parse(self._signal, raw_message)
                 except UnknownMessageFormatError:
@@ -733,35 +1160,71 @@ class SignalBot:
             # TODO: retry strategy  # noqa: TD002, TD003
             raise SignalBotError(f"Cannot receive messages: {e}")  # noqa: B904, EM102, TRY003
 
-    def _should_react_for_contact(
-        self,
-        message: Message,
-        contacts: list[str] | bool,  # noqa: FBT001
-        group_ids: list[str] | bool,  # noqa: FBT001
-    ) -> bool:
-        """Is the command activated for a certain chat or group?"""
+    def _receive(self) -> AsyncIterator[str]:
+        if not self._polling:
+            return self._signal.receive()
+
+        polling = self.config.receive.polling
+        return self._signal.receive_polling(
+            AdaptivePollInterval(
+                min_interval=polling.min_interval, max_interval=polling.max_interval
+            ),
+            timeout=polling.timeout,
+            max_messages=polling.max_messages,
+        )
+
+    async def _wait_for_signal_service(self) -> None:
+        """Pause while the circuit breaker is open instead of queuing doomed requests.
+
+        One waiter probes the service with health checks, which can close the circuit
+        early, the others wait for it.
+        """
+        if self.circuit_breaker.state is not CircuitState.OPEN:
+            return
+
+        async with self._signal_service_probe_lock:
+            while self.circuit_breaker.state is CircuitState.OPEN:
+                retry_in = self.circuit_breaker.retry_in()
+                self._logger.warning(
+                    "[Bot] signal-cli-rest-api unavailable, pausing for %0.1f seconds",
+                    retry_in,
+                )
+                await asyncio.sleep(min(retry_in, self.config.retry_interval))
+                # Keeps the protocol negotiated at startup, unlike
+                # check_signal_service() which falls back to HTTP if HTTPS fails
+                await self._signal._is_signal_service_available()  # noqa: SLF001
+
+    def _allowed_commands(self, message: Message) -> int:
+        """Bitset of the commands activated for the chat of `message`."""
         # Case 1: Private message
         if message.is_private():
-            # a) registered for all numbers
-            if isinstance(contacts, bool) and contacts:
-                return True
-
-            # b) whitelisted numbers
-            if isinstance(contacts, list) and message.source in contacts:
-                return True
+            return self._access.private(message.source)
 
         # Case 2: Group message
-        if message.is_group():
-            # a) registered for all groups
-            if isinstance(group_ids, bool) and group_ids:
-                return True
-
-            # b) whitelisted group ids
-            group_id = self._groups_by_internal_id.get(message.group, {}).get("id")
-            if isinstance(group_ids, list) and group_id and group_id in group_ids:
-                return True
+        group_id = self._groups_by_internal_id.get(message.group, {}).get("id")
+        return self._access.group(group_id)
+
+    def _shed(self, item: tuple[Command, Message, float]) -> None:
+        command, message, _ = item
+        self._logger.warning(
+            f"[Bot] Queue full, dropped message {message.timestamp} for "  # noqa: G004
+            f"{command.__class__.__name__}"
+        )
+        self._release_spooled_attachments(message)
+        if self._on_shed is None:
+            return
+        # Exceptions of a synchronous callback are logged by the queue
+        result = self._on_shed(command, message)
+        if inspect.isawaitable(result):
+            self._store_reference_to_task(
+                asyncio.ensure_future(self._await_on_shed(result)), self._shed_tasks
+            )
 
-        return False
+    async def _await_on_shed(self, result: Awaitable[object]) -> None:
+        try:
+            await result
+        except Exception:
+            self._logger.exception("[Bot] on_shed failed")
 
     def _should_react_for_lambda(
         self,
@@ -774,29 +1237,78 @@ class SignalBot:
         return f(message)
 
     async def _ask_commands_to_handle(self, message: Message) -> None:
-        for command, contacts, group_ids, f in self.commands:
-            if not self._should_react_for_contact(message, contacts, group_ids):
-                continue
-
-            if not self._should_react_for_lambda(message, f):
-                continue
+        allowed = self._allowed_commands(message)
+        commands = [
+            command
+            for command, _, _, f in self._router.route(message, allowed)
+            if (command.message_types is None or message.type in command.message_types)
+            and self._should_react_for_lambda(message, f)
+        ]
 
+        self._track_spooled_attachments(message, len(commands))
+        for command in commands:
             await self._q.put((command, message, time.perf_counter()))
 
+    def _track_spooled_attachments(self, message: Message, commands: int) -> None:
+        """Remember how many commands still handle `message`, its attachments in the
+        spool directory are deleted once none does."""
+        spool_dir = self._signal.attachment_spool_dir
+        if spool_dir is None or not any(
+            attachment.path is not None for attachment in message.attachments
+        ):
+            return
+        self._spooled_handlers[id(message)] = commands
+        if commands == 0:
+            self._release_spooled_attachments(message)
+
+    def _release_spooled_attachments(self, message: Message) -> None:
+        remaining = self._spooled_handlers.get(id(message))
+        if remaining is None:
+            return
+        if remaining > 1:
+            self._spooled_handlers[id(message)] = remaining - 1
+            return
+
+        del self._spooled_handlers[id(message)]
+        spool_dir = self._signal.attachment_spool_dir
+        for attachment in message.attachments:
+            # Commands may have downloaded attachments elsewhere, those are theirs
+            if attachment.path is not None and attachment.path.parent == spool_dir:
+                attachment.remove()
+
     async def _consume(self, name: int) -> None:
         self._logger.info(f"[Bot] Consumer #{name} started")  # noqa: G004
         while True:
             try:
+                await self._wait_for_signal_service()
                 await self._consume_new_item(name)
             except Exception:  # noqa: BLE001, PERF203, S112
                 continue
 
     async def _consume_new_item(self, name: int) -> None:
-        command, message, t = await self._q.get()
+        sharded = isinstance(self._q, ShardedQueue)
+        item = await (self._q.get(name - 1) if sharded else self._q.get())
+        self._busy_consumers.add(name)
+        try:
+            await self._handle_item(name, *item)
+        finally:
+            self._busy_consumers.discard(name)
+            if sharded:
+                self._q.task_done(item)  # always, or the chat would be stuck
+
+        # done
+        if not sharded:
+            self._q.task_done()
+
+    async def _handle_item(
+        self, name: int, command: Command, message: Message, t: float
+    ) -> None:
         now = time.perf_counter()
         self._logger.info(
             f"[Bot] Consumer #{name} got new job in {now - t:0.5f} seconds"  # noqa: G004
         )
+        if self.autoscaler is not None:
+            self.autoscaler.record_wait(now - t)
 
         # handle Command
         try:
@@ -805,9 +1317,16 @@ class SignalBot:
         except Exception:
             self._logger.exception(f"[{command.__class__.__name__}]")  # noqa: G004
             raise
+        finally:
+            self._release_spooled_attachments(message)
 
-        # done
-        self._q.task_done()
+
+def _chat_of(item: tuple[Command, Message, float]) -> str:
+    return item[1].recipient()
+
+
+def _priority_of(item: tuple[Command, Message, float]) -> int:
+    return item[0].priority
 
 
 class SignalBotError(Exception):
@@ -8,6 +8,8 @@ import yaml
 from pydantic import BaseModel
 
 from signalbot.api import ConnectionMode
+from signalbot.dispatch import OverflowPolicy
+from signalbot.receive import ReceiveMode
 
 
 class RedisConfig(BaseModel):
@@ -51,6 +53,178 @@ class InMemoryConfig(BaseModel):
     type: Literal["in-memory"] = "in-memory"
 
 
+class ConnectionPoolConfig(BaseModel):
+    """
+    The configuration for the HTTP connection pool used to talk to
+    `signal-cli-rest-api`.
+
+    Attributes:
+        limit: Maximum number of simultaneous connections, `0` means no limit.
+        limit_per_host: Maximum number of simultaneous connections to the same host,
+            `0` means no limit.
+        keepalive_timeout: Seconds an idle connection is kept open for reuse.
+        dns_cache_ttl: Seconds resolved host names are cached, `None` caches them
+            forever.
+    """
+
+    limit: int = 100
+    limit_per_host: int = 0
+    keepalive_timeout: float = 30.0
+    dns_cache_ttl: int | None = 300
+
+
+class RetryConfig(BaseModel):
+    """
+    The configuration for retrying failed requests to `signal-cli-rest-api`.
+
+    Attributes:
+        max_attempts: Maximum number of attempts per request, `1` disables retries.
+        base_delay: Delay in seconds before the first retry, the delay doubles with
+            every retry and is randomized.
+        max_delay: Upper bound in seconds for a single delay.
+        deadline: Seconds after which a request including all its retries is given up,
+            `None` waits forever.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.2
+    max_delay: float = 5.0
+    deadline: float | None = 60.0
+
+
+class CircuitBreakerConfig(BaseModel):
+    """
+    The configuration for the circuit breaker around `signal-cli-rest-api`.
+
+    Attributes:
+        failure_threshold: Consecutive failed requests after which requests fail
+            immediately and message handling pauses.
+        recovery_timeout: Seconds to wait before trying again.
+        half_open_max_calls: Trial requests let through while checking if the service
+            recovered.
+    """
+
+    failure_threshold: int = 5
+    recovery_timeout: float = 30.0
+    half_open_max_calls: int = 1
+
+
+class RateLimitConfig(BaseModel):
+    """
+    The configuration for pacing outgoing messages, reactions and polls.
+
+    Requests over the limits are queued until they can be sent.
+
+    Attributes:
+        global_rate: Requests per second over all recipients.
+        global_burst: Requests that can be sent at once over all recipients.
+        recipient_rate: Requests per second to a single contact.
+        recipient_burst: Requests that can be sent at once to a single contact.
+        group_rate: Requests per second to a single group.
+        group_burst: Requests that can be sent at once to a single group.
+    """
+
+    global_rate: float = 10.0
+    global_burst: int = 20
+    recipient_rate: float = 1.0
+    recipient_burst: int = 5
+    group_rate: float = 1.0
+    group_burst: int = 5
+
+
+class PollingConfig(BaseModel):
+    """
+    The configuration for receiving messages by polling, see
+    [signalbot.ReceiveMode][].
+
+    Attributes:
+        timeout: Seconds `signal-cli` waits for further messages within one poll.
+        min_interval: Pause in seconds after a poll that returned messages.
+        max_interval: Upper bound in seconds for the pause after empty polls, the
+            pause doubles with every empty poll.
+        max_messages: Maximum number of messages fetched by one poll, `None` fetches
+            all.
+    """
+
+    timeout: float = 1.0
+    min_interval: float = 0.0
+    max_interval: float = 5.0
+    max_messages: int | None = None
+
+
+class ReceiveConfig(BaseModel):
+    """
+    The configuration for the connection messages are received on.
+
+    Attributes:
+        mode: Whether to receive messages over a websocket or by polling. Defaults to
+            `ReceiveMode.AUTO`, which polls unless `signal-cli-rest-api` runs in the
+            `json-rpc` mode.
+        polling: The configuration for receiving messages by polling.
+        ping_interval: Seconds between two pings.
+        ping_timeout: Seconds to wait for the answer to a ping.
+        stall_timeout: Seconds of silence after which an unanswered ping means the
+            connection stalled and is replaced.
+        reconnect_delay: Delay in seconds before the second reconnect attempt, the
+            first one happens immediately. The delay doubles with every attempt and is
+            randomized.
+        max_reconnect_delay: Upper bound in seconds for a reconnect delay.
+    """
+
+    mode: ReceiveMode = ReceiveMode.AUTO
+    polling: PollingConfig = PollingConfig()
+    ping_interval: float = 20.0
+    ping_timeout: float = 10.0
+    stall_timeout: float = 60.0
+    reconnect_delay: float = 0.5
+    max_reconnect_delay: float = 10.0
+
+
+class AttachmentCacheConfig(BaseModel):
+    """
+    The configuration for the on-disk attachment cache.
+
+    Attributes:
+        directory: The directory the cached attachments are stored in.
+        max_bytes: Disk budget in bytes, least recently used attachments are evicted
+            beyond it.
+        memory_max_bytes: Memory budget in bytes for small attachments kept in memory.
+        memory_item_max_bytes: Size in bytes up to which attachments are kept in
+            memory.
+    """
+
+    directory: Path
+    max_bytes: int = 256 * 1024 * 1024
+    memory_max_bytes: int = 16 * 1024 * 1024
+    memory_item_max_bytes: int = 256 * 1024
+
+
+class AutoscaleConfig(BaseModel):
+    """
+    The configuration for growing and shrinking the number of consumers with the
+    load, see [signalbot.ConsumerAutoscaler][].
+
+    Attributes:
+        min_consumers: Lower bound for the number of consumers.
+        max_consumers: Upper bound for the number of consumers.
+        queue_depth_per_consumer: Queued messages per consumer that add consumers.
+        scale_up_wait: Seconds a message waited for a consumer that add consumers.
+        scale_down_wait: Seconds of waiting below which the load counts as low.
+        scale_down_after: Seconds of low load after which a consumer is removed.
+        growth: Factor the number of consumers grows by.
+        interval: Seconds between two checks of the load.
+    """
+
+    min_consumers: int = 1
+    max_consumers: int = 32
+    queue_depth_per_consumer: int = 4
+    scale_up_wait: float = 0.5
+    scale_down_wait: float = 0.05
+    scale_down_after: float = 30.0
+    growth: float = 2.0
+    interval: float = 1.0
+
+
 class Config(BaseModel):
     """
     The configuration for SignalBot.
@@ -65,6 +239,55 @@ class Config(BaseModel):
             `True`.
         connection_mode: The connection mode to use when connecting to the Signal
             service. Defaults to `ConnectionMode.AUTO`.
+        attachment_spool_dir: A directory received attachments are streamed to instead
+            of being held in memory as base64 strings. The files are deleted once
+            every command handled the message, move the file at `Attachment.path` to
+            keep it. Defaults to `None`.
+        lazy_attachments: Whether to skip downloading attachments and link preview
+            thumbnails while parsing a message. They are fetched on first access of
+            `Message.attachments` or `LinkPreview.thumbnail` instead. Defaults to
+            `False`.
+        keep_raw_messages: Whether received messages keep their JSON string in
+            `Message.raw_message`. Disable it to save memory if many messages are
+            queued. Defaults to `True`.
+        ordered_dispatch: Whether the messages of a chat are handled one after
+            another, in the order they were received. Chats are spread over the
+            consumers and still handled in parallel. Defaults to `False`, which hands
+            every message to the next free consumer.
+        max_queue_size: Maximum number of messages waiting for a consumer, `0` for no
+            limit. Queued messages hold their attachments unless `lazy_attachments`
+            is set, bound the queue to bound the memory used during bursts.
+        overflow: What happens to messages beyond `max_queue_size`. Defaults to
+            `OverflowPolicy.BLOCK`, which pauses receiving until there is space.
+        priority_aging: How much the priority of a queued message rises per second
+            it waits for a consumer, so that messages for commands of a low
+            `priority` are handled eventually. `0` handles them only once no message
+            of a higher priority is queued.
+        max_downloads: Maximum number of attachments downloaded at the same time while
+            parsing messages.
+        max_downloads_per_message: Maximum number of attachments of a single message
+            downloaded at the same time, so that large albums do not take all download
+            slots.
+        attachment_cache: The configuration for caching attachments on disk. Defaults
+            to `None`, which downloads attachments every time they are accessed.
+        ignore_attachments: Whether `signal-cli` should skip downloading attachments
+            of received messages. Defaults to `None`, which ignores them if
+            `download_attachments` is `False` or no registered command sets
+            `requires_attachments`.
+        ignore_stories: Whether `signal-cli` should not send stories. Defaults to
+            `None`, which ignores them if no registered command sets
+            `requires_stories`.
+        producers: Number of connections messages are received on.
+        consumers: Number of workers handling messages, the initial number if
+            `autoscale` is set.
+        autoscale: The configuration for adapting the number of consumers to the
+            load. Defaults to `None`, which keeps `consumers` fixed.
+        receive: The configuration for the connection messages are received on.
+        connection_pool: The configuration for the HTTP connection pool.
+        retry: The configuration for retrying failed requests.
+        circuit_breaker: The configuration for the circuit breaker.
+        rate_limit: The configuration for pacing outgoing requests. Defaults to `None`,
+            which sends every request immediately.
     """
 
     signal_service: str
@@ -74,6 +297,26 @@ class Config(BaseModel):
     retry_interval: int = 1
     download_attachments: bool = True
     connection_mode: ConnectionMode = ConnectionMode.AUTO
+    attachment_spool_dir: Path | None = None
+    lazy_attachments: bool = False
+    keep_raw_messages: bool = True
+    ordered_dispatch: bool = False
+    max_queue_size: int = 0
+    overflow: OverflowPolicy = OverflowPolicy.BLOCK
+    priority_aging: float = 1.0
+    max_downloads: int = 8
+    max_downloads_per_message: int = 4
+    attachment_cache: AttachmentCacheConfig | None = None
+    ignore_attachments: bool | None = None
+    ignore_stories: bool | None = None
+    producers: int = 1
+    consumers: int = 3
+    autoscale: AutoscaleConfig | None = None
+    receive: ReceiveConfig = ReceiveConfig()
+    connection_pool: ConnectionPoolConfig = ConnectionPoolConfig()
+    retry: RetryConfig = RetryConfig()
+    circuit_breaker: CircuitBreakerConfig = CircuitBreakerConfig()
+    rate_limit: RateLimitConfig | None = None
 
 
 def load_config(config: Config | Mapping | Path | str) -> Config:
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import logging
+import time
+from enum import Enum
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    """State of a [signalbot.CircuitBreaker][].
+
+    Attributes:
+        CLOSED: Requests are sent normally.
+        OPEN: The service is considered down, requests fail immediately.
+        HALF_OPEN: A limited number of trial requests are let through to find out if
+            the service recovered.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stops sending requests to `signal-cli-rest-api` while it is unresponsive.
+
+    After `failure_threshold` consecutive failures the circuit opens and every request
+    fails immediately with `CircuitOpenError`. Once `recovery_timeout` seconds passed,
+    or a health check succeeded, the circuit becomes half-open and lets
+    `half_open_max_calls` trial requests through: a success closes the circuit, a
+    failure opens it again.
+
+    Args:
+        failure_threshold: Consecutive failures that open the circuit.
+        recovery_timeout: Seconds the circuit stays open before trying again.
+        half_open_max_calls: Concurrent trial requests allowed while half-open.
+        on_state_change: Called with the old and new state on every transition.
+        clock: Monotonic clock in seconds, only meant to be replaced in tests.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        on_state_change: Callable[[CircuitState, CircuitState], None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.on_state_change = on_state_change
+        self._clock = clock
+
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """The current state, an open circuit turns half-open after the timeout."""
+        if self._state is CircuitState.OPEN and self.retry_in() == 0:
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    @property
+    def failures(self) -> int:
+        """Number of consecutive failures."""
+        return self._failures
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets trial requests through."""
+        if self._state is not CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.recovery_timeout - self._clock())
+
+    def before_request(self) -> None:
+        """Reserve the right to send a request.
+
+        Every call must be followed by `record_success()`, `record_failure()` or
+        `release()`.
+
+        Raises:
+            CircuitOpenError: If the circuit is open or all trial requests are taken.
+        """
+        state = self.state
+        if state is CircuitState.CLOSED:
+            return
+        if state is CircuitState.HALF_OPEN and self._trials < self.half_open_max_calls:
+            self._trials += 1
+            return
+        raise CircuitOpenError(self.retry_in())
+
+    def release(self) -> None:
+        """Give back a reservation whose request was abandoned without an outcome."""
+        if self._state is CircuitState.HALF_OPEN and self._trials > 0:
+            self._trials -= 1
+
+    def record_success(self) -> None:
+        """Record a request that reached a responsive service."""
+        self._failures = 0
+        if self._state is CircuitState.HALF_OPEN:
+            self._transition(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        """Record a request that failed because the service is unresponsive."""
+        self._failures += 1
+        if self._state is CircuitState.HALF_OPEN or (
+            self._state is CircuitState.CLOSED
+            and self._failures >= self.failure_threshold
+        ):
+            self._transition(CircuitState.OPEN)
+
+    def record_health_check(self, *, healthy: bool) -> None:
+        """Record the result of a health check.
+
+        A healthy service turns an open circuit half-open without waiting for the
+        timeout, an unhealthy one counts as a failure.
+        """
+        if not healthy:
+            self.record_failure()
+        elif self._state is CircuitState.OPEN:
+            self._transition(CircuitState.HALF_OPEN)
+
+    def _transition(self, state: CircuitState) -> None:
+        old_state, self._state = self._state, state
+        self._trials = 0
+        if state is CircuitState.OPEN:
+            self._opened_at = self._clock()
+        logger.warning("Circuit breaker %s -> %s", old_state.value, state.value)
+        if self.on_state_change is not None:
+            self.on_state_change(old_state, state)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit breaker is open.
+
+    Attributes:
+        retry_in: Seconds until trial requests are let through again.
+    """
+
+    def __init__(self, retry_in: float) -> None:
+        super().__init__(f"signal-cli-rest-api unavailable, retry in {retry_in:0.1f}s")
+        self.retry_in = retry_in
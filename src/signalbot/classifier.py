@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from signalbot.message import MessageType
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+# Keys and values that give away the type of a message, in the JSON sent by
+# signal-cli. Quotes inside strings are escaped, so a marker cannot be faked by the
+# text of a message, at most a whole string value can equal it.
+_BASE_MARKERS = (
+    ('"readMessages"', MessageType.READ_MESSAGE),
+    ('"CONTACTS_SYNC"', MessageType.CONTACT_SYNC_MESSAGE),
+    ('"sentMessage"', MessageType.SYNC_MESSAGE),
+    ('"dataMessage"', MessageType.DATA_MESSAGE),
+    ('"editMessage"', MessageType.EDIT_MESSAGE),
+)
+_MODIFIER_MARKERS = (
+    ('"remoteDelete"', MessageType.DELETE_MESSAGE),
+    ('"reaction"', MessageType.REACTION_MESSAGE),
+    ('"UPDATE"', MessageType.GROUP_UPDATE_MESSAGE),
+)
+
+
+@dataclass
+class ClassifierStats:
+    """Counters of a [signalbot.EnvelopeClassifier][].
+
+    Attributes:
+        classified: Number of received messages that were classified.
+        skipped: Number of them that were dropped without being parsed.
+    """
+
+    classified: int = 0
+    skipped: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of received messages that were dropped without being parsed."""
+        return self.skipped / self.classified if self.classified else 0.0
+
+
+class EnvelopeClassifier:
+    """Drops received messages nobody handles before they are parsed.
+
+    The possible types of a message are determined by a scan of its raw JSON for
+    the keys that distinguish them, which is much cheaper than parsing it. Messages
+    that cannot be of any accepted type, like typing indicators, receipts or
+    reactions if no command handles them, are skipped without parsing them,
+    downloading their attachments or updating groups.
+
+    The scan errs on the side of parsing, a message whose text equals a marker like
+    `"reaction"` is parsed to find out.
+
+    Args:
+        accepted: The message types to keep, `None` to keep all messages.
+    """
+
+    def __init__(self, accepted: Iterable[MessageType] | None = None) -> None:
+        self.accepted = frozenset(accepted) if accepted is not None else None
+        self._stats = ClassifierStats()
+
+    def stats(self) -> ClassifierStats:
+        """Return a snapshot of the counters."""
+        return ClassifierStats(**vars(self._stats))
+
+    @staticmethod
+    def classify(raw_message: str) -> frozenset[MessageType]:
+        """Return the types `raw_message` can have, an empty set if it is no message
+        at all, e.g. a typing indicator or a receipt."""
+        types = {
+            message_type
+            for marker, message_type in _BASE_MARKERS
+            if marker in raw_message
+        }
+        if not types:
+            return frozenset()
+        types.update(
+            message_type
+            for marker, message_type in _MODIFIER_MARKERS
+            if marker in raw_message
+        )
+        return frozenset(types)
+
+    def accepts(self, raw_message: str) -> bool:
+        """Whether `raw_message` has to be parsed, counted in the statistics."""
+        self._stats.classified += 1
+        types = self.classify(raw_message)
+        if types and (self.accepted is None or not self.accepted.isdisjoint(types)):
+            return True
+        self._stats.skipped += 1
+        return False
@@ -0,0 +1,56 @@
+"""JSON encoding and decoding with the fastest available library.
+
+`orjson` is used if it is installed, otherwise `msgspec`, otherwise the standard
+library. Install one of them, e.g. `pip install orjson`, to speed up parsing received
+messages, sending requests and storage access.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ModuleNotFoundError:
+    orjson = None
+
+try:
+    import msgspec
+except ModuleNotFoundError:
+    msgspec = None
+
+
+def _stdlib_dumps_bytes(obj: Any) -> bytes:  # noqa: ANN401
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _orjson_dumps_bytes(obj: Any) -> bytes:  # noqa: ANN401
+    # Like the standard library, turn e.g. integer keys into strings
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+
+if orjson is not None:
+    BACKEND = "orjson"
+elif msgspec is not None:
+    BACKEND = "msgspec"
+else:
+    BACKEND = "json"
+"""
+The JSON library in use, `orjson`, `msgspec` or `json`.
+"""
+
+if BACKEND == "orjson":
+    loads = orjson.loads
+    dumps_bytes = _orjson_dumps_bytes
+elif BACKEND == "msgspec":
+    loads = msgspec.json.decode
+    dumps_bytes = msgspec.json.encode
+else:
+    loads = json.loads
+    dumps_bytes = _stdlib_dumps_bytes
+
+
+def dumps(obj: Any) -> str:  # noqa: ANN401
+    """Serialize `obj` to a compact JSON string."""
+    return dumps_bytes(obj).decode()
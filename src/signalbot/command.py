@@ -3,7 +3,9 @@ from __future__ import annotations
 import functools
 import re
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, ParamSpec, TypeVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any, ParamSpec, TypeVar
 
 T = TypeVar("T")
 P = ParamSpec("P")
@@ -13,6 +15,36 @@ if TYPE_CHECKING:
 
     from signalbot.bot import SignalBot
     from signalbot.context import Context
+    from signalbot.message import MessageType
+
+
+@dataclass(frozen=True)
+class Trigger:
+    """The messages a command can fire for, as declared by its trigger decorator.
+
+    The decorators attach it to the `handle` method as `handle.trigger`, so that
+    messages are only routed to commands that can fire for them.
+
+    Attributes:
+        texts: Texts one of which the message text has to equal, if triggered by
+            texts.
+        case_sensitive: Whether `texts` are compared case sensitively.
+        patterns: Regular expressions one of which has to match the message text, if
+            triggered by regular expressions.
+        emojis: Emojis one of which a reaction has to have, empty for any reaction, if
+            triggered by reactions.
+    """
+
+    texts: frozenset[str] | None = None
+    case_sensitive: bool = False
+    patterns: tuple[str | re.Pattern[str], ...] | None = None
+    emojis: frozenset[str] | None = None
+
+
+def _attach_trigger(wrapper: Any, func: Any, trigger: Trigger) -> None:  # noqa: ANN401
+    # Stacked decorators would all have to match, such commands are not routed by
+    # their trigger but see every message
+    wrapper.trigger = trigger if getattr(func, "trigger", None) is None else None
 
 
 def regex_triggered(
@@ -26,6 +58,8 @@ def regex_triggered(
             message text against.
     """
 
+    patterns = [re.compile(pattern) for pattern in by]
+
     def decorator_regex_triggered(func: Callable[P, T]) -> Callable[P, T]:
         @functools.wraps(func)
         async def wrapper_regex_triggered(
@@ -35,11 +69,11 @@ def regex_triggered(
             text = context.message.text
             if not isinstance(text, str):
                 return None
-            matches = [bool(re.search(pattern, text)) for pattern in by]
-            if True not in matches:
+            if not any(pattern.search(text) for pattern in patterns):
                 return None
             return await func(*args, **kwargs)
 
+        _attach_trigger(wrapper_regex_triggered, func, Trigger(patterns=by))
         return wrapper_regex_triggered
 
     return decorator_regex_triggered
@@ -56,6 +90,8 @@ def triggered(
         case_sensitive: Whether the matching should be case sensitive.
     """
 
+    by_words = frozenset(by if case_sensitive else (t.lower() for t in by))
+
     def decorator_triggered(func: Callable[P, T]) -> Callable[P, T]:
         @functools.wraps(func)
         async def wrapper_triggered(*args: P.args, **kwargs: P.kwargs) -> T | None:
@@ -64,15 +100,18 @@ def triggered(
             if not isinstance(text, str):
                 return None
 
-            by_words = by
             if not case_sensitive:
                 text = text.lower()
-                by_words = [t.lower() for t in by_words]
             if text not in by_words:
                 return None
 
             return await func(*args, **kwargs)
 
+        _attach_trigger(
+            wrapper_triggered,
+            func,
+            Trigger(texts=frozenset(by), case_sensitive=case_sensitive),
+        )
         return wrapper_triggered
 
     return decorator_triggered
@@ -99,18 +138,53 @@ def reaction_triggered(
                 return None
             return await func(*args, **kwargs)
 
+        _attach_trigger(wrapper_reaction_triggered, func, Trigger(emojis=frozenset(by)))
         return wrapper_reaction_triggered
 
     return decorator_reaction_triggered
 
 
+class Priority(IntEnum):
+    """Priority classes for [signalbot.Command][], any other `int` works as well.
+
+    Attributes:
+        LOW: Bulk work nobody waits for, like logging or statistics.
+        NORMAL: The default.
+        HIGH: Replies someone waits for, like admin or interactive commands.
+    """
+
+    LOW = -10
+    NORMAL = 0
+    HIGH = 10
+
+
 class Command(ABC):
     """Abstract base class for commands.
 
     To create a command, subclass this class and implement the `handle` method.
     Then, register the command with the bot using `bot.register(CommandSubclass)`.
+
+    Attributes:
+        requires_attachments: Whether the command uses attachments. If no registered
+            command does, `signal-cli` is told not to download them at all.
+        requires_stories: Whether the command handles stories. If no registered
+            command does, `signal-cli` is told not to send them.
+        message_types: The types of messages the command handles, `None` for all.
+            Messages of a type no registered command handles are dropped before they
+            are parsed.
+        priority: How important the command is, higher is more important, e.g. a
+            [signalbot.Priority][]. Queued messages for commands of a higher
+            priority are handled first, see `priority_aging`. If the queue
+            overflows with `OverflowPolicy.DROP_LOWEST_PRIORITY`, messages for the
+            commands of the lowest priority are dropped first. Accounts of a
+            [signalbot.SignalBotManager][] ignore it.
     """
 
+    requires_attachments: bool = True
+    requires_stories: bool = False
+    message_types: frozenset[MessageType] | None = None
+    priority: int = Priority.NORMAL
+
     def __init__(self) -> None:
         # The bot attribute is assigned after calling bot.register(Command())
         self.bot: SignalBot | None = None
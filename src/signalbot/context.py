@@ -4,9 +4,12 @@ from copy import deepcopy
 from typing import TYPE_CHECKING, Any, Literal
 
 if TYPE_CHECKING:
-    from signalbot.bot import SignalBot
+    from collections.abc import Iterable
+
+    from signalbot.bot import SendManyResult, SignalBot
     from signalbot.link_previews import LinkPreview
     from signalbot.message import Message
+    from signalbot.upload import AttachmentSource
 
 
 class Context:
@@ -25,6 +28,7 @@ class Context:
         text: str,
         *,
         base64_attachments: list[str] | None = None,
+        attachments: list[AttachmentSource] | None = None,
         link_preview: LinkPreview | None = None,
         mentions: list[dict[str, Any]] | None = None,
         text_mode: str | None = None,
@@ -37,6 +41,31 @@ class Context:
             self.message.recipient(),
             text,
             base64_attachments=base64_attachments,
+            attachments=attachments,
+            mentions=mentions,
+            text_mode=text_mode,
+            link_preview=link_preview,
+            view_once=view_once,
+        )
+
+    async def send_many(  # noqa: PLR0913
+        self,
+        receivers: Iterable[str],
+        text: str,
+        *,
+        base64_attachments: list[str] | None = None,
+        link_preview: LinkPreview | None = None,
+        mentions: list[dict[str, Any]] | None = None,
+        text_mode: str | None = None,
+        view_once: bool = False,
+    ) -> SendManyResult:
+        """Same as
+         [signalbot.SignalBot.send_many()](bot.md#signalbot.SignalBot.send_many)
+        but with the message's recipient added to the receivers."""
+        return await self.bot.send_many(
+            [self.message.recipient(), *receivers],
+            text,
+            base64_attachments=base64_attachments,
             mentions=mentions,
             text_mode=text_mode,
             link_preview=link_preview,
@@ -49,6 +78,7 @@ class Context:
         edit_timestamp: int,
         *,
         base64_attachments: list[str] | None = None,
+        attachments: list[AttachmentSource] | None = None,
         link_preview: LinkPreview | None = None,
         mentions: list[dict[str, Any]] | None = None,
         text_mode: str | None = None,
@@ -61,6 +91,7 @@ class Context:
             self.message.recipient(),
             text,
             base64_attachments=base64_attachments,
+            attachments=attachments,
             mentions=mentions,
             text_mode=text_mode,
             edit_timestamp=edit_timestamp,
@@ -73,6 +104,7 @@ class Context:
         text: str,
         *,
         base64_attachments: list[str] | None = None,
+        attachments: list[AttachmentSource] | None = None,
         link_preview: LinkPreview | None = None,
         mentions: (
             list[dict[str, Any]] | None
@@ -90,6 +122,7 @@ class Context:
             self.message.recipient(),
             text,
             base64_attachments=base64_attachments,
+            attachments=attachments,
             quote_author=self.message.source,
             quote_mentions=send_mentions,
             quote_message=self.message.text,
@@ -0,0 +1,381 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+_DROPPED = object()
+_COMPACT_SLACK = 64
+
+
+class OverflowPolicy(str, Enum):
+    """What happens to a message that arrives while the queue is full.
+
+    Attributes:
+        BLOCK: Wait until a consumer takes a message. Receiving pauses meanwhile,
+            which holds back further messages in `signal-cli`.
+        DROP_OLDEST: Drop the message that was queued first.
+        DROP_LOWEST_PRIORITY: Drop the oldest message of the lowest priority, or the
+            new message if its priority is lower than that.
+        REJECT: Drop the new message.
+    """
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_LOWEST_PRIORITY = "drop_lowest_priority"
+    REJECT = "reject"
+
+
+@dataclass
+class QueueStats:
+    """Counters of the queue of received messages.
+
+    Attributes:
+        queued: Number of messages waiting for a consumer.
+        blocked: Number of messages that had to wait for space in the queue.
+        shed: Number of messages dropped because the queue was full.
+    """
+
+    queued: int = 0
+    blocked: int = 0
+    shed: int = 0
+
+
+class _BoundedQueue(ABC, Generic[T]):
+    """Holds at most `maxsize` items, `0` for no limit, and applies `overflow` to
+    items beyond it.
+
+    Every item gets a sequence number, the items not handed out yet are kept by it
+    in `_queued`. Subclasses store `(sequence number, item)` entries as they see
+    fit and hand one out only if `_claim()` confirms it was not dropped meanwhile.
+    Dropped entries are removed from their storage lazily, with `_compact()`.
+
+    Victims are found without scanning the queue: the sequence numbers are indexed
+    in arrival order for `DROP_OLDEST`, and by priority for `DROP_LOWEST_PRIORITY`.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+        *,
+        priority: Callable[[T], int] | None = None,
+        on_shed: Callable[[T], object] | None = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.overflow = OverflowPolicy(overflow)
+        self._priority = priority or (lambda _: 0)
+        self._on_shed = on_shed
+        self._not_full = asyncio.Event()
+        self._sequence = itertools.count()
+        self._queued: dict[int, T] = {}
+        self._stale = 0  # dropped entries still stored by the subclass
+        # Sequence numbers of the victims to choose from, including ones that were
+        # handed out or dropped since and are skipped
+        self._by_arrival: deque[int] = deque()
+        self._by_priority: dict[int, deque[int]] = {}
+        self._priorities: list[int] = []  # heap of the keys of `_by_priority`
+        self._indexed = 0
+        self._stats = QueueStats()
+
+    def qsize(self) -> int:
+        """Number of items that were not handed out yet."""
+        return len(self._queued)
+
+    def full(self) -> bool:
+        return 0 < self.maxsize <= len(self._queued)
+
+    def stats(self) -> QueueStats:
+        """Return a snapshot of the counters."""
+        return QueueStats(
+            queued=len(self._queued),
+            blocked=self._stats.blocked,
+            shed=self._stats.shed,
+        )
+
+    async def put(self, item: T) -> None:
+        """Append `item`, or apply the overflow policy if the queue is full."""
+        if self.full() and self.overflow is OverflowPolicy.BLOCK:
+            self._stats.blocked += 1
+        while self.full():
+            if self.overflow is OverflowPolicy.BLOCK:
+                self._not_full.clear()
+                await self._not_full.wait()
+                continue
+
+            if self.overflow is OverflowPolicy.DROP_OLDEST:
+                victim = self._pop_oldest()
+            elif self.overflow is OverflowPolicy.DROP_LOWEST_PRIORITY:
+                victim = self._pop_lowest_priority(below=self._priority(item))
+            else:
+                victim = None
+            if victim is None:
+                self._shed(item)
+                return
+            self._stale += 1
+            self._shed(self._queued.pop(victim))
+
+        sequence = next(self._sequence)
+        self._queued[sequence] = item
+        self._index(sequence, item)
+        self._push(sequence, item)
+        self._compact_if_needed()
+
+    def _claim(self, sequence: int) -> bool:
+        """Whether the entry `sequence` can be handed out, i.e. was not dropped."""
+        if self._queued.pop(sequence, _DROPPED) is _DROPPED:
+            self._stale -= 1
+            return False
+        if not self.full():
+            self._not_full.set()
+        return True
+
+    def _shed(self, item: T) -> None:
+        self._stats.shed += 1
+        if self._on_shed is None:
+            return
+        try:
+            self._on_shed(item)
+        except Exception:
+            logger.exception("on_shed failed, the item is dropped anyway")
+
+    def _index(self, sequence: int, item: T) -> None:
+        if self.overflow is OverflowPolicy.DROP_OLDEST:
+            self._by_arrival.append(sequence)
+        elif self.overflow is OverflowPolicy.DROP_LOWEST_PRIORITY:
+            priority = self._priority(item)
+            level = self._by_priority.get(priority)
+            if level is None:
+                level = self._by_priority[priority] = deque()
+                heapq.heappush(self._priorities, priority)
+            level.append(sequence)
+        else:
+            return
+        self._indexed += 1
+
+    def _pop_oldest(self) -> int:
+        while True:
+            sequence = self._by_arrival.popleft()
+            self._indexed -= 1
+            if sequence in self._queued:
+                return sequence
+
+    def _pop_lowest_priority(self, below: int) -> int | None:
+        """Remove and return the oldest entry of the lowest priority, `None` if
+        that priority is above `below`."""
+        while True:
+            priority = self._priorities[0]
+            level = self._by_priority[priority]
+            while level and level[0] not in self._queued:
+                level.popleft()
+                self._indexed -= 1
+            if not level:
+                heapq.heappop(self._priorities)
+                del self._by_priority[priority]
+                continue
+            if below < priority:
+                return None
+            self._indexed -= 1
+            return level.popleft()
+
+    def _compact_if_needed(self) -> None:
+        # Amortized, the garbage never outgrows the live entries by much
+        queued = len(self._queued)
+        if self._stale > queued + _COMPACT_SLACK:
+            self._compact()
+            self._stale = 0
+        if self._indexed > 2 * queued + _COMPACT_SLACK:
+            self._by_arrival.clear()
+            self._by_priority.clear()
+            self._priorities.clear()
+            self._indexed = 0
+            for sequence, item in self._queued.items():  # in arrival order
+                self._index(sequence, item)
+
+    @abstractmethod
+    def _push(self, sequence: int, item: T) -> None:
+        """Store the entry `sequence` of `item`."""
+
+    @abstractmethod
+    def _compact(self) -> None:
+        """Remove the stored entries whose sequence number is not in `_queued`."""
+
+
+class InboundQueue(_BoundedQueue[T]):
+    """A priority queue that can be bounded, see [signalbot.OverflowPolicy][].
+
+    Items of higher priority are handed out first, items of the same priority in
+    the order they were put. While an item waits its priority rises by `aging` per
+    second, so that a steady stream of important items cannot starve the others
+    forever: an item of priority `p` waiting for `s` seconds is handed out before
+    a new item of priority `p + aging * s`.
+
+    Without priorities it is a first-in, first-out queue.
+
+    Args:
+        maxsize: Maximum number of queued items, `0` for no limit.
+        overflow: What happens to items beyond `maxsize`.
+        priority: Priority of an item, higher is handed out first.
+        aging: Rise of the priority of a waiting item per second, `0` for none.
+        on_shed: Called with every item that is dropped.
+        clock: Monotonic clock in seconds, only meant to be replaced in tests.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        maxsize: int = 0,
+        overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+        *,
+        priority: Callable[[T], int] | None = None,
+        aging: float = 0.0,
+        on_shed: Callable[[T], object] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(maxsize, overflow, priority=priority, on_shed=on_shed)
+        self.aging = aging
+        self._clock = clock
+        # The effective priority of an entry is `priority + aging * (now - put)`.
+        # Its order does not depend on `now`, so entries are kept in a heap by the
+        # rank `aging * put - priority`, lowest first.
+        self._heap: list[tuple[float, int, T]] = []
+        # One permit per pushed entry
+        self._available = asyncio.Semaphore(0)
+
+    async def get(self) -> T:
+        """Remove and return the item of the highest priority, waiting for one if
+        needed."""
+        while True:
+            await self._available.acquire()
+            if not self._heap:
+                continue  # a permit of an entry removed by _compact()
+            _, sequence, item = heapq.heappop(self._heap)
+            if self._claim(sequence):
+                return item
+
+    def task_done(self) -> None:
+        pass
+
+    def _push(self, sequence: int, item: T) -> None:
+        rank = self.aging * self._clock() - self._priority(item)
+        heapq.heappush(self._heap, (rank, sequence, item))
+        self._available.release()
+
+    def _compact(self) -> None:
+        self._heap = [entry for entry in self._heap if entry[1] in self._queued]
+        heapq.heapify(self._heap)
+
+
+class ShardedQueue(_BoundedQueue[T]):
+    """A queue that hands out the items of the same key one at a time, in order.
+
+    Items are grouped by a key, e.g. the chat of a message. A key is only handed to
+    one worker at a time: its next item is held back until the worker reports the
+    previous one done with `task_done()`. Items of different keys are handled in
+    parallel.
+
+    Every key is hashed to one of `lanes` lanes, each worker serves its own lane
+    first. An idle worker takes the keys waiting in the longest other lane, so a
+    busy key only ever occupies one worker and never blocks the keys sharing its
+    lane.
+
+    Args:
+        key: Returns the key of an item.
+        lanes: Number of lanes, usually the number of workers.
+        maxsize: Maximum number of queued items, `0` for no limit.
+        overflow: What happens to items beyond `maxsize`.
+        priority: Priority of an item, for `OverflowPolicy.DROP_LOWEST_PRIORITY`.
+        on_shed: Called with every item that is dropped.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        key: Callable[[T], Hashable],
+        lanes: int = 1,
+        maxsize: int = 0,
+        overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+        *,
+        priority: Callable[[T], int] | None = None,
+        on_shed: Callable[[T], object] | None = None,
+    ) -> None:
+        super().__init__(maxsize, overflow, priority=priority, on_shed=on_shed)
+        self._key = key
+        # Keys being handled or ready. Keys in the lanes whose items were all
+        # dropped meanwhile are skipped.
+        self._pending: dict[Hashable, deque[tuple[int, T]]] = {}
+        self._lanes: list[deque[Hashable]] = [deque() for _ in range(max(lanes, 1))]
+        self._ready = asyncio.Semaphore(0)  # number of keys in the lanes
+
+    @property
+    def lanes(self) -> int:
+        return len(self._lanes)
+
+    def resize(self, lanes: int) -> None:
+        """Spread the keys over `lanes` lanes, e.g. to match the number of workers."""
+        ready = [key for lane in self._lanes for key in lane]
+        self._lanes = [deque() for _ in range(max(lanes, 1))]
+        for key in ready:
+            self._lane_of(key).append(key)
+
+    async def get(self, lane: int = 0) -> T:
+        """Remove and return the next item of a key no other worker is handling,
+        waiting for one if needed.
+
+        Args:
+            lane: The lane of the worker, keys of this lane are preferred.
+        """
+        while True:
+            await self._ready.acquire()
+            ready = self._lanes[lane % len(self._lanes)]
+            if not ready:
+                ready = max(self._lanes, key=len)  # spill over from a busy lane
+            key = ready.popleft()
+            pending = self._pending[key]
+            while pending:
+                sequence, item = pending.popleft()
+                if self._claim(sequence):
+                    return item
+            del self._pending[key]
+
+    def task_done(self, item: T) -> None:
+        """Report `item` as handled, which releases the next item of its key."""
+        key = self._key(item)
+        if self._pending[key]:
+            self._schedule(key)
+        else:
+            del self._pending[key]
+
+    def _push(self, sequence: int, item: T) -> None:
+        key = self._key(item)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = deque()
+            self._schedule(key)
+        pending.append((sequence, item))
+
+    def _compact(self) -> None:
+        # Keys stay, they are still in a lane or being handled
+        for key, pending in list(self._pending.items()):
+            self._pending[key] = deque(
+                entry for entry in pending if entry[0] in self._queued
+            )
+
+    def _schedule(self, key: Hashable) -> None:
+        self._lane_of(key).append(key)
+        self._ready.release()
+
+    def _lane_of(self, key: Hashable) -> deque[Hashable]:
+        return self._lanes[hash(key) % len(self._lanes)]
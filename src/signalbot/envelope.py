@@ -0,0 +1,118 @@
+"""Schema of the messages received from `signal-cli-rest-api`.
+
+The schema is compiled once, received messages are decoded straight from JSON into
+these models in a single pass. Fields the bot does not use are skipped.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import TYPE_CHECKING, Annotated, Any, TypeVar
+
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    ConfigDict,
+    Field,
+    ValidationError,
+    WrapValidator,
+)
+from pydantic.alias_generators import to_camel
+
+from signalbot.quote import Quote  # noqa: TC001
+from signalbot.reaction import Reaction  # noqa: TC001
+
+if TYPE_CHECKING:
+    from pydantic import ValidatorFunctionWrapHandler
+
+T = TypeVar("T")
+
+# Identifiers repeat across messages, every queued message would keep its own copy
+Interned = Annotated[str, AfterValidator(sys.intern)]
+
+
+def _or_none(value: Any, handler: ValidatorFunctionWrapHandler) -> Any:  # noqa: ANN401
+    try:
+        return handler(value)
+    except ValidationError:
+        return None
+
+
+def _without_none(values: list[T | None]) -> list[T]:
+    return [value for value in values if value is not None]
+
+
+# A malformed part of a message is skipped instead of dropping the whole message
+Lenient = Annotated[T | None, WrapValidator(_or_none)]
+LenientList = Annotated[list[Lenient[T]], AfterValidator(_without_none)]
+
+
+class _Schema(BaseModel):
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+
+class RawAttachment(_Schema):
+    id: str
+    content_type: str | None = None
+    filename: str | None = None
+    size: int | None = None
+
+
+class RawLinkPreview(_Schema):
+    url: str
+    title: str
+    description: str | None = None
+    image: RawAttachment | None = None
+
+
+class RawGroupInfo(_Schema):
+    group_id: Interned | None = None
+    type: str | None = None
+
+
+class RawRemoteDelete(_Schema):
+    timestamp: int
+
+
+class RawDataMessage(_Schema):
+    message: str | None
+    view_once: bool = False
+    attachments: list[RawAttachment] = Field(default_factory=list)
+    previews: LenientList[RawLinkPreview] = Field(default_factory=list)
+    mentions: list[Any] = Field(default_factory=list)
+    group_info: RawGroupInfo | None = None
+    reaction: Lenient[Reaction] = None
+    quote: Quote | None = None
+    remote_delete: RawRemoteDelete | None = None
+    edit_message: RawEditMessage | None = None
+
+
+class RawEditMessage(_Schema):
+    target_sent_timestamp: int
+    data_message: RawDataMessage
+
+
+class RawSyncMessage(_Schema):
+    sent_message: RawDataMessage | None = None
+    read_messages: list[dict[str, Any]] | None = None
+    type: str | None = None
+
+
+class RawEnvelope(_Schema):
+    source: Interned
+    source_number: Interned | None = None
+    source_uuid: Interned
+    timestamp: int | float  # float in hand-written test messages
+    data_message: RawDataMessage | None = None
+    sync_message: RawSyncMessage | None = None
+    edit_message: RawEditMessage | None = None
+
+
+class RawMessage(_Schema):
+    """A received message, decode it with `RawMessage.model_validate_json()`."""
+
+    envelope: RawEnvelope
+    account: str | None = None
+
+
+RawDataMessage.model_rebuild()
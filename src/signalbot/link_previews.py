@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field, InstanceOf
+
+from signalbot.attachment import Attachment  # noqa: TC001
 
 
 class LinkPreview(BaseModel):
@@ -13,10 +15,21 @@ class LinkPreview(BaseModel):
         description: The description of the link preview, if available.
         url: The url of the link preview.
         id: The local filename for a received link preview.
+        thumbnail: A lazy handle to the thumbnail of a received link preview, it is not
+            sent along with the link preview.
     """
 
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     base64_thumbnail: str | None
     title: str
     description: str | None
     url: str
     id: str | None = None
+    thumbnail: InstanceOf[Attachment] | None = Field(default=None, exclude=True)
+
+    async def get_base64_thumbnail(self) -> str | None:
+        """Return `base64_thumbnail`, fetching it from `thumbnail` if necessary."""
+        if self.base64_thumbnail is None and self.thumbnail is not None:
+            self.base64_thumbnail = await self.thumbnail.base64()
+        return self.base64_thumbnail
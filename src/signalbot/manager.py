@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from signalbot.api import ConnectionPool
+from signalbot.attachment_cache import AttachmentCache
+from signalbot.bot import LOGGER_NAME, SignalBot
+from signalbot.bot_config import load_config
+from signalbot.circuit_breaker import CircuitBreaker
+from signalbot.dispatch import OverflowPolicy, QueueStats
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable
+    from pathlib import Path
+
+    from signalbot.bot_config import Config
+
+T = TypeVar("T")
+
+
+class FairQueue(Generic[T]):
+    """A queue with one lane per key that hands out items round-robin over the lanes.
+
+    A key with a long backlog, like a busy account, therefore only delays other keys
+    by one item per round instead of its whole backlog.
+    """
+
+    def __init__(self) -> None:
+        self._lanes: dict[Hashable, deque[T]] = {}
+        self._ready: deque[Hashable] = deque()  # keys with items, in serving order
+        self._not_empty = asyncio.Condition()
+        self._size = 0
+
+    def qsize(self, key: Hashable | None = None) -> int:
+        """Number of queued items, of the lane `key` or in total."""
+        if key is None:
+            return self._size
+        lane = self._lanes.get(key)
+        return len(lane) if lane is not None else 0
+
+    async def put(self, key: Hashable, item: T) -> None:
+        """Append `item` to the lane `key`."""
+        async with self._not_empty:
+            lane = self._lanes.get(key)
+            if lane is None:
+                lane = self._lanes[key] = deque()
+                self._ready.append(key)
+            lane.append(item)
+            self._size += 1
+            self._not_empty.notify()
+
+    async def get(self) -> tuple[Hashable, T]:
+        """Remove and return the next item and its key, waiting for one if needed."""
+        async with self._not_empty:
+            await self._not_empty.wait_for(lambda: self._size > 0)
+            key = self._ready.popleft()
+            lane = self._lanes[key]
+            item = lane.popleft()
+            if lane:
+                self._ready.append(key)  # back of the line
+            else:
+                del self._lanes[key]
+            self._size -= 1
+            return key, item
+
+    def lane(self, key: Hashable) -> FairQueueLane[T]:
+        """Return a view of the lane `key` that can be used like an `asyncio.Queue`
+        to put items."""
+        return FairQueueLane(self, key)
+
+
+class FairQueueLane(Generic[T]):
+    """The lane of a single key in a [signalbot.manager.FairQueue][]."""
+
+    def __init__(self, queue: FairQueue[T], key: Hashable) -> None:
+        self._queue = queue
+        self._key = key
+
+    def qsize(self) -> int:
+        return self._queue.qsize(self._key)
+
+    def stats(self) -> QueueStats:
+        """Return a snapshot of the counters, only `queued` is counted."""
+        return QueueStats(queued=self.qsize())
+
+    async def put(self, item: T) -> None:
+        await self._queue.put(self._key, item)
+
+    def task_done(self) -> None:
+        pass
+
+
+class SignalBotManager:
+    """Runs many accounts against the same `signal-cli-rest-api` in one process.
+
+    Every account is a regular [signalbot.SignalBot][] with its own receive connection
+    and its own commands. They share the HTTP connection pool, the circuit breaker,
+    the attachment cache, the scheduler and a fixed number of consumer workers, so
+    adding an account only adds its connection and its state.
+
+    Messages of all accounts are handled round-robin, a busy account cannot starve
+    the others. Within an account they are handled in the order they were received:
+    `Command.priority`, `priority_aging`, `ordered_dispatch` and `autoscale` have no
+    effect here. The queue is unbounded, so `max_queue_size` and `overflow` are not
+    supported.
+
+    Args:
+        config: The configuration shared by all accounts, its `phone_number` is
+            ignored and can be left out.
+        consumers: Number of workers handling messages of all accounts.
+
+    Example:
+        ```python
+        manager = SignalBotManager({"signal_service": "127.0.0.1:8080"})
+        manager.add_account("+49123456789").register(PingCommand())
+        manager.add_account("+49987654321").register(HelpCommand())
+        manager.start()
+        ```
+    """
+
+    def __init__(
+        self, config: Config | Mapping | Path | str, *, consumers: int = 8
+    ) -> None:
+        self._logger = logging.getLogger(LOGGER_NAME)
+        if isinstance(config, Mapping) and "phone_number" not in config:
+            config = {**config, "phone_number": ""}
+        self.config = load_config(config)
+        self.consumers = consumers
+
+        self.accounts: dict[str, SignalBot] = {}
+        self.pool = ConnectionPool(**self.config.connection_pool.model_dump())
+        self.circuit_breaker = CircuitBreaker(
+            **self.config.circuit_breaker.model_dump()
+        )
+        self.attachment_cache = (
+            AttachmentCache(**self.config.attachment_cache.model_dump())
+            if self.config.attachment_cache is not None
+            else None
+        )
+
+        try:
+            self._event_loop = asyncio.get_event_loop()
+        except RuntimeError:
+            self._event_loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._event_loop)
+        self.scheduler = AsyncIOScheduler(event_loop=self._event_loop)
+
+        self._q: FairQueue[tuple[Any, ...]] = FairQueue()
+        self._tasks: set[asyncio.Task] = set()
+
+    def add_account(self, phone_number: str, **overrides: Any) -> SignalBot:  # noqa: ANN401
+        """Add an account and return its bot to register commands on.
+
+        Args:
+            phone_number: The phone number of the account.
+            overrides: Config options that differ from the shared config, e.g.
+                `storage`.
+        """
+        if phone_number in self.accounts:
+            error_msg = f"Account {phone_number} was already added"
+            raise ValueError(error_msg)
+
+        config = self.config.model_validate(
+            {**self.config.model_dump(), **overrides, "phone_number": phone_number}
+        )
+        if config.max_queue_size or config.overflow is not OverflowPolicy.BLOCK:
+            error_msg = "max_queue_size and overflow are not supported by the manager"
+            raise ValueError(error_msg)
+        bot = SignalBot(
+            config,
+            pool=self.pool,
+            circuit_breaker=self.circuit_breaker,
+            attachment_cache=self.attachment_cache,
+            scheduler=self.scheduler,
+        )
+        bot._q = self._q.lane(phone_number)  # noqa: SLF001
+        self.accounts[phone_number] = bot
+        return bot
+
+    def start(self, run_forever: bool = True) -> None:  # noqa: FBT001, FBT002
+        """Start all accounts and the shared workers.
+
+        Args:
+            run_forever: Whether to start the event loop or only add the tasks to it.
+        """
+        for bot in self.accounts.values():
+            bot.init_task = self._event_loop.create_task(
+                bot._rerun_on_exception(bot._async_post_init, consumers=0),  # noqa: SLF001
+            )
+        for n in range(1, self.consumers + 1):
+            task = self._event_loop.create_task(self._consume(n))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        if run_forever:
+            self.scheduler.start()
+
+            try:
+                self._event_loop.run_forever()
+            finally:
+                self._event_loop.run_until_complete(self.aclose())
+
+    async def aclose(self) -> None:
+        """Stop all accounts and workers and close the shared HTTP connections."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.gather(*(bot.aclose() for bot in self.accounts.values()))
+        await self.pool.aclose()
+
+    async def _consume(self, name: int) -> None:
+        self._logger.info(f"[Manager] Consumer #{name} started")  # noqa: G004
+        while True:
+            phone_number, (command, message, t) = await self._q.get()
+            bot = self.accounts[phone_number]
+            try:
+                await bot._wait_for_signal_service()  # noqa: SLF001
+                await bot._handle_item(name, command, message, t)  # noqa: SLF001
+            except Exception:  # noqa: BLE001, S112
+                continue
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterable
+
+K = TypeVar("K", bound="Hashable")
+V = TypeVar("V", bound="Hashable")
+
+_REGEX_SYNTAX = frozenset(".^$*+?{}[]\\|()")
+# Non-ASCII letters `re.IGNORECASE` matches ASCII letters with, see str.lower()
+_ASCII_FOLD = str.maketrans(
+    {"\u0130": "i", "\u0131": "i", "\u017f": "s", "\u212a": "k"}
+)
+
+
+class TriggerMatcher(Generic[K]):
+    """Finds which of many regular expressions occur in a text.
+
+    Every pattern is registered with a key, e.g. the command it belongs to.
+    `match()` returns the keys of all patterns `re.search` would find in the text.
+
+    The text is scanned once by an Aho-Corasick automaton of keywords:
+
+    - Plain keywords without regex syntax are matched by the scan alone.
+    - Other patterns contribute the longest literal they cannot match without, e.g.
+      `cmd` for `\\bcmd \\d+`. Only patterns whose literal was found are searched.
+    - Patterns without such a literal, e.g. `\\d+`, are always searched.
+
+    With many triggers most of them are ruled out by the scan, without running a
+    regular expression at all.
+    """
+
+    def __init__(self) -> None:
+        # Outputs are (True, key) for keywords, (False, index) for patterns
+        self._keywords: _KeywordAutomaton[tuple[bool, object]] = _KeywordAutomaton()
+        self._folded: _KeywordAutomaton[tuple[bool, object]] = _KeywordAutomaton()
+        self._patterns: list[tuple[K, re.Pattern[str]]] = []
+        self._unfiltered: list[int] = []
+        self._compiled = True
+
+    def add(self, key: K, pattern: str | re.Pattern[str]) -> None:
+        """Register `pattern` under `key`."""
+        self._compiled = False
+        if isinstance(pattern, str) and _REGEX_SYNTAX.isdisjoint(pattern):
+            self._keywords.add(pattern, (True, key))
+            return
+
+        compiled = re.compile(pattern)
+        index = len(self._patterns)
+        self._patterns.append((key, compiled))
+        literal = _required_literal(compiled)
+        if literal is None:
+            self._unfiltered.append(index)
+        elif compiled.flags & re.IGNORECASE:
+            self._folded.add(literal.lower(), (False, index))
+        else:
+            self._keywords.add(literal, (False, index))
+
+    def compile(self) -> None:
+        """Build the automata.
+
+        Called by `match()` if patterns were added since, call it up front to keep
+        the cost out of the first match.
+        """
+        self._keywords.build()
+        self._folded.build()
+        self._compiled = True
+
+    def match(self, text: str) -> set[K]:
+        """Return the keys of all patterns found in `text`."""
+        if not self._compiled:
+            self.compile()
+
+        hits = self._keywords.find(text)
+        if self._folded:
+            hits |= self._folded.find(text.translate(_ASCII_FOLD).lower())
+
+        keys: set[K] = set()
+        candidates = set(self._unfiltered)
+        for is_keyword, value in hits:
+            if is_keyword:
+                keys.add(value)
+            else:
+                candidates.add(value)
+        for index in candidates:
+            key, pattern = self._patterns[index]
+            if key not in keys and pattern.search(text):
+                keys.add(key)
+        return keys
+
+
+def _required_literal(pattern: re.Pattern[str]) -> str | None:
+    """Return the longest literal every match of `pattern` contains, if any."""
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except re.error:
+        return None
+
+    literals = []
+    run: list[str] = []
+
+    def walk(items: Iterable[tuple[object, object]]) -> None:
+        for op, av in items:
+            if op is sre_parse.LITERAL:
+                run.append(chr(av))
+            elif op is sre_parse.SUBPATTERN and av[1] == 0 and av[2] == 0:
+                walk(av[3])  # a group without flags of its own, it is concatenated
+            else:
+                literals.append("".join(run))
+                run.clear()
+
+    walk(parsed)
+    literals.append("".join(run))
+    literal = max(literals, key=len)
+    if not literal:
+        return None
+    if pattern.flags & re.IGNORECASE and not literal.isascii():
+        return None  # only ASCII letters are folded like re.IGNORECASE does
+    return literal
+
+
+class _KeywordAutomaton(Generic[V]):
+    """Aho-Corasick automaton finding which of many keywords occur in a text."""
+
+    def __init__(self) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[set[V]] = [set()]
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, keyword: str, value: V) -> None:
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(set())
+            state = next_state
+        self._out[state].add(value)
+        self._count += 1
+
+    def build(self) -> None:
+        """Compute the failure links, breadth first."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._out[next_state] |= self._out[self._fail[next_state]]
+
+    def find(self, text: str) -> set[V]:
+        found = set(self._out[0])  # the empty keyword occurs in every text
+        if not self._goto[0]:
+            return found
+
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found |= out[state]
+        return found
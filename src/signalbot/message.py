@@ -1,16 +1,27 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import contextlib
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import TYPE_CHECKING
+from pathlib import Path
+from typing import TYPE_CHECKING, TypeVar
 
+from pydantic import ValidationError
+
+from signalbot.attachment import Attachment
+from signalbot.envelope import RawDataMessage, RawMessage
 from signalbot.link_previews import LinkPreview
-from signalbot.quote import Quote
-from signalbot.reaction import Reaction
+from signalbot.quote import Quote  # noqa: TC001
+from signalbot.reaction import Reaction  # noqa: TC001
 
 if TYPE_CHECKING:
+    from collections.abc import Awaitable
+
     from signalbot.api import SignalAPI
+    from signalbot.envelope import RawAttachment, RawEnvelope
+
+T = TypeVar("T")
 
 
 class MessageType(Enum):
@@ -37,7 +48,7 @@ class MessageType(Enum):
     CONTACT_SYNC_MESSAGE = auto()  # Message received is a contact sync
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """Class representing a Signal message.
 
@@ -70,7 +81,13 @@ class Message:
             the message is a `MessageType.DELETE_MESSAGE`.
         updated_group_id: The UUID of the group that was updated, if the message is a
             `MessageType.GROUP_UPDATE_MESSAGE`.
-        raw_message: The raw JSON string of the message as received from the Signal API.
+        raw_message: The raw JSON string of the message as received from the Signal API,
+            or `None` if raw messages are not kept.
+        attachments: A list of `Attachment` handles for the attachments in the message.
+            Their content can be streamed with `aiter_chunks()` or fetched on demand
+            with `read()`/`base64()`. If an attachment spool directory is configured
+            they are downloaded there, if lazy attachments are enabled nothing is
+            downloaded while parsing. In both cases `base64_attachments` is empty.
     """
 
     source: str
@@ -92,6 +109,7 @@ class Message:
     remote_delete_timestamp: int | None = None
     updated_group_id: str | None = None
     raw_message: str | None = None
+    attachments: list[Attachment] = field(default_factory=list)
 
     def recipient(self) -> str:
         """Get the recipient of the message, which is either the group ID for group
@@ -126,67 +144,59 @@ class Message:
 
     @classmethod
     def _extract_message_data(  # noqa: C901, PLR0912
-        cls, envelope: dict
-    ) -> tuple[MessageType, dict, int | None, int | None, str | None]:
+        cls, envelope: RawEnvelope
+    ) -> tuple[MessageType, RawDataMessage, int | None, int | None, str | None]:
         """Extract message type, data_message, and timestamps from envelope."""
         target_sent_timestamp = None
 
-        if "syncMessage" in envelope:
-            sync_message = envelope["syncMessage"]
-            if sync_message == {}:
-                raise UnknownMessageFormatError
-
-            if "readMessages" in sync_message:
+        if envelope.sync_message is not None:
+            sync_message = envelope.sync_message
+            if sync_message.read_messages is not None:
                 message_type = MessageType.READ_MESSAGE
-                data_message = {
-                    "message": "",
-                    "readMessages": sync_message["readMessages"],
-                }
-            elif "type" in sync_message:
-                if sync_message["type"] == "CONTACTS_SYNC":
+                data_message = RawDataMessage(message="")
+            elif sync_message.type is not None:
+                if sync_message.type == "CONTACTS_SYNC":
                     message_type = MessageType.CONTACT_SYNC_MESSAGE
-                    data_message = {"message": ""}
-                    target_sent_timestamp = envelope.get("timestamp")
+                    data_message = RawDataMessage(message="")
+                    target_sent_timestamp = envelope.timestamp
                 else:
                     raise UnknownMessageFormatError
-            else:
+            elif sync_message.sent_message is not None:
                 message_type = MessageType.SYNC_MESSAGE
-                data_message = sync_message["sentMessage"]
+                data_message = sync_message.sent_message
+            else:
+                raise UnknownMessageFormatError
 
-            if "editMessage" in data_message:
+            if data_message.edit_message is not None:
                 message_type = MessageType.EDIT_MESSAGE
-                target_sent_timestamp = data_message["editMessage"][
-                    "targetSentTimestamp"
-                ]
-                data_message = data_message["editMessage"]["dataMessage"]
+                target_sent_timestamp = data_message.edit_message.target_sent_timestamp
+                data_message = data_message.edit_message.data_message
 
-        elif "dataMessage" in envelope:
+        elif envelope.data_message is not None:
             message_type = MessageType.DATA_MESSAGE
-            data_message = envelope["dataMessage"]
+            data_message = envelope.data_message
 
-        elif "editMessage" in envelope:
+        elif envelope.edit_message is not None:
             message_type = MessageType.EDIT_MESSAGE
-            data_message = envelope["editMessage"]["dataMessage"]
-            target_sent_timestamp = envelope["editMessage"]["targetSentTimestamp"]
+            data_message = envelope.edit_message.data_message
+            target_sent_timestamp = envelope.edit_message.target_sent_timestamp
 
         else:
             raise UnknownMessageFormatError
 
         remote_delete_timestamp = None
-        if "remoteDelete" in data_message:
+        if data_message.remote_delete is not None:
             message_type = MessageType.DELETE_MESSAGE
-            remote_delete_timestamp = data_message["remoteDelete"]["timestamp"]
+            remote_delete_timestamp = data_message.remote_delete.timestamp
 
-        if "reaction" in data_message:
+        if data_message.reaction is not None:
             message_type = MessageType.REACTION_MESSAGE
 
         updated_group_id = None
-        if (
-            "groupInfo" in data_message
-            and data_message["groupInfo"]["type"] == "UPDATE"
-        ):
+        group_info = data_message.group_info
+        if group_info is not None and group_info.type == "UPDATE":
             message_type = MessageType.GROUP_UPDATE_MESSAGE
-            updated_group_id = data_message["groupInfo"]["groupId"]
+            updated_group_id = group_info.group_id
 
         return (
             message_type,
@@ -213,22 +223,12 @@ class Message:
             UnknownMessageFormatError: If the message format is unrecognized or if
                 required fields are missing.
         """
+        # Decoding and validating happen in one pass over the JSON
         try:
-            raw_message = json.loads(raw_message_str)
-        except Exception as exc:
-            raise UnknownMessageFormatError from exc
-
-        envelope = raw_message["envelope"]
-        # General attributes
-        try:
-            source = envelope["source"]
-            source_uuid = envelope["sourceUuid"]
-            timestamp = envelope["timestamp"]
-        except Exception as exc:
+            envelope = RawMessage.model_validate_json(raw_message_str).envelope
+        except ValidationError as exc:
             raise UnknownMessageFormatError from exc
 
-        source_number = envelope.get("sourceNumber")
-
         (
             message_type,
             data_message,
@@ -237,99 +237,158 @@ class Message:
             updated_group_id,
         ) = cls._extract_message_data(envelope)
 
-        text = cls._parse_data_message(data_message)
-        group = cls._parse_group_information(data_message)
-        reaction = cls._parse_reaction(data_message)
-        mentions = cls._parse_mentions(data_message)
-        quote = cls._parse_quote(data_message)
-        read_messages = data_message.get("readMessages")
+        group_info = data_message.group_info
+        read_messages = None
+        if message_type is MessageType.READ_MESSAGE:
+            read_messages = envelope.sync_message.read_messages
 
         base64_attachments, attachments_local_filenames, link_previews = [], [], []
+        attachments = []
         view_once = False
         if signal.download_attachments:
-            base64_attachments = await cls._parse_attachments(signal, data_message)
+            view_once = data_message.view_once
+        # Most messages have neither, they are not worth scheduling any tasks for
+        if signal.download_attachments and (
+            data_message.attachments or data_message.previews
+        ):
+            attachments = cls._parse_attachment_handles(signal, data_message)
             attachments_local_filenames = cls._parse_attachments_local_filenames(
                 data_message,
             )
-            link_previews = await cls._parse_previews(signal, data_message)
-            view_once = data_message.get("viewOnce", False)
+            # Attachments and thumbnails of one message are fetched concurrently, but
+            # only up to a share of the global download slots
+            semaphore = asyncio.Semaphore(signal.max_downloads_per_message)
+            if signal.lazy_attachments:
+                # Fetched on first access of the handles
+                fetch_attachments = cls._no_downloads()
+            elif signal.attachment_spool_dir is None:
+                fetch_attachments = cls._parse_attachments(
+                    signal, data_message, semaphore=semaphore
+                )
+            else:
+                fetch_attachments = cls._spool_attachments(
+                    signal, attachments, semaphore=semaphore
+                )
+            base64_attachments, link_previews = await asyncio.gather(
+                fetch_attachments,
+                cls._parse_previews(
+                    signal,
+                    data_message,
+                    fetch_thumbnails=not signal.lazy_attachments,
+                    semaphore=semaphore,
+                ),
+            )
 
         return cls(
-            source,
-            source_number,
-            source_uuid,
-            timestamp,
+            envelope.source,
+            envelope.source_number,
+            envelope.source_uuid,
+            envelope.timestamp,
             message_type,
-            text,
+            data_message.message,
             base64_attachments=base64_attachments,
             attachments_local_filenames=attachments_local_filenames,
             view_once=view_once,
             link_previews=link_previews,
-            group=group,
-            reaction=reaction,
-            mentions=mentions,
-            quote=quote,
+            group=group_info.group_id if group_info is not None else None,
+            reaction=data_message.reaction,
+            mentions=data_message.mentions,
+            quote=data_message.quote,
             read_messages=read_messages,
             target_sent_timestamp=target_sent_timestamp,
             remote_delete_timestamp=remote_delete_timestamp,
             updated_group_id=updated_group_id,
-            raw_message=raw_message_str,
+            raw_message=raw_message_str if signal.keep_raw_messages else None,
+            attachments=attachments,
         )
 
     @classmethod
     async def _parse_attachments(
-        cls, signal: SignalAPI, data_message: dict
+        cls,
+        signal: SignalAPI,
+        data_message: RawDataMessage,
+        *,
+        semaphore: asyncio.Semaphore | None = None,
     ) -> list[str]:
-        if "attachments" not in data_message:
-            return []
-
-        return [
-            await signal.get_attachment(attachment["id"])
-            for attachment in data_message["attachments"]
-        ]
+        return await cls._gather_downloads(
+            signal,
+            [
+                signal.get_attachment(attachment.id)
+                for attachment in data_message.attachments
+            ],
+            semaphore=semaphore,
+        )
 
     @classmethod
-    def _parse_attachments_local_filenames(cls, data_message: dict) -> list[str]:
-        if "attachments" not in data_message:
-            return []
-
-        # The ["id"] is the local filename and the ["filename"] is the remote filename
-        return [attachment["id"] for attachment in data_message["attachments"]]
+    async def _gather_downloads(
+        cls,
+        signal: SignalAPI,
+        downloads: list[Awaitable[T]],
+        *,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> list[T]:
+        """Run `downloads` concurrently within the per-message and global limits."""
+
+        async def bounded(download: Awaitable[T]) -> T:
+            async with contextlib.AsyncExitStack() as stack:
+                if semaphore is not None:
+                    await stack.enter_async_context(semaphore)
+                await stack.enter_async_context(signal.download_semaphore)
+                return await download
+
+        return list(await asyncio.gather(*(bounded(d) for d in downloads)))
 
     @classmethod
-    def _parse_data_message(cls, data_message: dict) -> str:
-        try:
-            return data_message["message"]
-        except KeyError as exc:
-            raise UnknownMessageFormatError from exc
+    async def _no_downloads(cls) -> list:
+        return []
 
     @classmethod
-    def _parse_group_information(cls, message: dict) -> str | None:
-        try:
-            return message["groupInfo"]["groupId"]
-        except KeyError:
-            return None
+    def _parse_attachment_handles(
+        cls, signal: SignalAPI, data_message: RawDataMessage
+    ) -> list[Attachment]:
+        return [
+            cls._attachment_handle(signal, attachment)
+            for attachment in data_message.attachments
+        ]
 
     @classmethod
-    def _parse_mentions(cls, data_message: dict) -> list:
-        try:
-            return data_message["mentions"]
-        except KeyError:
-            return []
+    def _attachment_handle(
+        cls, signal: SignalAPI, attachment: RawAttachment
+    ) -> Attachment:
+        return Attachment(
+            id=attachment.id,
+            content_type=attachment.content_type,
+            filename=attachment.filename,
+            size=attachment.size,
+            signal=signal,
+        )
 
     @classmethod
-    def _parse_reaction(cls, message: dict) -> Reaction | None:
-        try:
-            return Reaction.model_validate(message["reaction"])
-        except (KeyError, ValueError):
-            return None
+    async def _spool_attachments(
+        cls,
+        signal: SignalAPI,
+        attachments: list[Attachment],
+        *,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> list:
+        spool_dir = signal.attachment_spool_dir
+        await cls._gather_downloads(
+            signal,
+            [
+                # The id is generated by signal-cli, never trust it as a path
+                attachment.download(spool_dir / Path(attachment.id).name)
+                for attachment in attachments
+            ],
+            semaphore=semaphore,
+        )
+        return []  # nothing is kept in memory
 
     @classmethod
-    def _parse_quote(cls, message: dict) -> Quote | None:
-        try:
-            return Quote.model_validate(message["quote"])
-        except KeyError:
-            return None
+    def _parse_attachments_local_filenames(
+        cls, data_message: RawDataMessage
+    ) -> list[str]:
+        # The .id is the local filename and the .filename is the remote filename
+        return [attachment.id for attachment in data_message.attachments]
 
     def __str__(self) -> str:
         if self.text is None:
@@ -337,30 +396,39 @@ class Message:
         return self.text
 
     @classmethod
-    async def _parse_previews(cls, signal: SignalAPI, data_message: dict) -> list:
-        parsed_previews = []
-        try:
-            for preview in data_message["previews"]:
-                img = preview["image"]
-                img_id = None
-                if isinstance(img, dict):
-                    img_id = img["id"]
-
-                base64_thumbnail = None
-                if img_id:
-                    base64_thumbnail = await signal.get_attachment(img_id)
-
-                parsed_previews.append(
-                    LinkPreview(
-                        base64_thumbnail=base64_thumbnail,
-                        title=preview["title"],
-                        description=preview["description"],
-                        url=preview["url"],
-                        id=img_id,
-                    ),
-                )
-        except KeyError:
-            return []
+    async def _parse_previews(
+        cls,
+        signal: SignalAPI,
+        data_message: RawDataMessage,
+        *,
+        fetch_thumbnails: bool = True,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> list:
+        parsed_previews = [
+            LinkPreview(
+                base64_thumbnail=None,
+                title=preview.title,
+                description=preview.description,
+                url=preview.url,
+                id=preview.image.id if preview.image is not None else None,
+                thumbnail=(
+                    cls._attachment_handle(signal, preview.image)
+                    if preview.image is not None
+                    else None
+                ),
+            )
+            for preview in data_message.previews
+        ]
+
+        if fetch_thumbnails:
+            with_thumbnails = [lp for lp in parsed_previews if lp.id]
+            thumbnails = await cls._gather_downloads(
+                signal,
+                [signal.get_attachment(lp.id) for lp in with_thumbnails],
+                semaphore=semaphore,
+            )
+            for lp, base64_thumbnail in zip(with_thumbnails, thumbnails, strict=True):
+                lp.base64_thumbnail = base64_thumbnail
 
         return parsed_previews
 
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class TokenBucket:
+    """A token bucket that hands out reservations instead of rejecting requests.
+
+    The bucket refills at `rate` tokens per second up to `burst` tokens. Every
+    reservation takes one token, if none is left the reservation is scheduled for
+    when the next token becomes available. This is the virtual scheduling form of the
+    generic cell rate algorithm, it only needs a single timestamp per bucket.
+
+    Args:
+        rate: Tokens added per second.
+        burst: Maximum number of tokens that can be used at once.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        if rate <= 0 or burst < 1:
+            error_msg = "rate must be positive and burst at least 1"
+            raise ValueError(error_msg)
+        self.rate = rate
+        self.burst = burst
+        self._interval = 1 / rate
+        self._tolerance = (burst - 1) * self._interval
+        self._tat = 0.0  # theoretical arrival time of the next token
+
+    def available_at(self, now: float) -> float:
+        """Return the earliest time a token can be taken."""
+        return max(now, self._tat - self._tolerance)
+
+    def reserve(self, at: float) -> None:
+        """Take a token at time `at`, which must not be before `available_at()`."""
+        self._tat = max(self._tat, at) + self._interval
+
+    def is_idle(self, now: float) -> bool:
+        """Whether the bucket is full again and can be forgotten."""
+        return self._tat <= now
+
+
+@dataclass
+class OutboundStats:
+    """Counters of an [signalbot.outbound.OutboundScheduler][].
+
+    Attributes:
+        queue_depth: Number of requests currently waiting for a token.
+        dispatched: Number of requests let through so far.
+        delayed: Number of requests that had to wait.
+        total_wait: Sum of all waiting times in seconds.
+        max_wait: Longest waiting time in seconds.
+    """
+
+    queue_depth: int = 0
+    dispatched: int = 0
+    delayed: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        """Average waiting time in seconds over all dispatched requests."""
+        if self.dispatched == 0:
+            return 0.0
+        return self.total_wait / self.dispatched
+
+
+class OutboundScheduler:
+    """Paces outgoing requests to stay below the Signal server rate limits.
+
+    Each request takes a token from a global bucket and from one bucket per recipient,
+    groups and contacts use separate limits. Requests over the limit are queued and
+    released in order as soon as all their buckets allow it, they are never rejected.
+
+    Args:
+        global_rate: Requests per second over all recipients.
+        global_burst: Requests that can be sent at once over all recipients.
+        recipient_rate: Requests per second to a single contact.
+        recipient_burst: Requests that can be sent at once to a single contact.
+        group_rate: Requests per second to a single group.
+        group_burst: Requests that can be sent at once to a single group.
+        clock: Monotonic clock in seconds, only meant to be replaced in tests.
+    """
+
+    _PRUNE_THRESHOLD = 1024
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        global_rate: float = 10.0,
+        global_burst: int = 20,
+        recipient_rate: float = 1.0,
+        recipient_burst: int = 5,
+        group_rate: float = 1.0,
+        group_burst: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.recipient_rate = recipient_rate
+        self.recipient_burst = recipient_burst
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self._clock = clock
+        self._global = TokenBucket(global_rate, global_burst)
+        self._buckets: dict[str, TokenBucket] = {}
+        self._stats = OutboundStats()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests currently waiting for a token."""
+        return self._stats.queue_depth
+
+    def stats(self) -> OutboundStats:
+        """Return a snapshot of the scheduler counters."""
+        return OutboundStats(**vars(self._stats))
+
+    async def wait(self, *recipients: str) -> float:
+        """Wait until a request to all `recipients` may be sent.
+
+        Args:
+            recipients: The resolved recipients of the request.
+
+        Returns:
+            The time waited in seconds.
+        """
+        now = self._clock()
+        buckets = [self._global, *(self._bucket(r) for r in recipients)]
+        at = max(bucket.available_at(now) for bucket in buckets)
+        for bucket in buckets:
+            bucket.reserve(at)
+
+        delay = at - now
+        self._stats.dispatched += 1
+        self._stats.total_wait += delay
+        self._stats.max_wait = max(self._stats.max_wait, delay)
+        if delay > 0:
+            self._stats.delayed += 1
+            self._stats.queue_depth += 1
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                self._stats.queue_depth -= 1
+
+        return delay
+
+    def _bucket(self, recipient: str) -> TokenBucket:
+        bucket = self._buckets.get(recipient)
+        if bucket is None:
+            if len(self._buckets) >= self._PRUNE_THRESHOLD:
+                self._prune()
+            if recipient.startswith("group."):
+                bucket = TokenBucket(self.group_rate, self.group_burst)
+            else:
+                bucket = TokenBucket(self.recipient_rate, self.recipient_burst)
+            self._buckets[recipient] = bucket
+        return bucket
+
+    def _prune(self) -> None:
+        now = self._clock()
+        self._buckets = {
+            recipient: bucket
+            for recipient, bucket in self._buckets.items()
+            if not bucket.is_idle(now)
+        }
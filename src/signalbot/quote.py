@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import sys
 from typing import Any
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, field_validator
 from pydantic.alias_generators import to_camel
 
 
@@ -27,3 +28,9 @@ class Quote(BaseModel):
     author_uuid: str
     text: str
     attachments: list[dict[str, Any]]
+
+    @field_validator("author", "author_number", "author_uuid")
+    @classmethod
+    def _intern(cls, value: str | None) -> str | None:
+        # Authors repeat across messages, share one copy of their identifiers
+        return sys.intern(value) if value is not None else None
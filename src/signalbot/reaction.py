@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, ConfigDict
+import sys
+
+from pydantic import BaseModel, ConfigDict, field_validator
 from pydantic.alias_generators import to_camel
 
 
@@ -25,3 +27,9 @@ class Reaction(BaseModel):
     target_author_uuid: str
     target_sent_timestamp: int
     is_remove: bool = False
+
+    @field_validator("target_author", "target_author_number", "target_author_uuid")
+    @classmethod
+    def _intern(cls, value: str | None) -> str | None:
+        # Authors repeat across messages, share one copy of their identifiers
+        return sys.intern(value) if value is not None else None
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import random
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class ReceiveMode(str, Enum):
+    """How messages are received from `signal-cli-rest-api`.
+
+    Attributes:
+        WEBSOCKET: Over a websocket, requires the `json-rpc` mode.
+        POLLING: By polling `GET /v1/receive`, works in the `normal` and `native`
+            modes.
+        AUTO: Over a websocket in the `json-rpc` mode, by polling otherwise.
+    """
+
+    WEBSOCKET = "websocket"
+    POLLING = "polling"
+    AUTO = "auto"
+
+
+@dataclass
+class ReceiveStats:
+    """Counters of a [signalbot.ReceiveMonitor][].
+
+    Attributes:
+        connects: Number of successful connections.
+        reconnects: Number of times the connection was lost.
+        stalls: Number of connections given up because they went silent.
+        rtt: Round-trip time in seconds of the last answered ping, if any.
+        last_gap: Seconds without a connection before the last reconnect.
+        total_gap: Sum of all gaps in seconds.
+        max_gap: Longest gap in seconds.
+    """
+
+    connects: int = 0
+    reconnects: int = 0
+    stalls: int = 0
+    rtt: float | None = None
+    last_gap: float = 0.0
+    total_gap: float = 0.0
+    max_gap: float = 0.0
+
+
+class ReceiveMonitor:
+    """Watches the websocket messages are received on and paces reconnects.
+
+    The monitor pings the server every `ping_interval` seconds and measures the
+    round-trip time. A connection that was silent for `stall_timeout` seconds and
+    whose ping went unanswered for `ping_timeout` seconds is considered stalled, e.g.
+    a half-open TCP connection after a network change, and is aborted so that it can
+    be replaced.
+
+    The first reconnect happens immediately, further attempts back off exponentially
+    with full jitter up to `max_reconnect_delay` seconds until a connection proves to
+    be alive again.
+
+    Args:
+        ping_interval: Seconds between two pings.
+        ping_timeout: Seconds to wait for the answer to a ping.
+        stall_timeout: Seconds of silence after which an unanswered ping means the
+            connection stalled.
+        reconnect_delay: Delay in seconds before the second reconnect attempt,
+            before jitter.
+        max_reconnect_delay: Upper bound in seconds for a reconnect delay.
+        rng: Random number generator in `[0, 1)`, only meant to be replaced in tests.
+        clock: Monotonic clock in seconds, only meant to be replaced in tests.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        ping_interval: float = 20.0,
+        ping_timeout: float = 10.0,
+        stall_timeout: float = 60.0,
+        reconnect_delay: float = 0.5,
+        max_reconnect_delay: float = 10.0,
+        rng: Callable[[], float] = random.random,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.stall_timeout = stall_timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._rng = rng
+        self._clock = clock
+
+        self._stats = ReceiveStats()
+        self._last_activity = clock()
+        self._disconnected_at: float | None = None
+        self._failed_attempts = 0
+
+    def stats(self) -> ReceiveStats:
+        """Return a snapshot of the counters."""
+        return ReceiveStats(**vars(self._stats))
+
+    def connected(self) -> None:
+        """Record that a connection was established."""
+        now = self._clock()
+        self._stats.connects += 1
+        self._last_activity = now
+        if self._disconnected_at is not None:
+            gap = now - self._disconnected_at
+            self._disconnected_at = None
+            self._stats.last_gap = gap
+            self._stats.total_gap += gap
+            self._stats.max_gap = max(self._stats.max_gap, gap)
+            logger.info("Receive connection restored after %0.2f seconds", gap)
+
+    def activity(self) -> None:
+        """Record that the connection is alive, e.g. because a message arrived."""
+        self._last_activity = self._clock()
+        self._failed_attempts = 0
+
+    def disconnected(self) -> None:
+        """Record that the connection was lost."""
+        if self._disconnected_at is None:
+            self._disconnected_at = self._clock()
+            self._stats.reconnects += 1
+
+    def next_delay(self) -> float:
+        """Return the delay in seconds before the next reconnect attempt."""
+        self._failed_attempts += 1
+        if self._failed_attempts == 1:
+            return 0.0
+        ceiling = min(
+            self.max_reconnect_delay,
+            self.reconnect_delay * 2 ** (self._failed_attempts - 2),
+        )
+        return self._rng() * ceiling
+
+    async def watch(self, websocket: Any) -> None:  # noqa: ANN401
+        """Ping `websocket` until it stalls, then abort it.
+
+        Meant to run as a task next to the one reading from `websocket`, which then
+        fails with a connection error.
+        """
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            try:
+                start = self._clock()
+                pong_waiter = await websocket.ping()
+                await asyncio.wait_for(pong_waiter, self.ping_timeout)
+            except asyncio.TimeoutError:
+                if self._clock() - self._last_activity < self.stall_timeout:
+                    continue
+            except Exception:  # noqa: BLE001
+                return  # closed, the reader notices as well
+            else:
+                self._stats.rtt = self._clock() - start
+                self.activity()
+                continue
+
+            self._stats.stalls += 1
+            logger.warning(
+                "Receive connection silent for %0.1f seconds, reconnecting",
+                self._clock() - self._last_activity,
+            )
+            transport = getattr(websocket, "transport", None)
+            if transport is not None:
+                transport.abort()  # a closing handshake would hang as well
+            else:
+                with contextlib.suppress(Exception):
+                    await websocket.close()
+            return
+
+
+class AdaptivePollInterval:
+    """Adapts the pause between two polls for messages to the traffic.
+
+    After a poll that returned messages the next one follows after `min_interval`,
+    every empty poll multiplies the pause by `growth` up to `max_interval`. Busy
+    accounts are therefore polled back to back, idle ones only every few seconds.
+
+    Args:
+        min_interval: Pause in seconds after a poll that returned messages.
+        max_interval: Upper bound in seconds for the pause.
+        first_idle_interval: Pause in seconds after the first empty poll.
+        growth: Factor the pause grows by with every further empty poll.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_interval: float = 0.0,
+        max_interval: float = 5.0,
+        first_idle_interval: float = 0.5,
+        growth: float = 2.0,
+    ) -> None:
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.first_idle_interval = first_idle_interval
+        self.growth = growth
+        self._interval = min_interval
+
+    def next(self, received: int) -> float:
+        """Return the pause in seconds after a poll returning `received` messages."""
+        if received > 0:
+            self._interval = self.min_interval
+        elif self._interval < self.first_idle_interval:
+            self._interval = min(self.max_interval, self.first_idle_interval)
+        else:
+            self._interval = min(self.max_interval, self._interval * self.growth)
+        return self._interval
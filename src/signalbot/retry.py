@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING
+
+import aiohttp
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+"""
+HTTP status codes that are worth retrying for idempotent requests.
+"""
+
+
+class RetryPolicy:
+    """Decides if and when a failed request to `signal-cli-rest-api` is retried.
+
+    Delays grow exponentially with full jitter, i.e. the n-th retry waits a random
+    time between `0` and `min(max_delay, base_delay * 2**(n - 1))`. A `Retry-After`
+    header sent by the server is used as a lower bound for the delay.
+
+    Idempotent requests are retried on connection errors, timeouts and
+    `RETRYABLE_STATUSES`. Other requests, like sending a message, are only retried if
+    the connection could not be established, because otherwise the server might have
+    already processed them.
+
+    Args:
+        max_attempts: Maximum number of attempts per request, `1` disables retries.
+        base_delay: Delay in seconds before the first retry, before jitter.
+        max_delay: Upper bound in seconds for a single delay, before jitter.
+        deadline: Seconds after which a request including all its retries is given
+            up, `None` waits forever.
+        rng: Random number generator in `[0, 1)`, only meant to be replaced in tests.
+        clock: Monotonic clock in seconds, only meant to be replaced in tests.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        max_attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 5.0,
+        deadline: float | None = 60.0,
+        rng: Callable[[], float] = random.random,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self._rng = rng
+        self._clock = clock
+
+    def now(self) -> float:
+        return self._clock()
+
+    def deadline_at(self, start: float) -> float | None:
+        """Return the time at which a request started at `start` is given up."""
+        if self.deadline is None:
+            return None
+        return start + self.deadline
+
+    def is_retryable(self, exc: Exception, *, idempotent: bool) -> bool:
+        """Whether the failure `exc` may be retried."""
+        if isinstance(exc, aiohttp.ClientConnectorError):
+            return True
+        if not idempotent:
+            return False
+        if isinstance(exc, aiohttp.ClientResponseError):
+            return exc.status in RETRYABLE_STATUSES
+        return isinstance(exc, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+    def delay(self, attempt: int, exc: Exception) -> float:
+        """Return the delay in seconds before retrying after the `attempt`-th failure.
+
+        Args:
+            attempt: Number of attempts made so far, starting at `1`.
+            exc: The error of the last attempt.
+        """
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        delay = self._rng() * ceiling
+        retry_after = self.retry_after(exc)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    @staticmethod
+    def retry_after(exc: Exception) -> float | None:
+        """Return the delay requested by a `Retry-After` header, if any."""
+        if not isinstance(exc, aiohttp.ClientResponseError) or not exc.headers:
+            return None
+        value = exc.headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+NO_RETRY = RetryPolicy(max_attempts=1, deadline=None)
+"""
+A policy that tries every request exactly once.
+"""
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+from signalbot.matcher import TriggerMatcher
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+
+    from signalbot.command import Command, Trigger
+    from signalbot.message import Message
+
+E = TypeVar("E", bound=tuple[Any, ...])
+
+
+class CommandRouter(Generic[E]):
+    """Finds the registered commands that can fire for a message.
+
+    The triggers declared by the `triggered`, `regex_triggered` and
+    `reaction_triggered` decorators are indexed once, a message is then looked up
+    by its text and its reaction instead of being handed to every command:
+
+    - exact texts in a hash map, one for case sensitive and one for case insensitive
+      triggers,
+    - regular expressions in a [signalbot.matcher.TriggerMatcher][] scanning the
+      text once for all of them,
+    - reaction emojis in a hash map, next to a list of commands for any reaction,
+    - commands without a trigger in a list of commands that see every message.
+
+    Sets of commands are kept as bitsets, which makes combining them, e.g. with the
+    commands an [signalbot.router.AccessIndex][] allows in a chat, cheap.
+
+    Args:
+        entries: The registered commands, each entry starting with the command.
+    """
+
+    def __init__(self, entries: Sequence[E] = ()) -> None:
+        self.entries = list(entries)
+        # Sets of commands are bitsets, bit i stands for entries[i]
+        self._by_text: dict[str, int] = defaultdict(int)
+        self._by_lower_text: dict[str, int] = defaultdict(int)
+        self._by_emoji: dict[str, int] = defaultdict(int)
+        self._any_reaction = 0
+        self._patterns: TriggerMatcher[int] = TriggerMatcher()
+        self._always = 0
+
+        for i, entry in enumerate(self.entries):
+            self._index(i, _trigger(entry[0]))
+        self._patterns.compile()
+
+    def _index(self, i: int, trigger: Trigger | None) -> None:
+        bit = 1 << i
+        if trigger is None:
+            self._always |= bit
+        elif trigger.texts is not None:
+            for text in trigger.texts:
+                if trigger.case_sensitive:
+                    self._by_text[text] |= bit
+                else:
+                    self._by_lower_text[text.lower()] |= bit
+        elif trigger.patterns is not None:
+            for pattern in trigger.patterns:
+                self._patterns.add(i, pattern)
+        elif trigger.emojis:
+            for emoji in trigger.emojis:
+                self._by_emoji[emoji] |= bit
+        elif trigger.emojis is not None:
+            self._any_reaction |= bit
+        else:
+            self._always |= bit
+
+    def route(self, message: Message, allowed: int = -1) -> list[E]:
+        """Return the entries of the commands that can fire for `message`, in the
+        order they were registered.
+
+        Args:
+            message: The received message.
+            allowed: Bitset of the commands enabled in the chat of `message`, e.g.
+                from an [signalbot.router.AccessIndex][]. All by default.
+        """
+        matches = self._always
+        text = message.text
+        if isinstance(text, str):
+            matches |= self._by_text.get(text, 0)
+            matches |= self._by_lower_text.get(text.lower(), 0)
+            for i in self._patterns.match(text):
+                matches |= 1 << i
+        if message.reaction is not None:
+            matches |= self._any_reaction
+            matches |= self._by_emoji.get(message.reaction.emoji, 0)
+        return [self.entries[i] for i in _bits(matches & allowed)]
+
+
+class AccessIndex:
+    """Which commands are enabled in which chat, as bitsets of command indices.
+
+    Built once from the `contacts` and `groups` the commands were registered with,
+    so that filtering a message takes a hash lookup instead of scanning every allow
+    list. Groups are indexed by their id, which does not change when groups are
+    renamed or their members change.
+
+    Args:
+        acls: The allowed contacts and group ids of each command, `True` for all.
+    """
+
+    def __init__(
+        self, acls: Sequence[tuple[list[str] | bool | None, list[str] | bool | None]]
+    ) -> None:
+        self._all_contacts = 0
+        self._by_contact: dict[str, int] = defaultdict(int)
+        self._all_groups = 0
+        self._by_group: dict[str, int] = defaultdict(int)
+
+        for i, (contacts, group_ids) in enumerate(acls):
+            bit = 1 << i
+            if contacts is True:
+                self._all_contacts |= bit
+            elif isinstance(contacts, list):
+                for contact in contacts:
+                    self._by_contact[contact] |= bit
+            if group_ids is True:
+                self._all_groups |= bit
+            elif isinstance(group_ids, list):
+                for group_id in group_ids:
+                    self._by_group[group_id] |= bit
+
+    def private(self, source: str) -> int:
+        """Bitset of the commands enabled in the private chat with `source`."""
+        return self._all_contacts | self._by_contact.get(source, 0)
+
+    def group(self, group_id: str | None) -> int:
+        """Bitset of the commands enabled in the group `group_id`, if it is known."""
+        if group_id is None:
+            return self._all_groups
+        return self._all_groups | self._by_group.get(group_id, 0)
+
+
+def _bits(bitset: int) -> Iterator[int]:
+    """Yield the indices of the set bits, lowest first."""
+    while bitset:
+        lowest = bitset & -bitset
+        yield lowest.bit_length() - 1
+        bitset ^= lowest
+
+
+def _trigger(command: Command) -> Trigger | None:
+    return getattr(command.handle, "trigger", None)
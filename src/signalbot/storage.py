@@ -5,11 +5,12 @@ try:  # noqa: SIM105
 except ModuleNotFoundError:
     pass
 
-import json
 import sqlite3
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING, Any
 
+from signalbot import codec
+
 if TYPE_CHECKING:
     from pathlib import Path
 
@@ -55,13 +56,13 @@ class SQLiteStorage(Storage):
                 "SELECT value FROM signalbot WHERE key = ?",
                 [key],
             ).fetchone()[0]
-            return json.loads(result)
+            return codec.loads(result)
         except Exception as e:  # noqa: BLE001
             raise StorageError(f"SQLite load failed: {e}")  # noqa: B904, EM102, TRY003
 
     def save(self, key: str, object: Any) -> None:  # noqa: A002, ANN401
         try:
-            value = json.dumps(object)
+            value = codec.dumps(object)
             self._sqlite.execute(
                 "INSERT INTO signalbot VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value=?",  # noqa: E501
                 [key, value, value],
@@ -87,17 +88,13 @@ class RedisStorage(Storage):
 
     def read(self, key: str) -> Any:  # noqa: ANN401
         try:
-            result_bytes = self._redis.get(key)
-            result_str = result_bytes.decode("utf-8")
-            result_dict = json.loads(result_str)
-            return result_dict  # noqa: RET504, TRY300
+            return codec.loads(self._redis.get(key))
         except Exception as e:  # noqa: BLE001
             raise StorageError(f"Redis load failed: {e}")  # noqa: B904, EM102, TRY003
 
     def save(self, key: str, object: Any) -> None:  # noqa: A002, ANN401
         try:
-            object_str = json.dumps(object)
-            self._redis.set(key, object_str)
+            self._redis.set(key, codec.dumps_bytes(object))
         except Exception as e:  # noqa: BLE001
             raise StorageError(f"Redis save failed: {e}")  # noqa: B904, EM102, TRY003
 
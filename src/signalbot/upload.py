@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import mimetypes
+from collections.abc import AsyncIterable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeAlias
+
+from signalbot import codec
+from signalbot.attachment import ATTACHMENT_CHUNK_SIZE, Attachment
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+AttachmentSource: TypeAlias = bytes | Path | str | Attachment | AsyncIterable[bytes]
+"""
+An attachment to upload: its content, the path of a file, a received attachment, or
+an async iterator of chunks.
+"""
+
+
+def is_replayable(source: AttachmentSource) -> bool:
+    """Whether `source` can be read again, e.g. to retry a failed request."""
+    return isinstance(source, (bytes, Path, str, Attachment))
+
+
+async def iter_base64(
+    source: AttachmentSource, chunk_size: int = ATTACHMENT_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """Encode `source` as base64 chunk by chunk.
+
+    Only one chunk of `source` is held in memory at a time.
+    """
+    # Base64 encodes groups of 3 bytes, leftovers are carried to the next chunk
+    rest = b""
+    async for chunk in _iter_chunks(source, chunk_size):
+        data = rest + chunk
+        cut = len(data) - len(data) % 3
+        rest = data[cut:]
+        if cut:
+            yield base64.b64encode(data[:cut])
+    if rest:
+        yield base64.b64encode(rest)
+
+
+async def iter_json_body(
+    payload: dict[str, Any],
+    attachments: list[AttachmentSource],
+    chunk_size: int = ATTACHMENT_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """Serialize `payload` as JSON, with `attachments` appended to its
+    `base64_attachments` while they are being encoded.
+
+    The attachments are never held in memory as a whole, neither raw nor encoded.
+    """
+    base64_attachments = payload.get("base64_attachments") or []
+    fields = {k: v for k, v in payload.items() if k != "base64_attachments"}
+
+    head = codec.dumps(fields)
+    yield head[:-1].encode()  # without the closing brace
+    yield b', "base64_attachments": [' if fields else b'"base64_attachments": ['
+
+    separator = b""
+    for encoded in base64_attachments:
+        yield separator + codec.dumps_bytes(encoded)
+        separator = b", "
+    for source in attachments:
+        # Opening quote and data URI header, escaped as the file name is arbitrary
+        yield separator + codec.dumps_bytes(_data_uri_header(source))[:-1]
+        async for chunk in iter_base64(source, chunk_size):
+            yield chunk  # base64 needs no escaping in JSON
+        yield b'"'
+        separator = b", "
+
+    yield b"]}"
+
+
+async def _iter_chunks(
+    source: AttachmentSource, chunk_size: int
+) -> AsyncIterator[bytes]:
+    if isinstance(source, bytes):
+        for start in range(0, len(source), chunk_size):
+            yield source[start : start + chunk_size]
+    elif isinstance(source, Path):
+        with source.open("rb") as f:
+            while chunk := await asyncio.to_thread(f.read, chunk_size):
+                yield chunk
+    elif isinstance(source, str):
+        async for chunk in _iter_chunks(Path(source), chunk_size):
+            yield chunk
+    elif isinstance(source, Attachment):
+        async for chunk in source.aiter_chunks(chunk_size):
+            yield chunk
+    else:
+        async for chunk in source:
+            yield chunk
+
+
+def _data_uri_header(source: AttachmentSource) -> str:
+    if isinstance(source, str):
+        source = Path(source)
+    if isinstance(source, Path):
+        content_type = mimetypes.guess_type(source.name)[0]
+        filename = source.name
+    elif isinstance(source, Attachment):
+        content_type, filename = source.content_type, source.filename
+    else:
+        return ""
+    if content_type is None:
+        content_type = "application/octet-stream"
+    if filename is None or ";" in filename or "," in filename:
+        return f"data:{content_type};base64,"
+    return f"data:{content_type};filename={filename};base64,"
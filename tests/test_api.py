@@ -1,9 +1,28 @@
+import json
+from collections.abc import AsyncIterator
+
 import aiohttp
 import pytest
 from pytest_mock import MockerFixture
 
-from signalbot import ConnectionMode, SignalAPI
-from signalbot.api import HEALTH_CHECK_GOOD_STATUS, HealthCheckError
+from signalbot import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    ConnectionMode,
+    ConnectionPool,
+    SignalAPI,
+)
+from signalbot.api import (
+    HEALTH_CHECK_GOOD_STATUS,
+    UPLOAD_TIMEOUT,
+    GetAttachmentError,
+    GroupsError,
+    HealthCheckError,
+    ReceiveMessagesError,
+    SendMessageError,
+)
+from signalbot.retry import RetryPolicy
 
 
 class TestAPI:
@@ -76,6 +95,14 @@ class TestAPI:
         actual_uri = self.signal_api._signal_api_uris.receive_ws_uri()
         assert actual_uri == expected_uri
 
+    def test_receive_uri_with_filters(self):
+        expected_uri = f"wss://{self.signal_service}/v1/receive/{self.phone_number}"
+        expected_uri += "?ignore_attachments=true&ignore_stories=true"
+        actual_uri = self.signal_api._signal_api_uris.receive_ws_uri(
+            {"ignore_attachments": "true", "ignore_stories": "true"}
+        )
+        assert actual_uri == expected_uri
+
     def test_send_uri(self):
         expected_uri = f"https://{self.signal_service}/v2/send"
         actual_uri = self.signal_api._signal_api_uris.send_rest_uri()
@@ -192,3 +219,274 @@ class TestAPI:
         assert is_healthy is True
         assert health_check_mock.call_count == 1
         assert signal_api._signal_api_uris.use_https is True
+
+
+class TestConnectionPool:
+    @pytest.mark.asyncio
+    async def test_session_is_reused(self):
+        pool = ConnectionPool(limit_per_host=4, keepalive_timeout=10)
+        session = pool.session()
+
+        assert pool.session() is session
+        assert session.connector.limit_per_host == 4  # noqa: PLR2004
+
+        await pool.aclose()
+
+        assert session.closed
+        assert pool.session() is not session
+        await pool.aclose()
+
+    @pytest.mark.asyncio
+    async def test_requests_share_the_session(self, mocker: MockerFixture):
+        signal_api = SignalAPI("127.0.0.1:8080", "+49123456789")
+        mock = mocker.patch("aiohttp.ClientSession.get", new_callable=mocker.AsyncMock)
+        mock.return_value = mocker.AsyncMock(spec=aiohttp.ClientResponse)
+
+        await signal_api.health_check()
+        session = signal_api.pool._session
+        await signal_api.health_check()
+
+        assert session is not None
+        assert signal_api.pool._session is session
+        assert mock.call_count == 2  # noqa: PLR2004
+        mock.return_value.read.assert_awaited()
+
+        await signal_api.aclose()
+
+
+@pytest.mark.asyncio
+class TestRetries:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker: MockerFixture):
+        self.sleep_mock = mocker.patch(
+            "signalbot.api.asyncio.sleep", new_callable=mocker.AsyncMock
+        )
+        self.signal_api = SignalAPI(
+            "127.0.0.1:8080",
+            "+49123456789",
+            retry_policy=RetryPolicy(max_attempts=3, rng=lambda: 0.5),
+        )
+        self.unavailable = aiohttp.ClientResponseError(
+            request_info=None, history=(), status=503
+        )
+
+    async def test_get_is_retried_on_server_error(self, mocker: MockerFixture):
+        mock = mocker.patch("aiohttp.ClientSession.get", new_callable=mocker.AsyncMock)
+        mock.side_effect = [
+            self.unavailable,
+            mocker.AsyncMock(
+                spec=aiohttp.ClientResponse,
+                json=mocker.AsyncMock(return_value=[]),
+            ),
+        ]
+
+        assert await self.signal_api.get_groups() == []
+        assert mock.call_count == 2  # noqa: PLR2004
+        self.sleep_mock.assert_awaited_once()
+        assert mock.call_args.kwargs["timeout"].total <= 60  # noqa: PLR2004
+
+    @pytest.mark.parametrize(
+        "attachments",
+        [{"base64_attachments": ["Y29udGVudA=="]}, {"attachments": [b"content"]}],
+    )
+    async def test_uploads_are_not_cut_off_by_the_deadline(
+        self, mocker: MockerFixture, attachments: dict
+    ):
+        mock = mocker.patch("aiohttp.ClientSession.post", new_callable=mocker.AsyncMock)
+        mock.return_value = mocker.AsyncMock(spec=aiohttp.ClientResponse)
+
+        await self.signal_api.send("+49987654321", "Hello", **attachments)
+
+        assert mock.call_args.kwargs["timeout"] is UPLOAD_TIMEOUT
+
+    async def test_get_gives_up_after_max_attempts(self, mocker: MockerFixture):
+        mock = mocker.patch("aiohttp.ClientSession.get", new_callable=mocker.AsyncMock)
+        mock.side_effect = self.unavailable
+
+        with pytest.raises(GroupsError):
+            await self.signal_api.get_groups()
+        assert mock.call_count == 3  # noqa: PLR2004
+
+    async def test_send_is_not_retried_on_server_error(self, mocker: MockerFixture):
+        mock = mocker.patch("aiohttp.ClientSession.post", new_callable=mocker.AsyncMock)
+        mock.side_effect = self.unavailable
+
+        with pytest.raises(SendMessageError):
+            await self.signal_api.send("+49987654321", "Hello")
+        assert mock.call_count == 1
+
+    async def test_send_is_retried_on_connect_error(self, mocker: MockerFixture):
+        mock = mocker.patch("aiohttp.ClientSession.post", new_callable=mocker.AsyncMock)
+        mock.side_effect = [
+            aiohttp.ClientConnectorError(
+                connection_key=None, os_error=OSError("refused")
+            ),
+            mocker.AsyncMock(spec=aiohttp.ClientResponse),
+        ]
+
+        await self.signal_api.send("+49987654321", "Hello")
+        assert mock.call_count == 2  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+class TestCircuitBreaker:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.signal_api = SignalAPI(
+            "127.0.0.1:8080",
+            "+49123456789",
+            retry_policy=RetryPolicy(max_attempts=1),
+            circuit_breaker=CircuitBreaker(failure_threshold=2),
+        )
+
+    async def test_requests_fail_fast_while_open(self, mocker: MockerFixture):
+        mock = mocker.patch("aiohttp.ClientSession.get", new_callable=mocker.AsyncMock)
+        mock.side_effect = aiohttp.ServerDisconnectedError()
+
+        for _ in range(2):
+            with pytest.raises(GroupsError):
+                await self.signal_api.get_groups()
+
+        with pytest.raises(CircuitOpenError):
+            await self.signal_api.get_groups()
+        assert mock.call_count == 2  # noqa: PLR2004
+        assert self.signal_api.circuit_breaker.state is CircuitState.OPEN
+
+    async def test_client_errors_do_not_open_the_circuit(self, mocker: MockerFixture):
+        mock = mocker.patch("aiohttp.ClientSession.post", new_callable=mocker.AsyncMock)
+        mock.side_effect = aiohttp.ClientResponseError(
+            request_info=None, history=(), status=400
+        )
+
+        for _ in range(3):
+            with pytest.raises(SendMessageError):
+                await self.signal_api.send("+49987654321", "Hello")
+        assert self.signal_api.circuit_breaker.state is CircuitState.CLOSED
+
+    async def test_health_check_bypasses_open_circuit(self, mocker: MockerFixture):
+        breaker = self.signal_api.circuit_breaker
+        for _ in range(2):
+            breaker.record_failure()
+        mock = mocker.patch("aiohttp.ClientSession.get", new_callable=mocker.AsyncMock)
+        mock.return_value = mocker.AsyncMock(
+            spec=aiohttp.ClientResponse, status=HEALTH_CHECK_GOOD_STATUS
+        )
+
+        assert await self.signal_api._is_signal_service_available()
+        assert breaker.state is CircuitState.HALF_OPEN
+
+
+@pytest.mark.asyncio
+class TestStreamAttachment:
+    async def test_stream_attachment(self, mocker: MockerFixture):
+        signal_api = SignalAPI("127.0.0.1:8080", "+49123456789")
+        chunks = [b"a" * 4, b"b" * 4, b"c"]
+
+        async def iter_chunked(chunk_size: int) -> AsyncIterator[bytes]:  # noqa: ARG001
+            for chunk in chunks:
+                yield chunk
+
+        response = mocker.Mock(spec=aiohttp.ClientResponse)
+        response.content.iter_chunked = iter_chunked
+        mock = mocker.patch("aiohttp.ClientSession.get", new_callable=mocker.AsyncMock)
+        mock.return_value = response
+
+        result = [c async for c in signal_api.stream_attachment("id", chunk_size=4)]
+
+        assert result == chunks
+        response.read.assert_not_called()
+        response.release.assert_called_once()
+        await signal_api.aclose()
+
+    async def test_stream_attachment_error(self, mocker: MockerFixture):
+        signal_api = SignalAPI("127.0.0.1:8080", "+49123456789")
+        mock = mocker.patch("aiohttp.ClientSession.get", new_callable=mocker.AsyncMock)
+        mock.side_effect = aiohttp.ServerDisconnectedError()
+
+        with pytest.raises(GetAttachmentError):
+            async for _ in signal_api.stream_attachment("id"):
+                pass
+        await signal_api.aclose()
+
+
+@pytest.mark.asyncio
+class TestStreamingSend:
+    async def test_attachments_are_streamed(self, mocker: MockerFixture):
+        signal_api = SignalAPI(
+            "127.0.0.1:8080",
+            "+49123456789",
+            retry_policy=RetryPolicy(max_attempts=2, base_delay=0),
+        )
+        bodies = []
+
+        async def post(_uri: str, **kwargs) -> aiohttp.ClientResponse:  # noqa: ANN003
+            bodies.append(b"".join([chunk async for chunk in kwargs["data"]]))
+            if len(bodies) == 1:
+                raise aiohttp.ClientConnectorError(
+                    connection_key=None, os_error=OSError("refused")
+                )
+            return mocker.AsyncMock(spec=aiohttp.ClientResponse)
+
+        mocker.patch("aiohttp.ClientSession.post", side_effect=post)
+
+        await signal_api.send("+49987654321", "Hello", attachments=[b"content"])
+        await signal_api.aclose()
+
+        assert len(bodies) == 2  # noqa: PLR2004
+        assert bodies[0] == bodies[1]
+        payload = json.loads(bodies[1])
+        assert payload["base64_attachments"] == ["Y29udGVudA=="]
+        assert payload["recipients"] == ["+49987654321"]
+
+
+@pytest.mark.asyncio
+class TestReceivePolling:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker: MockerFixture):
+        self.signal_api = SignalAPI("127.0.0.1:8080", "+49123456789")
+        self.get_mock = mocker.patch(
+            "aiohttp.ClientSession.get", new_callable=mocker.AsyncMock
+        )
+
+    def respond(self, mocker: MockerFixture, *batches: list) -> None:
+        self.get_mock.side_effect = [
+            mocker.AsyncMock(
+                spec=aiohttp.ClientResponse, json=mocker.AsyncMock(return_value=batch)
+            )
+            for batch in batches
+        ]
+
+    async def test_receive_batch(self, mocker: MockerFixture):
+        envelopes = [{"envelope": {"timestamp": 1}}, {"envelope": {"timestamp": 2}}]
+        self.respond(mocker, envelopes)
+
+        batch = await self.signal_api.receive_batch(timeout=2, max_messages=10)
+
+        assert [json.loads(raw) for raw in batch] == envelopes
+        uri = "https://127.0.0.1:8080/v1/receive/+49123456789"
+        assert self.get_mock.call_args.args == (uri,)
+        assert self.get_mock.call_args.kwargs["params"] == {
+            "timeout": "2",
+            "max_messages": "10",
+        }
+
+    async def test_receive_polling_sleeps_only_when_idle(self, mocker: MockerFixture):
+        sleep_mock = mocker.patch(
+            "signalbot.api.asyncio.sleep", new_callable=mocker.AsyncMock
+        )
+        self.respond(mocker, [{"envelope": {}}], [], [{"envelope": {}}])
+        self.get_mock.side_effect = [
+            *self.get_mock.side_effect,
+            aiohttp.ClientConnectionError(),
+        ]
+        received = []
+
+        async def receive() -> None:
+            async for raw_message in self.signal_api.receive_polling():
+                received.append(raw_message)  # noqa: PERF401
+
+        with pytest.raises(ReceiveMessagesError):
+            await receive()
+
+        assert len(received) == 2  # noqa: PLR2004
+        assert sleep_mock.await_args_list == [mocker.call(0.5)]
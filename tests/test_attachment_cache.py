@@ -0,0 +1,129 @@
+import base64
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from signalbot.api import SignalAPI
+from signalbot.attachment_cache import AttachmentCache
+
+
+def b64(content: bytes) -> str:
+    return base64.b64encode(content).decode("ascii")
+
+
+@pytest.mark.asyncio
+class TestAttachmentCache:
+    async def test_put_and_get(self, tmp_path: Path):
+        cache = AttachmentCache(tmp_path)
+        await cache.put("a.png", b"content")
+
+        assert "a.png" in cache
+        assert await cache.get("a.png") == b"content"
+        assert await cache.get_base64("a.png") == b64(b"content")
+        assert await cache.get("missing.png") is None
+        assert (cache.hits, cache.misses) == (2, 1)
+
+    async def test_same_content_is_stored_once(self, tmp_path: Path):
+        cache = AttachmentCache(tmp_path)
+        await cache.put("a.png", b"sticker")
+        await cache.put("b.png", b"sticker")
+
+        assert len(cache) == 1
+        assert cache.path("a.png") == cache.path("b.png")
+
+    async def test_least_recently_used_is_evicted(self, tmp_path: Path):
+        cache = AttachmentCache(tmp_path, max_bytes=10)
+        await cache.put("a", b"aaaa")
+        await cache.put("b", b"bbbb")
+        await cache.get("a")
+        await cache.put("c", b"cccc")
+
+        assert cache.size == 8  # noqa: PLR2004
+        assert "b" not in cache
+        assert await cache.get("a") == b"aaaa"
+        assert await cache.get("c") == b"cccc"
+
+    async def test_large_items_are_not_kept_in_memory(self, tmp_path: Path):
+        cache = AttachmentCache(tmp_path, memory_item_max_bytes=4)
+        await cache.put("small", b"1234")
+        await cache.put("large", b"12345")
+
+        cache.path("small").unlink()
+        cache.path("large").unlink()
+
+        assert await cache.get("small") == b"1234"
+        assert await cache.get("large") is None
+        assert "large" not in cache
+
+    async def test_content_survives_restart(self, tmp_path: Path):
+        cache = AttachmentCache(tmp_path)
+        await cache.put("a.png", b"content")
+
+        reloaded = AttachmentCache(tmp_path)
+
+        assert len(reloaded) == 1
+        assert reloaded.size == len(b"content")
+        assert await reloaded.get("a.png") == b"content"
+
+    async def test_ids_of_evicted_content_are_removed(self, tmp_path: Path):
+        cache = AttachmentCache(tmp_path, max_bytes=4)
+        await cache.put("a", b"aaaa")
+        await cache.put("b", b"bbbb")
+
+        reloaded = AttachmentCache(tmp_path, max_bytes=4)
+
+        assert "a" not in reloaded
+        assert await reloaded.get("b") == b"bbbb"
+        assert len(list((tmp_path / "ids").iterdir())) == 1
+
+    async def test_encode_file_reuses_encoding(
+        self, tmp_path: Path, mocker: MockerFixture
+    ):
+        cache = AttachmentCache(tmp_path / "cache")
+        chart = tmp_path / "chart.png"
+        chart.write_bytes(b"chart")
+
+        assert await cache.encode_file(chart) == b64(b"chart")
+        read_bytes_spy = mocker.spy(Path, "read_bytes")
+        assert await cache.encode_file(chart) == b64(b"chart")
+
+        read_bytes_spy.assert_not_called()
+        assert await cache.encode(b"chart") == b64(b"chart")
+        assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+class TestSignalAPIAttachmentCache:
+    async def test_get_attachment_is_fetched_once(
+        self, tmp_path: Path, mocker: MockerFixture
+    ):
+        signal_api = SignalAPI(
+            "127.0.0.1:8080",
+            "+49123456789",
+            attachment_cache=AttachmentCache(tmp_path),
+        )
+        resp = mocker.Mock()
+        resp.read = mocker.AsyncMock(return_value=b"thumbnail")
+        request_mock = mocker.patch.object(
+            signal_api, "_request", new_callable=mocker.AsyncMock, return_value=resp
+        )
+
+        first = await signal_api.get_attachment("thumb.jpg")
+        second = await signal_api.get_attachment("thumb.jpg")
+
+        assert first == second == b64(b"thumbnail")
+        request_mock.assert_awaited_once()
+
+    async def test_download_attachment_copies_cached_file(
+        self, tmp_path: Path, mocker: MockerFixture
+    ):
+        cache = AttachmentCache(tmp_path / "cache")
+        await cache.put("a.png", b"content")
+        signal_api = SignalAPI("127.0.0.1:8080", "+49123456789", attachment_cache=cache)
+        stream_mock = mocker.patch.object(signal_api, "stream_attachment")
+
+        path = await signal_api.download_attachment("a.png", tmp_path / "a.png")
+
+        assert path.read_bytes() == b"content"
+        stream_mock.assert_not_called()
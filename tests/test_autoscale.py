@@ -0,0 +1,76 @@
+import pytest
+
+from signalbot import ConsumerAutoscaler
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestConsumerAutoscaler:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.clock = FakeClock()
+        self.autoscaler = ConsumerAutoscaler(
+            min_consumers=2,
+            max_consumers=10,
+            queue_depth_per_consumer=4,
+            scale_up_wait=0.5,
+            scale_down_wait=0.05,
+            scale_down_after=30.0,
+            clock=self.clock,
+        )
+
+    def test_grows_with_queue_depth(self):
+        assert self.autoscaler.target(3, 12) == 3  # noqa: PLR2004
+        assert self.autoscaler.target(3, 13) == 6  # noqa: PLR2004
+        assert self.autoscaler.target(6, 100) == 10  # noqa: PLR2004
+
+    def test_grows_with_waiting_time(self):
+        self.autoscaler.record_wait(0.1)
+        self.autoscaler.record_wait(0.6)
+        assert self.autoscaler.target(3, 0) == 6  # noqa: PLR2004
+
+        # The waiting times of the last window are forgotten
+        assert self.autoscaler.target(6, 0) == 6  # noqa: PLR2004
+
+    def test_shrinks_after_sustained_low_load(self):
+        assert self.autoscaler.target(4, 0) == 4  # noqa: PLR2004
+        self.clock.now += 29
+        assert self.autoscaler.target(4, 0) == 4  # noqa: PLR2004
+        self.clock.now += 1
+        assert self.autoscaler.target(4, 0) == 3  # noqa: PLR2004
+
+        # One at a time, every `scale_down_after` seconds, down to the minimum
+        self.clock.now += 1
+        assert self.autoscaler.target(3, 0) == 3  # noqa: PLR2004
+        self.clock.now += 60
+        assert self.autoscaler.target(3, 0) == 2  # noqa: PLR2004
+        self.clock.now += 60
+        assert self.autoscaler.target(2, 0) == 2  # noqa: PLR2004
+
+    def test_moderate_load_resets_the_low_load_period(self):
+        self.autoscaler.target(4, 0)
+        self.clock.now += 20
+        self.autoscaler.record_wait(0.2)  # between both thresholds
+        assert self.autoscaler.target(4, 0) == 4  # noqa: PLR2004
+        self.clock.now += 20
+        assert self.autoscaler.target(4, 0) == 4  # noqa: PLR2004
+
+    def test_stats(self):
+        self.autoscaler.record_wait(1.0)
+        self.autoscaler.record_scaling(2, self.autoscaler.target(2, 0))
+        self.autoscaler.record_scaling(4, 4)
+
+        stats = self.autoscaler.stats()
+        assert stats.consumers == 4  # noqa: PLR2004
+        assert (stats.scale_ups, stats.scale_downs) == (1, 0)
+        assert stats.max_wait == 1.0
+
+    def test_invalid_bounds(self):
+        with pytest.raises(ValueError, match="min_consumers"):
+            ConsumerAutoscaler(min_consumers=4, max_consumers=2)
@@ -1,4 +1,5 @@
 import asyncio
+from pathlib import Path
 
 import aiohttp
 import pytest
@@ -7,12 +8,20 @@ from pytest_mock import MockerFixture
 
 from signalbot import (
     MIN_SIGNAL_CLI_REST_API_VERSION,
+    Attachment,
+    CircuitOpenError,
+    CircuitState,
     Command,
     ConnectionMode,
+    Message,
+    MessageType,
+    SendMessageError,
     SignalAPI,
     SignalBot,
 )
+from signalbot.bot import SignalBotError
 from signalbot.context import Context
+from signalbot.receive import ReceiveMode
 from signalbot.utils import DummyCommand
 
 
@@ -76,6 +85,25 @@ class TestProducer(TestCommon):
 
         assert self.signal_bot._q.qsize() == 4  # noqa: PLR2004
 
+    @pytest.mark.asyncio
+    async def test_producer_reconnects_after_connection_loss(
+        self, mocker: MockerFixture
+    ):
+        produce_mock = mocker.patch.object(
+            self.signal_bot,
+            "_produce",
+            side_effect=[SignalBotError("lost"), None, asyncio.CancelledError],
+        )
+        sleep_mock = mocker.patch(
+            "signalbot.bot.asyncio.sleep", new_callable=mocker.AsyncMock
+        )
+
+        with pytest.raises(asyncio.CancelledError):
+            await self.signal_bot._keep_receiving(1)
+
+        assert produce_mock.call_count == 3  # noqa: PLR2004
+        assert sleep_mock.await_args_list[0].args == (0.0,)
+
 
 class TestGetter(TestCommon):
     def test_null_group(self):
@@ -227,6 +255,136 @@ class TestSignalApiVersionCheck(TestCommon):
             await self.signal_bot._check_signal_cli_rest_api_version()
 
 
+@pytest.mark.asyncio
+class TestSignalApiModeCheck(TestCommon):
+    async def test_json_rpc_mode_receives_over_websocket(self, mocker: MockerFixture):
+        mocker.patch.object(
+            self.signal_bot, "signal_cli_rest_api_mode", return_value="json-rpc"
+        )
+
+        await self.signal_bot._check_signal_cli_rest_api_mode()
+
+        assert not self.signal_bot._polling
+
+    async def test_native_mode_falls_back_to_polling(self, mocker: MockerFixture):
+        mocker.patch.object(
+            self.signal_bot, "signal_cli_rest_api_mode", return_value="native"
+        )
+        receive_polling_mock = mocker.patch.object(
+            self.signal_bot._signal, "receive_polling"
+        )
+
+        await self.signal_bot._check_signal_cli_rest_api_mode()
+
+        assert self.signal_bot._polling
+        self.signal_bot._receive()
+        receive_polling_mock.assert_called_once()
+
+    async def test_websocket_mode_requires_json_rpc(self, mocker: MockerFixture):
+        mocker.patch.object(
+            self.signal_bot, "signal_cli_rest_api_mode", return_value="normal"
+        )
+        self.signal_bot.config.receive.mode = ReceiveMode.WEBSOCKET
+
+        with pytest.raises(RuntimeError, match="Wrong signal-cli-rest-api mode"):
+            await self.signal_bot._check_signal_cli_rest_api_mode()
+
+    async def test_polling_mode_rejects_json_rpc(self, mocker: MockerFixture):
+        mocker.patch.object(
+            self.signal_bot, "signal_cli_rest_api_mode", return_value="json-rpc"
+        )
+        self.signal_bot.config.receive.mode = ReceiveMode.POLLING
+
+        with pytest.raises(RuntimeError, match="found 'json-rpc'"):
+            await self.signal_bot._check_signal_cli_rest_api_mode()
+
+
+class TextOnlyCommand(DummyCommand):
+    requires_attachments = False
+
+
+@pytest.mark.asyncio
+class TestReceiveFilters(TestCommon):
+    async def test_unneeded_attachments_and_stories_are_ignored(self):
+        self.signal_bot.register(TextOnlyCommand())
+        await self.signal_bot._resolve_commands()
+
+        self.signal_bot._push_down_receive_filters()
+
+        assert self.signal_bot._signal.receive_params == {
+            "ignore_attachments": "true",
+            "ignore_stories": "true",
+        }
+        assert not self.signal_bot._signal.download_attachments
+
+    async def test_attachments_are_kept_if_a_command_requires_them(self):
+        self.signal_bot.register(TextOnlyCommand())
+        self.signal_bot.register(DummyCommand())
+        await self.signal_bot._resolve_commands()
+
+        self.signal_bot._push_down_receive_filters()
+
+        assert self.signal_bot._signal.receive_params == {"ignore_stories": "true"}
+        assert self.signal_bot._signal.download_attachments
+
+    async def test_config_overrides_commands(self):
+        self.signal_bot.config.ignore_attachments = True
+        self.signal_bot.config.ignore_stories = False
+        self.signal_bot.register(DummyCommand())
+        await self.signal_bot._resolve_commands()
+
+        self.signal_bot._push_down_receive_filters()
+
+        assert self.signal_bot._signal.receive_params == {"ignore_attachments": "true"}
+
+
+class ReactionCommand(DummyCommand):
+    message_types = frozenset({MessageType.REACTION_MESSAGE})
+
+
+@pytest.mark.asyncio
+class TestClassifier(TestCommon):
+    text_message = '{"envelope":{"source":"+4901234567890","sourceUuid":"asdf","timestamp":1633169000000,"dataMessage":{"timestamp":1633169000000,"message":"reaction"}}}'  # noqa: E501
+    typing_message = '{"envelope":{"source":"+4901234567890","sourceUuid":"asdf","timestamp":1633169000000,"typingMessage":{"action":"STARTED"}}}'  # noqa: E501
+    reaction_message = '{"envelope":{"source":"+4901234567890","sourceUuid":"asdf","timestamp":1633169000000,"dataMessage":{"timestamp":1633169000000,"message":null,"reaction":{"emoji":"👍","targetAuthor":"+49123","targetAuthorUuid":"uuid","targetSentTimestamp":1633169000000,"isRemove":false}}}}'  # noqa: E501
+
+    async def produce(self, mocker: MockerFixture, *raw_messages: str) -> None:
+        async def receive():  # noqa: ANN202
+            for raw_message in raw_messages:
+                yield raw_message
+
+        mocker.patch.object(self.signal_bot, "_receive", receive)
+        self.signal_bot._q = asyncio.Queue()
+        await self.signal_bot._resolve_commands()
+        self.signal_bot._build_classifier()
+        await self.signal_bot._produce(1337)
+
+    async def test_unhandled_types_are_not_parsed(self, mocker: MockerFixture):
+        self.signal_bot.register(ReactionCommand())
+        parse_mock = mocker.spy(Message, "parse")
+
+        await self.produce(
+            mocker, self.typing_message, self.reaction_message, self.text_message
+        )
+
+        # The text equals a marker, it has to be parsed to find out
+        assert parse_mock.call_count == 2  # noqa: PLR2004
+        assert self.signal_bot._q.qsize() == 1
+        stats = self.signal_bot.classifier_stats()
+        assert (stats.classified, stats.skipped) == (3, 1)
+
+    async def test_commands_without_types_receive_all_messages(
+        self, mocker: MockerFixture
+    ):
+        self.signal_bot.register(ReactionCommand())
+        self.signal_bot.register(DummyCommand())
+
+        await self.produce(mocker, self.typing_message, self.text_message)
+
+        assert self.signal_bot._q.qsize() == 1
+        assert self.signal_bot.classifier_stats().hit_rate == 0.5  # noqa: PLR2004
+
+
 class TestUsernameValidation(TestCommon):
     def test_valid_username(self):
         valid_usernames = [
@@ -397,3 +555,312 @@ class TestPoll(TestCommon):
             answers,
             allow_multiple_selections=True,
         )
+
+
+@pytest.mark.asyncio
+class TestSendMany(TestCommon):
+    def mock_send(self, mocker: MockerFixture, timestamp: int):
+        send_mock = mocker.AsyncMock()
+        send_mock.return_value = mocker.AsyncMock(
+            spec=aiohttp.ClientResponse,
+            json=mocker.AsyncMock(return_value={"timestamp": str(timestamp)}),
+        )
+        mocker.patch.object(self.signal_bot._signal, "send", send_mock)
+        return send_mock
+
+    async def test_contacts_are_chunked(self, mocker: MockerFixture):
+        timestamp = 1633169000000
+        send_mock = self.mock_send(mocker, timestamp)
+        receivers = [f"+4998765432{i}" for i in range(5)]
+
+        result = await self.signal_bot.send_many(receivers, "Hello", chunk_size=2)
+
+        assert send_mock.call_count == 3  # noqa: PLR2004
+        sent_to = [call.args[0] for call in send_mock.call_args_list]
+        assert sorted(r for batch in sent_to for r in batch) == receivers
+        assert all(len(batch) <= 2 for batch in sent_to)  # noqa: PLR2004
+        assert result.timestamps == dict.fromkeys(receivers, timestamp)
+        assert result.failures == {}
+
+    async def test_groups_are_sent_separately(self, mocker: MockerFixture):
+        send_mock = self.mock_send(mocker, 1633169000000)
+
+        await self.signal_bot.send_many(
+            ["+49987654321", self.group_id, "+49987654322"], "Hello"
+        )
+
+        sent_to = sorted(call.args[0] for call in send_mock.call_args_list)
+        assert sent_to == [["+49987654321", "+49987654322"], [self.group_id]]
+
+    async def test_failures_are_reported_per_receiver(self, mocker: MockerFixture):
+        send_mock = self.mock_send(mocker, 1633169000000)
+        send_mock.side_effect = SendMessageError()
+
+        result = await self.signal_bot.send_many(
+            ["+49987654321", "not a receiver"], "Hello"
+        )
+
+        assert result.timestamps == {}
+        assert isinstance(result.failures["+49987654321"], SendMessageError)
+        assert isinstance(result.failures["not a receiver"], SignalBotError)
+
+    async def test_open_circuit_is_reported_per_receiver(self, mocker: MockerFixture):
+        timestamp = 1633169000000
+        send_mock = self.mock_send(mocker, timestamp)
+        ok = send_mock.return_value
+        send_mock.side_effect = [CircuitOpenError(1.0), ok]
+
+        result = await self.signal_bot.send_many(
+            ["+49987654321", "+49987654322"], "Hello", chunk_size=1
+        )
+
+        assert result.timestamps == {"+49987654322": timestamp}
+        assert isinstance(result.failures["+49987654321"], CircuitOpenError)
+
+    async def test_invalid_response_is_reported_per_receiver(
+        self, mocker: MockerFixture
+    ):
+        timestamp = 1633169000000
+        send_mock = self.mock_send(mocker, timestamp)
+        invalid = mocker.AsyncMock(spec=aiohttp.ClientResponse)
+        invalid.json.side_effect = aiohttp.ContentTypeError(
+            mocker.Mock(), (), message="Attempt to decode JSON"
+        )
+        send_mock.side_effect = [invalid, send_mock.return_value]
+
+        result = await self.signal_bot.send_many(
+            ["+49987654321", "+49987654322"], "Hello", chunk_size=1
+        )
+
+        assert result.timestamps == {"+49987654322": timestamp}
+        assert isinstance(result.failures["+49987654321"], aiohttp.ContentTypeError)
+
+
+@pytest.mark.asyncio
+class TestCircuitBreakerPause(TestCommon):
+    async def test_closed_circuit_does_not_wait(self, mocker: MockerFixture):
+        check_mock = mocker.patch.object(
+            self.signal_bot._signal,
+            "_is_signal_service_available",
+            new_callable=mocker.AsyncMock,
+        )
+
+        await self.signal_bot._wait_for_signal_service()
+
+        check_mock.assert_not_called()
+
+    async def test_open_circuit_pauses_until_service_is_healthy(
+        self, mocker: MockerFixture
+    ):
+        breaker = self.signal_bot.circuit_breaker
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        sleep_mock = mocker.patch("signalbot.bot.asyncio.sleep")
+
+        async def is_signal_service_available() -> None:
+            breaker.record_health_check(healthy=len(check_mock.call_args_list) > 1)
+
+        check_mock = mocker.patch.object(
+            self.signal_bot._signal,
+            "_is_signal_service_available",
+            side_effect=is_signal_service_available,
+        )
+
+        await self.signal_bot._wait_for_signal_service()
+
+        assert check_mock.call_count == 2  # noqa: PLR2004
+        assert sleep_mock.call_count == 2  # noqa: PLR2004
+        assert breaker.state is CircuitState.HALF_OPEN
+
+
+class SlowCommand(Command):
+    def __init__(self) -> None:
+        self.handled = []
+
+    async def handle(self, context: Context) -> None:
+        text = context.message.text
+        self.handled.append(f"start {text}")
+        await asyncio.sleep(0.01 if text == "1" else 0)
+        self.handled.append(f"end {text}")
+
+
+@pytest.mark.asyncio
+class TestOrderedDispatch(TestCommon):
+    async def handle(self, mocker: MockerFixture, *, ordered: bool) -> list[str]:
+        self.signal_bot = SignalBot(
+            {
+                "signal_service": self.signal_service,
+                "phone_number": self.phone_number,
+                "storage": {"type": "in-memory"},
+                "ordered_dispatch": ordered,
+            }
+        )
+        command = SlowCommand()
+        self.signal_bot.register(command)
+        await self.signal_bot._resolve_commands()
+        for text in ["1", "2"]:
+            message = mocker.Mock(
+                text=text, reaction=None, is_private=lambda: True, source="+4911"
+            )
+            message.recipient.return_value = "+4911"
+            await self.signal_bot._ask_commands_to_handle(message)
+
+        consumers = [
+            asyncio.create_task(self.signal_bot._consume(n)) for n in range(1, 3)
+        ]
+        await asyncio.sleep(0.05)
+        for consumer in consumers:
+            consumer.cancel()
+        return command.handled
+
+    async def test_messages_of_a_chat_are_handled_in_order(self, mocker: MockerFixture):
+        handled = await self.handle(mocker, ordered=True)
+
+        assert handled == ["start 1", "end 1", "start 2", "end 2"]
+
+    async def test_messages_are_handled_concurrently_by_default(
+        self, mocker: MockerFixture
+    ):
+        handled = await self.handle(mocker, ordered=False)
+
+        assert handled == ["start 1", "start 2", "end 2", "end 1"]
+
+
+@pytest.mark.asyncio
+class TestConsumerPool(TestCommon):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.signal_bot = SignalBot(
+            {
+                "signal_service": self.signal_service,
+                "phone_number": self.phone_number,
+                "storage": {"type": "in-memory"},
+                "producers": 2,
+                "consumers": 5,
+                "autoscale": {"min_consumers": 1, "max_consumers": 4},
+                "ordered_dispatch": True,
+            }
+        )
+
+    async def test_pool_sizes_come_from_the_config(self, mocker: MockerFixture):
+        mocker.patch.object(
+            self.signal_bot, "_keep_receiving", new_callable=mocker.AsyncMock
+        )
+        await self.signal_bot._create_produce_consume_messages_tasks()
+
+        assert len(self.signal_bot._produce_tasks) == 2  # noqa: PLR2004
+        assert len(self.signal_bot._consume_tasks) == 4  # noqa: PLR2004
+        assert self.signal_bot._autoscale_task is not None
+        await self.signal_bot.aclose()
+
+    async def test_only_idle_consumers_are_stopped(self):
+        self.signal_bot._scale_consumers(3)
+        self.signal_bot._busy_consumers.update({1, 3})
+
+        assert self.signal_bot._scale_consumers(1) == 2  # noqa: PLR2004
+        assert sorted(self.signal_bot._consume_tasks) == [1, 3]
+        assert self.signal_bot._q.lanes == 3  # noqa: PLR2004
+
+        self.signal_bot._busy_consumers.clear()
+        assert self.signal_bot._scale_consumers(1) == 1
+        assert list(self.signal_bot._consume_tasks) == [1]
+        assert self.signal_bot._q.lanes == 1
+        await self.signal_bot.aclose()
+
+    async def test_new_consumers_take_free_numbers(self):
+        self.signal_bot._scale_consumers(3)
+        self.signal_bot._busy_consumers.add(3)
+        self.signal_bot._scale_consumers(1)
+
+        self.signal_bot._scale_consumers(3)
+
+        assert sorted(self.signal_bot._consume_tasks) == [1, 2, 3]
+        await self.signal_bot.aclose()
+
+
+@pytest.mark.asyncio
+class TestQueueOverflow(TestCommon):
+    async def test_shed_messages_are_reported(self, mocker: MockerFixture):
+        on_shed = mocker.AsyncMock()
+        self.signal_bot = SignalBot(
+            {
+                "signal_service": self.signal_service,
+                "phone_number": self.phone_number,
+                "storage": {"type": "in-memory"},
+                "max_queue_size": 1,
+                "overflow": "reject",
+            },
+            on_shed=on_shed,
+        )
+        command = DummyCommand()
+        self.signal_bot.register(command)
+        await self.signal_bot._resolve_commands()
+        messages = [
+            mocker.Mock(text=text, reaction=None, is_private=lambda: True, source="+1")
+            for text in ["1", "2"]
+        ]
+        for message in messages:
+            await self.signal_bot._ask_commands_to_handle(message)
+        await asyncio.sleep(0)
+
+        on_shed.assert_awaited_once_with(command, messages[1])
+        stats = self.signal_bot.queue_stats()
+        assert (stats.queued, stats.shed) == (1, 1)
+
+    async def test_failing_on_shed_is_logged(
+        self, mocker: MockerFixture, caplog: pytest.LogCaptureFixture
+    ):
+        on_shed = mocker.AsyncMock(side_effect=RuntimeError)
+        self.signal_bot = SignalBot(
+            {
+                "signal_service": self.signal_service,
+                "phone_number": self.phone_number,
+                "storage": {"type": "in-memory"},
+                "max_queue_size": 1,
+                "overflow": "reject",
+            },
+            on_shed=on_shed,
+        )
+        self.signal_bot.register(DummyCommand())
+        await self.signal_bot._resolve_commands()
+        for text in ["1", "2"]:
+            message = mocker.Mock(
+                text=text, reaction=None, is_private=lambda: True, source="+1"
+            )
+            await self.signal_bot._ask_commands_to_handle(message)
+
+        assert len(self.signal_bot._shed_tasks) == 1
+        assert not self.signal_bot._produce_tasks
+        await asyncio.gather(*self.signal_bot._shed_tasks)
+        assert "on_shed failed" in caplog.text
+
+
+@pytest.mark.asyncio
+class TestSpooledAttachments(TestCommon):
+    async def test_files_are_deleted_once_all_commands_handled_them(
+        self, mocker: MockerFixture, tmp_path: Path
+    ):
+        self.signal_bot._signal.attachment_spool_dir = tmp_path
+        spooled, kept = tmp_path / "spooled", tmp_path / "elsewhere" / "kept"
+        kept.parent.mkdir()
+        for path in [spooled, kept]:
+            path.write_bytes(b"content")
+        message = mocker.Mock(
+            text="1",
+            reaction=None,
+            is_private=lambda: True,
+            source="+4911",
+            attachments=[Attachment("a", path=spooled), Attachment("b", path=kept)],
+        )
+        for _ in range(2):
+            self.signal_bot.register(DummyCommand())
+        await self.signal_bot._resolve_commands()
+
+        await self.signal_bot._ask_commands_to_handle(message)
+        await self.signal_bot._consume_new_item(1)
+        assert spooled.exists()
+
+        await self.signal_bot._consume_new_item(1)
+        assert not spooled.exists()
+        assert message.attachments[0].path is None
+        assert kept.exists()
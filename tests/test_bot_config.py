@@ -11,13 +11,25 @@ from signalbot.bot_config import (
     RedisConfig,
     load_config,
 )
+from signalbot.dispatch import OverflowPolicy
+from signalbot.receive import ReceiveMode
 
 
 def _connection_mode_representer(dumper: yaml.Dumper, data: ConnectionMode) -> str:
     return dumper.represent_str(data.value)
 
 
+def _receive_mode_representer(dumper: yaml.Dumper, data: ReceiveMode) -> str:
+    return dumper.represent_str(data.value)
+
+
+def _overflow_policy_representer(dumper: yaml.Dumper, data: OverflowPolicy) -> str:
+    return dumper.represent_str(data.value)
+
+
 yaml.add_representer(ConnectionMode, _connection_mode_representer)
+yaml.add_representer(ReceiveMode, _receive_mode_representer)
+yaml.add_representer(OverflowPolicy, _overflow_policy_representer)
 
 
 class TestLoadConfig:
@@ -0,0 +1,80 @@
+import pytest
+
+from signalbot import CircuitBreaker, CircuitOpenError, CircuitState
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCircuitBreaker:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.clock = FakeClock()
+        self.transitions = []
+        self.breaker = CircuitBreaker(
+            failure_threshold=2,
+            recovery_timeout=10.0,
+            on_state_change=lambda old, new: self.transitions.append((old, new)),
+            clock=self.clock,
+        )
+
+    def open_circuit(self):
+        for _ in range(2):
+            self.breaker.before_request()
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        assert self.breaker.state is CircuitState.CLOSED
+
+        self.breaker.record_failure()
+        assert self.breaker.state is CircuitState.OPEN
+        assert self.transitions == [(CircuitState.CLOSED, CircuitState.OPEN)]
+
+    def test_open_circuit_fails_fast(self):
+        self.open_circuit()
+        self.clock.now += 4
+
+        with pytest.raises(CircuitOpenError) as exc_info:
+            self.breaker.before_request()
+        assert exc_info.value.retry_in == 6.0  # noqa: PLR2004
+
+    def test_half_open_allows_one_trial(self):
+        self.open_circuit()
+        self.clock.now += 10
+
+        assert self.breaker.state is CircuitState.HALF_OPEN
+        self.breaker.before_request()
+        with pytest.raises(CircuitOpenError):
+            self.breaker.before_request()
+
+        self.breaker.record_success()
+        assert self.breaker.state is CircuitState.CLOSED
+
+    def test_failed_trial_reopens(self):
+        self.open_circuit()
+        self.clock.now += 10
+        self.breaker.before_request()
+        self.breaker.record_failure()
+
+        assert self.breaker.state is CircuitState.OPEN
+        assert self.breaker.retry_in() == 10.0  # noqa: PLR2004
+
+    def test_healthy_check_half_opens_early(self):
+        self.open_circuit()
+        self.breaker.record_health_check(healthy=True)
+        assert self.breaker.state is CircuitState.HALF_OPEN
+
+    def test_released_trial_can_be_retaken(self):
+        self.open_circuit()
+        self.clock.now += 10
+        self.breaker.before_request()
+        self.breaker.release()
+        self.breaker.before_request()
@@ -0,0 +1,69 @@
+import pytest
+
+from signalbot import EnvelopeClassifier, MessageType
+
+
+def envelope(content: str) -> str:
+    return (
+        '{"envelope":{"source":"+490123456789","sourceUuid":"<uuid>",'
+        f'"timestamp":1632576001632,{content}}}}},"account":"+49987654321"}}'
+    )
+
+
+class TestEnvelopeClassifier:
+    @pytest.mark.parametrize(
+        ("raw_message", "expected"),
+        [
+            (envelope('"typingMessage":{"action":"STARTED"}'), set()),
+            (envelope('"receiptMessage":{"isDelivery":true}'), set()),
+            (envelope('"syncMessage":{}'), set()),
+            (
+                envelope('"dataMessage":{"message":"hi"}'),
+                {MessageType.DATA_MESSAGE},
+            ),
+            (
+                envelope('"syncMessage":{"sentMessage":{"message":"hi"}}'),
+                {MessageType.SYNC_MESSAGE},
+            ),
+            (
+                envelope('"syncMessage":{"readMessages":[]}'),
+                {MessageType.READ_MESSAGE},
+            ),
+            (
+                envelope('"syncMessage":{"type":"CONTACTS_SYNC"}'),
+                {MessageType.CONTACT_SYNC_MESSAGE},
+            ),
+            (
+                envelope('"dataMessage":{"message":null,"reaction":{}}'),
+                {MessageType.DATA_MESSAGE, MessageType.REACTION_MESSAGE},
+            ),
+            (
+                envelope('"dataMessage":{"groupInfo":{"type":"UPDATE"}}'),
+                {MessageType.DATA_MESSAGE, MessageType.GROUP_UPDATE_MESSAGE},
+            ),
+        ],
+    )
+    def test_classify(self, raw_message: str, expected: set[MessageType]):
+        assert EnvelopeClassifier.classify(raw_message) == expected
+
+    def test_text_cannot_fake_a_key(self):
+        raw_message = envelope(r'"dataMessage":{"message":"\"reaction\":{}"}')
+
+        assert EnvelopeClassifier.classify(raw_message) == {MessageType.DATA_MESSAGE}
+
+    def test_accepts(self):
+        classifier = EnvelopeClassifier({MessageType.REACTION_MESSAGE})
+
+        assert classifier.accepts(envelope('"dataMessage":{"reaction":{}}'))
+        assert not classifier.accepts(envelope('"dataMessage":{"message":"hi"}'))
+        assert not classifier.accepts(envelope('"typingMessage":{}'))
+
+        stats = classifier.stats()
+        assert (stats.classified, stats.skipped) == (3, 2)
+        assert stats.hit_rate == pytest.approx(2 / 3)
+
+    def test_accepts_all_messages_by_default(self):
+        classifier = EnvelopeClassifier()
+
+        assert classifier.accepts(envelope('"dataMessage":{"message":"hi"}'))
+        assert not classifier.accepts(envelope('"typingMessage":{}'))
@@ -0,0 +1,34 @@
+import json
+from typing import ClassVar
+
+from signalbot import codec
+
+
+class TestCodec:
+    envelope: ClassVar[dict] = {
+        "envelope": {
+            "source": "+490123456789",
+            "sourceName": "Jürgen 👍",
+            "timestamp": 1632576001632,
+            "dataMessage": {"message": "Uhrzeit", "attachments": [], "viewOnce": False},
+        },
+        "account": "+49987654321",
+    }
+
+    def test_round_trip(self):
+        assert codec.loads(codec.dumps(self.envelope)) == self.envelope
+
+    def test_loads_str_and_bytes(self):
+        raw = json.dumps(self.envelope)
+        assert codec.loads(raw) == self.envelope
+        assert codec.loads(raw.encode()) == self.envelope
+
+    def test_dumps_compatible_with_stdlib(self):
+        assert json.loads(codec.dumps(self.envelope)) == self.envelope
+        assert codec.dumps_bytes(self.envelope) == codec.dumps(self.envelope).encode()
+
+    def test_dumps_is_compact_and_keeps_unicode(self):
+        assert codec.dumps({"a": [1, "ä"]}) == '{"a":[1,"ä"]}'
+
+    def test_backend(self):
+        assert codec.BACKEND in {"orjson", "msgspec", "json"}
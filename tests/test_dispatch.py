@@ -0,0 +1,209 @@
+import asyncio
+
+import pytest
+
+from signalbot.dispatch import InboundQueue, OverflowPolicy, ShardedQueue
+
+
+def chat_of(item: str) -> str:
+    return item.split(":", 1)[0]
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def priority_of(item: str) -> int:
+    return int(item.split(":", 1)[1])
+
+
+@pytest.mark.asyncio
+class TestInboundQueue:
+    async def fill(self, overflow: OverflowPolicy, items: list[str]) -> list[str]:
+        self.shed = []
+        self.queue = InboundQueue(
+            maxsize=3,
+            overflow=overflow,
+            priority=priority_of,
+            on_shed=self.shed.append,
+        )
+        for item in items:
+            await self.queue.put(item)
+        return [await self.queue.get() for _ in range(self.queue.qsize())]
+
+    async def test_unbounded_by_default(self):
+        queue = InboundQueue()
+        for i in range(100):
+            await queue.put(i)
+
+        assert [await queue.get() for _ in range(100)] == list(range(100))
+
+    async def test_higher_priority_first(self):
+        queue = InboundQueue(priority=priority_of)
+        for item in ["a:0", "b:-10", "c:10", "d:0", "e:10"]:
+            await queue.put(item)
+
+        items = [await queue.get() for _ in range(5)]
+
+        assert items == ["c:10", "e:10", "a:0", "d:0", "b:-10"]
+
+    async def test_waiting_items_age(self):
+        clock = FakeClock()
+        queue = InboundQueue(priority=priority_of, aging=1.0, clock=clock)
+        await queue.put("old:-10")
+        clock.now += 5
+        await queue.put("mid:0")
+        clock.now += 10
+        await queue.put("new:0")
+        await queue.put("urgent:20")
+
+        items = [await queue.get() for _ in range(4)]
+
+        # Waiting 15 seconds raised "old" above "new", but not 5 seconds above "mid"
+        assert items == ["urgent:20", "mid:0", "old:-10", "new:0"]
+
+    async def test_block_waits_for_space(self):
+        queue = InboundQueue(maxsize=1)
+        await queue.put("a:0")
+        putter = asyncio.create_task(queue.put("b:0"))
+        await asyncio.sleep(0)
+        assert not putter.done()
+
+        assert await queue.get() == "a:0"
+        await putter
+        assert await queue.get() == "b:0"
+        assert queue.stats().blocked == 1
+
+    async def test_drop_oldest(self):
+        items = await self.fill(
+            OverflowPolicy.DROP_OLDEST, ["a:0", "b:0", "c:0", "d:0"]
+        )
+
+        assert items == ["b:0", "c:0", "d:0"]
+        assert self.shed == ["a:0"]
+
+    async def test_drop_lowest_priority(self):
+        items = await self.fill(
+            OverflowPolicy.DROP_LOWEST_PRIORITY, ["a:1", "b:0", "c:0", "d:1", "e:-1"]
+        )
+
+        assert items == ["a:1", "d:1", "c:0"]
+        assert self.shed == ["b:0", "e:-1"]
+
+    async def test_reject(self):
+        items = await self.fill(OverflowPolicy.REJECT, ["a:0", "b:0", "c:0", "d:0"])
+
+        assert items == ["a:0", "b:0", "c:0"]
+        assert self.shed == ["d:0"]
+        assert self.queue.stats().shed == 1
+
+    async def test_failing_on_shed_is_logged(self, caplog: pytest.LogCaptureFixture):
+        def on_shed(item: str) -> None:
+            raise RuntimeError(item)
+
+        queue = InboundQueue(maxsize=1, overflow=OverflowPolicy.REJECT, on_shed=on_shed)
+        await queue.put("a:0")
+        await queue.put("b:0")
+
+        assert "on_shed failed" in caplog.text
+        assert queue.stats().shed == 1
+        assert await queue.get() == "a:0"
+
+    @pytest.mark.parametrize(
+        "overflow", [OverflowPolicy.DROP_OLDEST, OverflowPolicy.DROP_LOWEST_PRIORITY]
+    )
+    async def test_dropped_entries_are_compacted(self, overflow: OverflowPolicy):
+        queue = InboundQueue(maxsize=10, overflow=overflow, priority=priority_of)
+        for i in range(1000):
+            await queue.put(f"{i}:{i % 2}")
+
+        assert len(queue._heap) <= 2 * queue.maxsize + 64
+        assert queue._indexed <= 2 * queue.maxsize + 64
+        items = [await queue.get() for _ in range(queue.qsize())]
+        if overflow is OverflowPolicy.DROP_OLDEST:
+            kept = range(991, 1000, 2), range(990, 1000, 2)
+        else:
+            kept = (range(981, 1000, 2),)
+        assert items == [f"{i}:{i % 2}" for r in kept for i in r]
+        assert queue.stats().shed == 990  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+class TestShardedQueue:
+    async def test_key_is_held_back_until_done(self):
+        queue = ShardedQueue(chat_of)
+        await queue.put("a:1")
+        await queue.put("a:2")
+        await queue.put("b:1")
+
+        first = await queue.get()
+        second = await queue.get()
+        assert (first, second) == ("a:1", "b:1")
+
+        getter = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        assert not getter.done()  # "a:2" waits for "a:1"
+
+        queue.task_done(first)
+        assert await getter == "a:2"
+        assert queue.qsize() == 0
+
+    async def test_keys_spill_over_to_idle_lanes(self):
+        queue = ShardedQueue(chat_of, lanes=2)
+        items = [f"{chat}:1" for chat in "abcdef"]
+        for item in items:
+            await queue.put(item)
+
+        # A single worker of lane 0 still gets the keys of lane 1
+        assert sorted([await queue.get(0) for _ in items]) == items
+
+    async def test_keys_prefer_their_lane(self):
+        queue = ShardedQueue(chat_of, lanes=2)
+        items = [f"{chat}:1" for chat in "abcdef"]
+        for item in items:
+            await queue.put(item)
+
+        lane = queue._lanes[1]
+        expected = [f"{key}:1" for key in lane]
+        assert [await queue.get(1) for _ in expected] == expected
+
+    async def test_resize_keeps_ready_keys(self):
+        queue = ShardedQueue(chat_of)
+        for item in ["a:1", "b:1", "a:2"]:
+            await queue.put(item)
+
+        queue.resize(4)
+
+        assert queue.lanes == 4  # noqa: PLR2004
+        assert sorted([await queue.get(3), await queue.get(3)]) == ["a:1", "b:1"]
+        assert queue.qsize() == 1
+
+    async def test_keys_of_dropped_items_are_skipped(self):
+        queue = ShardedQueue(chat_of, maxsize=2, overflow=OverflowPolicy.DROP_OLDEST)
+        for item in ["a:1", "b:1", "c:1"]:
+            await queue.put(item)
+
+        assert sorted([await queue.get(), await queue.get()]) == ["b:1", "c:1"]
+        assert queue.qsize() == 0
+
+        getter = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        assert not getter.done()
+        await queue.put("a:2")
+        assert await getter == "a:2"
+
+    async def test_dropped_entries_are_compacted(self):
+        queue = ShardedQueue(chat_of, maxsize=3, overflow=OverflowPolicy.DROP_OLDEST)
+        for i in range(300):
+            await queue.put(f"{'abc'[i % 3]}:{i}")
+
+        assert sum(map(len, queue._pending.values())) <= 2 * queue.maxsize + 64
+        assert sorted([await queue.get() for _ in range(3)]) == [
+            "a:297",
+            "b:298",
+            "c:299",
+        ]
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+from pytest_mock import MockerFixture
+
+from signalbot import Command, Context, SignalBotManager
+from signalbot.manager import FairQueue
+
+
+@pytest.mark.asyncio
+class TestFairQueue:
+    async def test_lanes_are_served_round_robin(self):
+        queue = FairQueue()
+        for i in range(3):
+            await queue.put("busy", f"busy{i}")
+        await queue.put("quiet", "quiet0")
+
+        items = [await queue.get() for _ in range(4)]
+
+        assert items == [
+            ("busy", "busy0"),
+            ("quiet", "quiet0"),
+            ("busy", "busy1"),
+            ("busy", "busy2"),
+        ]
+        assert queue.qsize() == 0
+
+    async def test_get_waits_for_an_item(self):
+        queue = FairQueue()
+        getter = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        assert not getter.done()
+
+        await queue.lane("a").put(1)
+
+        assert await getter == ("a", 1)
+
+
+class RecordingCommand(Command):
+    def __init__(self) -> None:
+        self.handled = []
+
+    async def handle(self, context: Context) -> None:
+        self.handled.append((context.bot.config.phone_number, context.message))
+
+
+@pytest.mark.asyncio
+class TestSignalBotManager:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.manager = SignalBotManager(
+            {"signal_service": "127.0.0.1:8080", "storage": {"type": "in-memory"}},
+            consumers=1,
+        )
+
+    async def test_accounts_share_resources(self):
+        first = self.manager.add_account("+49123456789")
+        second = self.manager.add_account("+49987654321")
+
+        assert first._signal.pool is second._signal.pool is self.manager.pool
+        assert first.circuit_breaker is second.circuit_breaker
+        assert first.scheduler is second.scheduler
+        assert first._signal.phone_number == "+49123456789"
+        assert second._signal.phone_number == "+49987654321"
+
+    async def test_duplicate_account_is_rejected(self):
+        self.manager.add_account("+49123456789")
+
+        with pytest.raises(ValueError, match="already added"):
+            self.manager.add_account("+49123456789")
+
+    async def test_queue_bounds_are_rejected(self):
+        with pytest.raises(ValueError, match="max_queue_size"):
+            self.manager.add_account("+49123456789", max_queue_size=10)
+        with pytest.raises(ValueError, match="overflow"):
+            self.manager.add_account("+49123456789", overflow="reject")
+
+    async def test_queue_stats_count_the_lane(self):
+        bot = self.manager.add_account("+49123456789")
+        await bot._q.put("item")
+
+        assert bot.queue_stats().queued == 1
+
+    async def test_shared_consumers_handle_all_accounts(self, mocker: MockerFixture):
+        commands = {}
+        for phone_number in ["+49123456789", "+49987654321"]:
+            commands[phone_number] = RecordingCommand()
+            bot = self.manager.add_account(phone_number)
+            bot.register(commands[phone_number])
+            await bot._resolve_commands()
+        for bot in self.manager.accounts.values():
+            message = mocker.Mock(is_private=lambda: True, source="+4911")
+            await bot._ask_commands_to_handle(message)
+            assert bot._q.qsize() == 1
+
+        consumer = asyncio.create_task(self.manager._consume(1))
+        for _ in range(10):
+            await asyncio.sleep(0)
+        consumer.cancel()
+
+        for phone_number, command in commands.items():
+            assert [p for p, _ in command.handled] == [phone_number]
+
+    async def test_bots_do_not_close_the_shared_pool(self, mocker: MockerFixture):
+        bot = self.manager.add_account("+49123456789")
+        close_mock = mocker.patch.object(
+            self.manager.pool, "aclose", new_callable=mocker.AsyncMock
+        )
+
+        await bot.aclose()
+        close_mock.assert_not_called()
+
+        await self.manager.aclose()
+        close_mock.assert_awaited_once()
@@ -0,0 +1,60 @@
+import random
+import re
+
+import pytest
+
+from signalbot.matcher import TriggerMatcher
+
+PATTERNS = [
+    "he",
+    "she",
+    "his",
+    "hers",
+    "",
+    r"\d{3}-\d{4}",
+    re.compile("x+", re.IGNORECASE),
+    r"(\w)\1",
+    r"(?P<digit>\d)",
+    r"(?i)abc",
+    "^st",
+    "end$",
+    re.compile("^l", re.MULTILINE),
+]
+
+
+class TestTriggerMatcher:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.matcher = TriggerMatcher()
+        for i, pattern in enumerate(PATTERNS):
+            self.matcher.add(i, pattern)
+
+    def test_patterns_are_filtered_by_literals(self):
+        assert len(self.matcher._patterns) == 8  # noqa: PLR2004
+        assert len(self.matcher._unfiltered) == 3  # noqa: PLR2004
+
+    @pytest.mark.parametrize(
+        "text",
+        ["", "ushers", "call 555-1234", "XX", "aabc", "ABC", "\u017fT", "st\nline end"],
+    )
+    def test_matches_like_re_search(self, text: str):
+        expected = {i for i, p in enumerate(PATTERNS) if re.search(p, text)}
+
+        assert self.matcher.match(text) == expected
+
+    def test_matches_like_re_search_on_random_texts(self):
+        rng = random.Random(0)  # noqa: S311
+        for _ in range(2000):
+            text = "".join(
+                rng.choices("hersixabcABC15-st nd\nlX\u017f", k=rng.randint(0, 20))
+            )
+            expected = {i for i, p in enumerate(PATTERNS) if re.search(p, text)}
+
+            assert self.matcher.match(text) == expected, text
+
+    def test_add_after_match(self):
+        assert self.matcher.match("yes") == {4}
+
+        self.matcher.add("new", "es")
+
+        assert self.matcher.match("yes") == {4, "new"}
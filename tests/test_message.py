@@ -1,10 +1,13 @@
+import asyncio
 import base64
+from collections.abc import AsyncIterator
+from pathlib import Path
 
 import aiohttp
 import pytest
 from pytest_mock import MockerFixture
 
-from signalbot import Message, MessageType
+from signalbot import Message, MessageType, UnknownMessageFormatError
 from signalbot.api import SignalAPI
 
 
@@ -98,7 +101,7 @@ class TestMessage:
 
         mock_response = mocker.AsyncMock(spec=aiohttp.ClientResponse)
         mock_response.raise_for_status = mocker.Mock()
-        mock_response.content.read = mocker.AsyncMock(return_value=attachment_bytes_str)
+        mock_response.read = mocker.AsyncMock(return_value=attachment_bytes_str)
 
         mock_session = mocker.AsyncMock()
         mock_session.get = mocker.AsyncMock(return_value=mock_response)
@@ -122,6 +125,163 @@ class TestMessage:
             == TestMessage.expected_local_filename
         )
 
+    async def test_attachment_handles(self, mocker: MockerFixture):
+        mocker.patch.object(
+            self.signal_api, "get_attachment", new_callable=mocker.AsyncMock
+        )
+        message = await Message.parse(
+            self.signal_api,
+            TestMessage.raw_attachment_message,
+        )
+
+        assert len(message.attachments) == 1
+        attachment = message.attachments[0]
+        assert attachment.id == TestMessage.expected_local_filename
+        assert attachment.content_type == "image/png"
+        assert attachment.filename == "image.png"
+        assert attachment.size == 12005  # noqa: PLR2004
+        assert attachment.path is None
+
+    async def test_attachments_spooled_to_disk(
+        self, mocker: MockerFixture, tmp_path: Path
+    ):
+        async def stream_attachment(
+            attachment_id: str,  # noqa: ARG001
+            chunk_size: int = 0,  # noqa: ARG001
+        ) -> AsyncIterator[bytes]:
+            for chunk in (b"te", b"st"):
+                yield chunk
+
+        self.signal_api.attachment_spool_dir = tmp_path
+        mocker.patch.object(self.signal_api, "stream_attachment", stream_attachment)
+        get_attachment_mock = mocker.patch.object(
+            self.signal_api, "get_attachment", new_callable=mocker.AsyncMock
+        )
+
+        message = await Message.parse(
+            self.signal_api,
+            TestMessage.raw_attachment_message,
+        )
+
+        get_attachment_mock.assert_not_called()
+        assert message.base64_attachments == []
+        attachment = message.attachments[0]
+        assert attachment.path == tmp_path / TestMessage.expected_local_filename
+        with attachment.open() as f:
+            assert f.read() == b"test"
+        chunks = [chunk async for chunk in attachment.aiter_chunks(chunk_size=3)]
+        assert chunks == [b"tes", b"t"]
+        assert list(tmp_path.iterdir()) == [attachment.path]  # noqa: ASYNC240
+
+    async def test_lazy_attachments(self, mocker: MockerFixture):
+        calls = []
+
+        async def stream_attachment(
+            attachment_id: str,
+            chunk_size: int = 0,  # noqa: ARG001
+        ) -> AsyncIterator[bytes]:
+            calls.append(attachment_id)
+            await asyncio.sleep(0)
+            yield b"test"
+
+        self.signal_api.lazy_attachments = True
+        mocker.patch.object(self.signal_api, "stream_attachment", stream_attachment)
+        get_attachment_mock = mocker.patch.object(
+            self.signal_api, "get_attachment", new_callable=mocker.AsyncMock
+        )
+
+        message = await Message.parse(
+            self.signal_api,
+            TestMessage.raw_attachment_message,
+        )
+
+        assert message.base64_attachments == []
+        assert calls == []
+
+        attachment = message.attachments[0]
+        contents = await asyncio.gather(attachment.read(), attachment.read())
+        assert contents == [b"test", b"test"]
+        assert await attachment.base64() == base64.b64encode(b"test").decode()
+        assert calls == [TestMessage.expected_local_filename]
+        get_attachment_mock.assert_not_called()
+
+    async def test_lazy_preview_thumbnail(self, mocker: MockerFixture):
+        raw_message = TestMessage.raw_preview_no_image_message.replace(
+            '"image":null',
+            '"image":{"contentType":"image/jpeg","id":"thumb.jpg","size":4}',
+        )
+        self.signal_api.lazy_attachments = True
+        get_attachment_mock = mocker.patch.object(
+            self.signal_api, "get_attachment", new_callable=mocker.AsyncMock
+        )
+        stream_attachment_mock = mocker.patch.object(
+            self.signal_api, "stream_attachment"
+        )
+        stream_attachment_mock.return_value.__aiter__.return_value = [b"test"]
+
+        message = await Message.parse(self.signal_api, raw_message)
+
+        lp = message.link_previews[0]
+        assert lp.id == "thumb.jpg"
+        assert lp.base64_thumbnail is None
+        assert lp.thumbnail.content_type == "image/jpeg"
+        assert "thumbnail" not in lp.model_dump()
+        assert await lp.get_base64_thumbnail() == base64.b64encode(b"test").decode()
+        assert lp.base64_thumbnail is not None
+        get_attachment_mock.assert_not_called()
+
+    async def test_attachments_downloaded_concurrently(self, mocker: MockerFixture):
+        attachments = ",".join(
+            f'{{"contentType": "image/png", "id": "{i}.png", "size": 4}}'
+            for i in range(6)
+        )
+        raw_message = TestMessage.raw_attachment_message.replace(
+            '[{"contentType": "image/png", "filename": "image.png", "id": "1qeCjjWOOo9Gxv8pfdCw.png","size": 12005}]',  # noqa: E501
+            f"[{attachments}]",
+        )
+        per_message = 2
+        self.signal_api.max_downloads_per_message = per_message
+        in_flight = max_in_flight = 0
+
+        async def get_attachment(attachment_id: str) -> str:
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return attachment_id
+
+        mocker.patch.object(self.signal_api, "get_attachment", get_attachment)
+
+        message = await Message.parse(self.signal_api, raw_message)
+
+        assert message.base64_attachments == [f"{i}.png" for i in range(6)]
+        assert max_in_flight == per_message
+
+    async def test_attachments_share_global_download_limit(self, mocker: MockerFixture):
+        self.signal_api.download_semaphore = asyncio.Semaphore(1)
+        in_flight = max_in_flight = 0
+
+        async def get_attachment(attachment_id: str) -> str:
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return attachment_id
+
+        mocker.patch.object(self.signal_api, "get_attachment", get_attachment)
+
+        messages = await asyncio.gather(
+            *(
+                Message.parse(self.signal_api, TestMessage.raw_attachment_message)
+                for _ in range(3)
+            )
+        )
+
+        assert all(m.base64_attachments for m in messages)
+        assert max_in_flight == 1
+
     # User Chats
 
     async def test_parse_user_chat_message(self):
@@ -148,6 +308,38 @@ class TestMessage:
         assert lp.title == "Example.com - Super example"
         assert lp.description == ""
 
+    async def test_preview_no_description(self):
+        raw_message = TestMessage.raw_preview_no_image_message.replace(
+            ',"description":""', ""
+        )
+        message = await Message.parse(self.signal_api, raw_message)
+
+        assert len(message.link_previews) == 1
+        assert message.link_previews[0].description is None
+
+    async def test_malformed_preview_is_skipped(self):
+        raw_message = TestMessage.raw_preview_no_image_message.replace(
+            '"previews":[', '"previews":[{"description":"no url"},'
+        )
+        message = await Message.parse(self.signal_api, raw_message)
+
+        assert [lp.url for lp in message.link_previews] == ["https://example.com"]
+
+    async def test_reaction_without_author_is_skipped(self):
+        raw_message = TestMessage.raw_reaction_message.replace(
+            '"targetAuthorUuid":"<uuid>",', ""
+        )
+        message = await Message.parse(self.signal_api, raw_message)
+
+        assert message.reaction is None
+        assert message.type == MessageType.SYNC_MESSAGE
+
+    async def test_group_without_id(self):
+        raw_message = TestMessage.raw_data_message.replace('"groupId":"<groupid>",', "")
+        message = await Message.parse(self.signal_api, raw_message)
+
+        assert message.group is None
+
     async def test_contacts_sync_message(self):
         message = await Message.parse(
             self.signal_api, TestMessage.raw_contact_sync_message
@@ -171,3 +363,58 @@ class TestMessage:
         assert rm.get("senderNumber") == "+49987654321"
         assert rm.get("timestamp") == TestMessage.expected_timestamp
         assert "senderUuid" in rm
+
+    async def test_messages_without_data_do_not_share_state(self):
+        first, second = [
+            await Message.parse(self.signal_api, TestMessage.raw_user_read_message)
+            for _ in range(2)
+        ]
+
+        first.mentions.append("x")
+
+        assert second.mentions == []
+
+    @pytest.mark.parametrize(
+        "raw_message",
+        [
+            "not json",
+            '{"account":"+49987654321"}',
+            '{"envelope":{"source":"+490123456789","timestamp":1632576001632}}',
+            '{"envelope":{"source":"+490123456789","sourceUuid":"<uuid>","timestamp":1632576001632,"typingMessage":{"action":"STARTED"}}}',
+            '{"envelope":{"source":"+490123456789","sourceUuid":"<uuid>","timestamp":1632576001632,"syncMessage":{}}}',
+            '{"envelope":{"source":"+490123456789","sourceUuid":"<uuid>","timestamp":1632576001632,"syncMessage":{"blockedNumbers":[]}}}',
+        ],
+    )
+    async def test_unknown_message_format(self, raw_message: str):
+        with pytest.raises(UnknownMessageFormatError):
+            await Message.parse(self.signal_api, raw_message)
+
+    async def test_text_message_schedules_no_downloads(self, mocker: MockerFixture):
+        gather_mock = mocker.patch("signalbot.message.asyncio.gather")
+
+        message = await Message.parse(self.signal_api, TestMessage.raw_data_message)
+
+        assert message.text == TestMessage.expected_text
+        gather_mock.assert_not_called()
+
+    async def test_message_is_slotted(self):
+        message = await Message.parse(self.signal_api, TestMessage.raw_data_message)
+
+        assert not hasattr(message, "__dict__")
+        assert message.raw_message == TestMessage.raw_data_message
+
+    async def test_drop_raw_message(self):
+        self.signal_api.keep_raw_messages = False
+
+        message = await Message.parse(self.signal_api, TestMessage.raw_data_message)
+
+        assert message.raw_message is None
+        assert message.text == TestMessage.expected_text
+
+    async def test_identifiers_are_interned(self):
+        first = await Message.parse(self.signal_api, TestMessage.raw_reaction_message)
+        second = await Message.parse(self.signal_api, TestMessage.raw_reaction_message)
+
+        assert first.source_uuid is second.source_uuid
+        assert first.group is second.group
+        assert first.reaction.target_author is second.reaction.target_author
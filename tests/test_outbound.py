@@ -0,0 +1,74 @@
+import pytest
+from pytest_mock import MockerFixture
+
+from signalbot.outbound import OutboundScheduler, TokenBucket
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenBucket:
+    def test_burst_is_available_immediately(self):
+        bucket = TokenBucket(rate=1.0, burst=3)
+        for _ in range(3):
+            assert bucket.available_at(0.0) == 0.0
+            bucket.reserve(0.0)
+
+        assert bucket.available_at(0.0) == 1.0
+
+    def test_invalid_parameters(self):
+        with pytest.raises(ValueError, match="rate must be positive"):
+            TokenBucket(rate=0, burst=1)
+
+
+@pytest.mark.asyncio
+class TestOutboundScheduler:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker: MockerFixture):
+        self.sleep_mock = mocker.patch(
+            "signalbot.outbound.asyncio.sleep", new_callable=mocker.AsyncMock
+        )
+        self.clock = FakeClock()
+        self.scheduler = OutboundScheduler(
+            global_rate=10.0,
+            global_burst=10,
+            recipient_rate=1.0,
+            recipient_burst=2,
+            group_rate=0.5,
+            group_burst=1,
+            clock=self.clock,
+        )
+
+    async def test_requests_within_burst_are_not_delayed(self):
+        assert await self.scheduler.wait("+49987654321") == 0
+        assert await self.scheduler.wait("+49987654321") == 0
+        self.sleep_mock.assert_not_called()
+
+    async def test_requests_over_the_recipient_limit_are_queued(self):
+        waits = [await self.scheduler.wait("+49987654321") for _ in range(4)]
+
+        assert waits == [0, 0, 1.0, 2.0]
+        stats = self.scheduler.stats()
+        assert stats.delayed == 2  # noqa: PLR2004
+        assert stats.max_wait == 2.0  # noqa: PLR2004
+        assert stats.queue_depth == 0
+
+    async def test_groups_use_their_own_limit(self):
+        group = "group.OyZzqio1xDmYiLsQ1VsqRcUFOU4tK2TcECmYt2KeozHJwglMBHAPS7jlkrm="
+        assert await self.scheduler.wait(group) == 0
+        assert await self.scheduler.wait(group) == 2.0  # noqa: PLR2004
+
+    async def test_recipients_do_not_delay_each_other(self):
+        for i in range(5):
+            assert await self.scheduler.wait(f"+4998765432{i}") == 0
+
+    async def test_global_limit(self):
+        waits = [await self.scheduler.wait(f"+499876543{i:02}") for i in range(11)]
+
+        assert waits[:10] == [0] * 10
+        assert waits[10] == pytest.approx(0.1)
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+from pytest_mock import MockerFixture
+
+from signalbot.receive import AdaptivePollInterval, ReceiveMonitor
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeWebSocket:
+    def __init__(self, mocker: MockerFixture, *, answers: bool) -> None:
+        self.answers = answers
+        self.transport = mocker.Mock()
+
+    async def ping(self) -> asyncio.Future:
+        pong_waiter = asyncio.get_running_loop().create_future()
+        if self.answers:
+            pong_waiter.set_result(0.0)
+        return pong_waiter
+
+
+class MonitorTestCase:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.clock = FakeClock()
+        self.monitor = ReceiveMonitor(
+            ping_interval=10.0,
+            ping_timeout=0.01,
+            stall_timeout=30.0,
+            reconnect_delay=1.0,
+            max_reconnect_delay=4.0,
+            rng=lambda: 1.0,
+            clock=self.clock,
+        )
+
+
+class TestReceiveMonitor(MonitorTestCase):
+    def test_first_reconnect_is_immediate_then_backs_off(self):
+        delays = [self.monitor.next_delay() for _ in range(5)]
+
+        assert delays == [0.0, 1.0, 2.0, 4.0, 4.0]
+
+    def test_activity_resets_backoff(self):
+        self.monitor.next_delay()
+        self.monitor.next_delay()
+        self.monitor.activity()
+
+        assert self.monitor.next_delay() == 0.0
+
+    def test_gaps_are_recorded(self):
+        self.monitor.connected()
+        self.monitor.disconnected()
+        self.clock.now += 3.0
+        self.monitor.disconnected()  # failed attempt during the same gap
+        self.clock.now += 2.0
+        self.monitor.connected()
+
+        stats = self.monitor.stats()
+        assert stats.connects == 2  # noqa: PLR2004
+        assert stats.reconnects == 1
+        assert stats.last_gap == stats.max_gap == stats.total_gap == 5.0  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+class TestReceiveMonitorWatch(MonitorTestCase):
+    @pytest.fixture(autouse=True)
+    def patch_sleep(self, mocker: MockerFixture):
+        self.max_pings = 100
+
+        async def sleep(delay: float) -> None:
+            self.max_pings -= 1
+            if self.max_pings < 0:
+                raise asyncio.CancelledError
+            self.clock.now += delay
+
+        mocker.patch("signalbot.receive.asyncio.sleep", side_effect=sleep)
+
+    async def test_silent_connection_without_pong_is_aborted(
+        self, mocker: MockerFixture
+    ):
+        websocket = FakeWebSocket(mocker, answers=False)
+        self.monitor.connected()
+
+        await self.monitor.watch(websocket)
+
+        websocket.transport.abort.assert_called_once()
+        assert self.clock.now == 130.0  # noqa: PLR2004
+        assert self.monitor.stats().stalls == 1
+
+    async def test_answered_pings_measure_rtt(self, mocker: MockerFixture):
+        websocket = FakeWebSocket(mocker, answers=True)
+        self.max_pings = 5
+
+        with pytest.raises(asyncio.CancelledError):
+            await self.monitor.watch(websocket)
+
+        websocket.transport.abort.assert_not_called()
+        assert self.monitor.stats().rtt == 0.0
+
+
+class TestAdaptivePollInterval:
+    def test_interval_grows_while_idle_and_resets_when_busy(self):
+        interval = AdaptivePollInterval(
+            min_interval=0.0, max_interval=3.0, first_idle_interval=0.5
+        )
+
+        idle = [interval.next(0) for _ in range(5)]
+        busy = interval.next(3)
+
+        assert idle == [0.5, 1.0, 2.0, 3.0, 3.0]
+        assert busy == 0.0
+        assert interval.next(0) == 0.5  # noqa: PLR2004
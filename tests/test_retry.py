@@ -0,0 +1,47 @@
+import aiohttp
+import pytest
+from multidict import CIMultiDict
+
+from signalbot.retry import RetryPolicy
+
+
+def response_error(status: int, headers: dict | None = None):
+    return aiohttp.ClientResponseError(
+        request_info=None,
+        history=(),
+        status=status,
+        headers=CIMultiDict(headers or {}),
+    )
+
+
+class TestRetryPolicy:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.policy = RetryPolicy(base_delay=1.0, max_delay=4.0, rng=lambda: 0.5)
+
+    def test_delay_grows_exponentially_with_jitter(self):
+        delays = [self.policy.delay(n, response_error(503)) for n in range(1, 5)]
+        assert delays == [0.5, 1.0, 2.0, 2.0]
+
+    def test_retry_after_is_a_lower_bound(self):
+        exc = response_error(429, {"Retry-After": "7"})
+        assert self.policy.delay(1, exc) == 7.0  # noqa: PLR2004
+
+    def test_retry_after_http_date(self):
+        exc = response_error(429, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        assert RetryPolicy.retry_after(exc) == 0.0
+
+    def test_idempotent_requests_retry_server_errors(self):
+        assert self.policy.is_retryable(response_error(503), idempotent=True)
+        assert not self.policy.is_retryable(response_error(400), idempotent=True)
+        assert self.policy.is_retryable(TimeoutError(), idempotent=True)
+
+    def test_other_requests_only_retry_connect_failures(self):
+        connect_error = aiohttp.ClientConnectorError(
+            connection_key=None, os_error=OSError("refused")
+        )
+        assert self.policy.is_retryable(connect_error, idempotent=False)
+        assert not self.policy.is_retryable(response_error(503), idempotent=False)
+        assert not self.policy.is_retryable(
+            aiohttp.ServerDisconnectedError(), idempotent=False
+        )
@@ -0,0 +1,153 @@
+import pytest
+
+from signalbot import (
+    Command,
+    Context,
+    Message,
+    MessageType,
+    Reaction,
+    reaction_triggered,
+    regex_triggered,
+    triggered,
+)
+from signalbot.router import AccessIndex, CommandRouter
+
+
+class HiCommand(Command):
+    @triggered("Hi", "Hello")
+    async def handle(self, context: Context):
+        pass
+
+
+class CaseSensitiveCommand(Command):
+    @triggered("Hi", case_sensitive=True)
+    async def handle(self, context: Context):
+        pass
+
+
+class RegexCommand(Command):
+    @regex_triggered(r"\d+")
+    async def handle(self, context: Context):
+        pass
+
+
+class ThumbsUpCommand(Command):
+    @reaction_triggered("👍")
+    async def handle(self, context: Context):
+        pass
+
+
+class AnyReactionCommand(Command):
+    @reaction_triggered()
+    async def handle(self, context: Context):
+        pass
+
+
+class StackedCommand(Command):
+    @triggered("stacked")
+    @regex_triggered(r"stack")
+    async def handle(self, context: Context):
+        pass
+
+
+class PlainCommand(Command):
+    async def handle(self, context: Context):
+        pass
+
+
+def new_message(text: str | None, emoji: str | None = None) -> Message:
+    reaction = None
+    if emoji is not None:
+        reaction = Reaction(
+            emoji=emoji,
+            target_author="+49123456789",
+            target_author_uuid="<uuid>",
+            target_sent_timestamp=1,
+        )
+    return Message(
+        source="+49123456789",
+        source_number="+49123456789",
+        source_uuid="<uuid>",
+        timestamp=1,
+        type=MessageType.DATA_MESSAGE,
+        text=text,
+        reaction=reaction,
+    )
+
+
+class TestCommandRouter:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.commands = {
+            "hi": HiCommand(),
+            "case": CaseSensitiveCommand(),
+            "regex": RegexCommand(),
+            "thumbs_up": ThumbsUpCommand(),
+            "any_reaction": AnyReactionCommand(),
+            "stacked": StackedCommand(),
+            "plain": PlainCommand(),
+        }
+        self.names = {id(c): name for name, c in self.commands.items()}
+        self.router = CommandRouter([(c,) for c in self.commands.values()])
+
+    def route(self, message: Message) -> list[str]:
+        return [self.names[id(command)] for (command,) in self.router.route(message)]
+
+    @pytest.mark.parametrize(
+        ("text", "emoji", "expected"),
+        [
+            ("hi", None, ["hi", "stacked", "plain"]),
+            ("Hi", None, ["hi", "case", "stacked", "plain"]),
+            ("hello", None, ["hi", "stacked", "plain"]),
+            ("bye", None, ["stacked", "plain"]),
+            ("call 110", None, ["regex", "stacked", "plain"]),
+            (None, "👍", ["thumbs_up", "any_reaction", "stacked", "plain"]),
+            (None, "❤️", ["any_reaction", "stacked", "plain"]),
+        ],
+    )
+    def test_route(self, text: str | None, emoji: str | None, expected: list[str]):
+        assert self.route(new_message(text, emoji)) == expected
+
+    def test_decorators_attach_their_trigger(self):
+        trigger = HiCommand().handle.trigger
+
+        assert trigger.texts == {"Hi", "Hello"}
+        assert not trigger.case_sensitive
+        assert StackedCommand().handle.trigger is None
+        assert not hasattr(PlainCommand().handle, "trigger")
+
+    def test_route_within_allowed_commands(self):
+        allowed = 1 << 0 | 1 << 6  # "hi" and "plain"
+
+        assert [
+            self.names[id(command)]
+            for (command,) in self.router.route(new_message("Hi"), allowed)
+        ] == ["hi", "plain"]
+
+
+class TestAccessIndex:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.index = AccessIndex(
+            [
+                (True, True),
+                (["+49123"], False),
+                (False, ["group.a", "group.b"]),
+                (["+49123", "+49456"], ["group.b"]),
+                (None, None),
+            ]
+        )
+
+    @pytest.mark.parametrize(
+        ("source", "expected"),
+        [("+49123", 0b01011), ("+49456", 0b01001), ("+49789", 0b00001)],
+    )
+    def test_private(self, source: str, expected: int):
+        assert self.index.private(source) == expected
+
+    @pytest.mark.parametrize(
+        ("group_id", "expected"),
+        [("group.a", 0b00101), ("group.b", 0b01101), ("group.c", 0b1), (None, 0b1)],
+    )
+    def test_group(self, group_id: str | None, expected: int):
+        assert self.index.group(group_id) == expected
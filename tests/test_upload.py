@@ -0,0 +1,86 @@
+import base64
+import json
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+
+from signalbot import Attachment
+from signalbot.upload import is_replayable, iter_base64, iter_json_body
+
+
+async def collect(chunks: AsyncIterator[bytes]) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+async def generate(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.asyncio
+class TestUpload:
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 7, 1024])
+    async def test_iter_base64_matches_b64encode(self, chunk_size: int):
+        content = bytes(range(256)) * 3 + b"xy"
+
+        encoded = await collect(iter_base64(content, chunk_size))
+
+        assert encoded == base64.b64encode(content)
+
+    async def test_iter_base64_async_iterator(self):
+        encoded = await collect(iter_base64(generate(b"a", b"bc", b"defg")))
+
+        assert encoded == base64.b64encode(b"abcdefg")
+
+    async def test_iter_base64_does_not_buffer_the_source(self):
+        chunk_sizes = [
+            len(chunk) async for chunk in iter_base64(b"x" * 3000, chunk_size=300)
+        ]
+
+        assert max(chunk_sizes) == 400  # noqa: PLR2004
+
+    async def test_iter_json_body(self, tmp_path: Path):
+        path = tmp_path / 'chart "final".png'
+        path.write_bytes(b"chart")
+        payload = {
+            "base64_attachments": ["ZXhpc3Rpbmc="],
+            "message": "Hello",
+            "recipients": ["+49987654321"],
+        }
+
+        body = await collect(
+            iter_json_body(payload, [path, b"raw", generate(b"stre", b"am")])
+        )
+
+        assert json.loads(body) == {
+            "message": "Hello",
+            "recipients": ["+49987654321"],
+            "base64_attachments": [
+                "ZXhpc3Rpbmc=",
+                'data:image/png;filename=chart "final".png;base64,'
+                + base64.b64encode(b"chart").decode(),
+                base64.b64encode(b"raw").decode(),
+                base64.b64encode(b"stream").decode(),
+            ],
+        }
+
+    async def test_iter_json_body_file_path_as_str(self, tmp_path: Path):
+        path = tmp_path / "notes.txt"
+        path.write_bytes(b"notes")
+
+        body = await collect(iter_json_body({}, [str(path)]))
+
+        assert json.loads(body) == {
+            "base64_attachments": [
+                "data:text/plain;filename=notes.txt;base64,"
+                + base64.b64encode(b"notes").decode()
+            ]
+        }
+
+    async def test_is_replayable(self, tmp_path: Path):
+        assert is_replayable(b"raw")
+        assert is_replayable(tmp_path)
+        assert is_replayable(str(tmp_path))
+        assert is_replayable(Attachment(id="a.png"))
+        assert not is_replayable(generate(b"stream"))